@@ -1,3 +1,7 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
 from flask import Flask
 from app.config import db, migrate, jwt, mail, config
 from .routes.auth_route import auth_bp
@@ -6,42 +10,69 @@ from .routes.student_route import student_bp
 from .routes.course_route import course_bp
 from .routes.class_route import class_bp
 from .routes.schedule_route import schedule_bp
+from .routes.review_route import review_bp
+from .routes.test_route import test_bp
+from .cli import register_cli
+from .services.token_session_service import register_jwt_callbacks
 from flask_cors import CORS
 from .routes.teacher_route import teacher_bp
 from .routes.course_route import course_bp
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine.url import make_url
-
-
-def _ensure_database_exists(database_uri: str) -> None:
-    """Create target database if missing (MySQL) using same credentials."""
-    try:
-        url = make_url(database_uri)
-        database_name = url.database
-        if not database_name:
-            return
-        server_db = 'mysql' if url.drivername.startswith('mysql') else None
-        server_url = url.set(database=server_db)
-        engine = create_engine(server_url)
-        with engine.connect() as conn:
-            conn.execute(
-                text(
-                    f"CREATE DATABASE IF NOT EXISTS `{database_name}` "
-                    "DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-                )
-            )
-        engine.dispose()
-    except Exception:
-        # Ignore and let normal initialization surface errors
-        pass
+from .utils.startup import StartupTimer, bootstrap_database
+
+_IMPORTS_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
 
 def create_app(config_name="default"):
-    app = Flask(__name__)
+    timer = StartupTimer()
+    timer.notes["config_name"] = config_name
+    # Import các route/model chỉ tốn một lần mỗi tiến trình, không tính vào tổng
+    timer.notes["imports_ms"] = round(_IMPORTS_MS, 2)
+
+    with timer.phase("config"):
+        app = Flask(__name__)
+
+        # Load configuration
+        app.config.from_object(config[config_name])
+    app.extensions["startup_timer"] = timer
+
+    with timer.phase("cors"):
+        # Cấu hình CORS đầy đủ hơn
+        _configure_cors(app)
+
+    # Chỉ kiểm tra/tạo database khi chưa có dấu đã kiểm tra (xem `flask database ensure`)
+    with timer.phase("database"):
+        timer.notes["database"] = bootstrap_database(app, app.config["SQLALCHEMY_DATABASE_URI"])
+
+    # Initialize extensions with app
+    with timer.phase("engine"):
+        db.init_app(app)
+    with timer.phase("extensions"):
+        migrate.init_app(app, db)
+        jwt.init_app(app)
+        register_jwt_callbacks(jwt)
+        mail.init_app(app)
+
+        # Import models (để Flask-Migrate detect được)
+        from app.models.course_model import Course
 
-    # Load configuration
-    app.config.from_object(config[config_name])
+    with timer.phase("blueprints"):
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(teacher_bp)
+        app.register_blueprint(student_bp)
+        app.register_blueprint(course_bp)
+        app.register_blueprint(class_bp)
+        app.register_blueprint(schedule_bp)
+        app.register_blueprint(review_bp)
+        app.register_blueprint(test_bp)
 
-    # Cấu hình CORS đầy đủ hơn
+    with timer.phase("cli"):
+        register_cli(app)
+
+    app.logger.debug(f"create_app finished in {timer.report()['total_ms']} ms")
+    return app
+
+
+def _configure_cors(app):
     CORS(
         app,
         resources={
@@ -59,24 +90,3 @@ def create_app(config_name="default"):
         },
         supports_credentials=True,
     )
-
-    # Ensure database exists before initializing extensions
-    _ensure_database_exists(config[config_name].SQLALCHEMY_DATABASE_URI)
-
-    # Initialize extensions with app
-    db.init_app(app)
-    migrate.init_app(app, db)
-    jwt.init_app(app)
-    mail.init_app(app)
-
-    # Import models (để Flask-Migrate detect được)
-    from app.models.course_model import Course
-
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(teacher_bp)
-    app.register_blueprint(student_bp)
-    app.register_blueprint(course_bp)
-    app.register_blueprint(class_bp)
-    app.register_blueprint(schedule_bp)
-
-    return app
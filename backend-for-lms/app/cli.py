@@ -0,0 +1,187 @@
+import click
+from flask.cli import AppGroup
+
+teachers_cli = AppGroup("teachers", help="Các lệnh quản trị dữ liệu giáo viên")
+auth_cli = AppGroup("auth", help="Các lệnh quản trị tài khoản đăng nhập")
+mail_cli = AppGroup("mail", help="Hàng đợi email gửi đi")
+search_cli = AppGroup("search", help="Chỉ mục tìm kiếm")
+grading_cli = AppGroup("grading", help="Chấm bài kiểm tra")
+database_cli = AppGroup("database", help="Khởi tạo database của ứng dụng")
+startup_cli = AppGroup("startup", help="Đo thời gian khởi động ứng dụng")
+
+
+@teachers_cli.command("reconcile-stats")
+def reconcile_teacher_statistics():
+    """Đối soát bảng teacher_statistics với bảng teachers (chạy định kỳ mỗi ngày)"""
+    from app.services.teacher_statistics_service import TeacherStatisticsService
+
+    result = TeacherStatisticsService().reconcile()
+    for change in result["changes"]:
+        click.echo(f"{change['dimension']}/{change['bucket'] or '-'}: {change['before']} -> {change['after']}")
+    click.echo(f"Reconciled {result['rows']} buckets, {len(result['changes'])} corrected")
+
+
+@auth_cli.command("rebuild-credentials")
+def rebuild_credentials():
+    """Dựng lại bảng user_credentials từ teachers và students"""
+    from app.services.credential_service import CredentialService
+
+    result = CredentialService().rebuild()
+    for account in result["duplicates"]:
+        click.echo(f"Skipped duplicate email: {account}")
+    click.echo(f"Rebuilt {result['rows']} credentials")
+
+
+@auth_cli.command("calibrate-hashing")
+@click.option("--target-ms", default=250.0, show_default=True, help="Thời gian mong muốn cho một lần kiểm tra mật khẩu")
+@click.option("--algorithm", type=click.Choice(["pbkdf2", "scrypt"]), default="pbkdf2", show_default=True)
+def calibrate_hashing(target_ms, algorithm):
+    """Đo trên máy hiện tại và đề xuất PASSWORD_HASH_METHOD"""
+    from app.utils.password_hashing import calibrate, current_method, time_method
+
+    current = current_method()
+    click.echo(f"Current PASSWORD_HASH_METHOD={current or 'werkzeug default'} ({time_method(current):.0f} ms)")
+    result = calibrate(target_ms, algorithm)
+    click.echo(f"Suggested PASSWORD_HASH_METHOD={result['method']} ({result['measured_ms']:.0f} ms)")
+
+
+@auth_cli.command("purge-revoked-tokens")
+def purge_revoked_tokens():
+    """Xóa các dòng thu hồi token đã hết tác dụng"""
+    from datetime import datetime
+    from app.config import db
+    from app.models.revoked_token_model import RevokedToken
+
+    deleted = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    click.echo(f"Purged {deleted} expired revocations")
+
+
+@mail_cli.command("worker")
+@click.option("--workers", default=2, show_default=True, help="Số thread gửi song song")
+@click.option("--batch-size", default=None, type=int, help="Số thư mỗi lô (mặc định MAIL_BATCH_SIZE)")
+@click.option("--poll-interval", default=2.0, show_default=True, help="Số giây chờ khi hàng đợi rỗng")
+@click.option("--once", is_flag=True, help="Gửi hết thư đến hạn rồi thoát")
+def mail_worker(workers, batch_size, poll_interval, once):
+    """Chạy worker gửi email từ bảng mail_outbox"""
+    from flask import current_app
+    from app.services.mail_queue_service import MailWorkerPool
+
+    pool = MailWorkerPool(current_app._get_current_object(), workers, batch_size, poll_interval)
+    pool.start(drain=once)
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+        pool.join()
+    click.echo(f"Sent {pool.totals['sent']}, retrying {pool.totals['retry']}, failed {pool.totals['failed']}, "
+               f"lease lost {pool.totals['lost']}")
+
+
+@mail_cli.command("stats")
+def mail_stats():
+    """Số thư trong hàng đợi theo trạng thái"""
+    from app.services.mail_queue_service import MailQueueService
+
+    for status, count in sorted(MailQueueService().get_stats().items()):
+        click.echo(f"{status}: {count}")
+
+
+@search_cli.command("purge-changes")
+def purge_search_changes():
+    """Xóa nhật ký thay đổi của chỉ mục tìm kiếm đã cũ (chạy định kỳ mỗi ngày)"""
+    from app.services.search_service import SearchService
+
+    click.echo(f"Purged {SearchService().purge_changes()} search index changes")
+
+
+@grading_cli.command("invalidate-answer-keys")
+@click.option("--test-id", type=int, default=None, help="Chỉ bài này (mặc định tất cả các bài)")
+def invalidate_answer_keys(test_id):
+    """Buộc mọi tiến trình nạp lại đáp án (sau khi sửa đáp án bằng SQL trực tiếp)"""
+    from app.services.grading_service import GradingService
+
+    result = GradingService().invalidate_answer_key(test_id)
+    if not result["success"]:
+        raise click.ClickException(result["error"])
+    click.echo(f"Invalidated answer keys for {'test ' + str(test_id) if test_id is not None else 'all tests'}")
+
+
+@database_cli.command("ensure")
+def ensure_database():
+    """Tạo database nếu chưa có và ghi dấu để create_app bỏ qua bước này"""
+    from flask import current_app
+    from app.utils.startup import ensure_database_exists, mark_database_verified
+
+    uri = current_app.config["SQLALCHEMY_DATABASE_URI"]
+    created = ensure_database_exists(uri)
+    path = mark_database_verified(current_app, uri)
+    click.echo(f"{'Database ensured' if created else 'Nothing to create for this driver'}, marker written to {path}")
+
+
+@database_cli.command("status")
+def database_status():
+    """Database hiện tại đã có dấu kiểm tra chưa"""
+    from flask import current_app
+    from app.utils.startup import is_database_verified, marker_path
+
+    verified = is_database_verified(current_app, current_app.config["SQLALCHEMY_DATABASE_URI"])
+    click.echo(f"{'Verified' if verified else 'Not verified'} ({marker_path(current_app)})")
+
+
+@database_cli.command("forget")
+def forget_database():
+    """Xóa dấu kiểm tra để lần khởi động sau kiểm tra lại (vd. sau khi đổi server)"""
+    from flask import current_app
+    from app.utils.startup import forget_database_verified
+
+    removed = forget_database_verified(current_app, current_app.config["SQLALCHEMY_DATABASE_URI"])
+    click.echo("Marker removed" if removed else "No marker for this database")
+
+
+@startup_cli.command("report")
+@click.option("--repeat", default=0, show_default=True, help="Tạo thêm N app mới và in trung vị từng bước")
+def startup_report_command(repeat):
+    """In thời gian từng bước của create_app (config, engine, extensions, blueprints, ...)"""
+    from statistics import median
+    from flask import current_app
+    from app.utils.startup import startup_report
+
+    report = startup_report(current_app)
+    if report is None:
+        raise click.ClickException("App was not created by create_app")
+
+    label = "this process"
+    if repeat > 0:
+        from app import create_app
+
+        reports = [startup_report(create_app(report["notes"]["config_name"])) for _ in range(repeat)]
+        names = [phase["name"] for phase in reports[0]["phases"]]
+        report = {
+            "total_ms": round(median(r["total_ms"] for r in reports), 2),
+            "phases": [
+                {"name": name, "ms": round(median(p["ms"] for r in reports for p in r["phases"] if p["name"] == name), 2)}
+                for name in names
+            ],
+            "notes": reports[-1]["notes"],
+        }
+        label = f"median of {repeat} runs"
+
+    click.echo(f"create_app ({label}): {report['total_ms']:.2f} ms")
+    for phase in report["phases"]:
+        click.echo(f"  {phase['name']:<12} {phase['ms']:>8.2f} ms")
+    for key, value in report["notes"].items():
+        click.echo(f"  {key}: {value}")
+
+
+def register_cli(app):
+    """Đăng ký các nhóm lệnh `flask ...` của ứng dụng"""
+    app.cli.add_command(teachers_cli)
+    app.cli.add_command(auth_cli)
+    app.cli.add_command(mail_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(grading_cli)
+    app.cli.add_command(database_cli)
+    app.cli.add_command(startup_cli)
@@ -4,43 +4,59 @@ Package models - chứa các mô hình SQLAlchemy cho hệ thống LMS
 
 # Import các models từ các file tương ứng
 from .answer_model import Answer
+from .answer_key_version_model import AnswerKeyVersion
+from .calendar_version_model import CalendarVersion
 from .class_model import Class
 from .course_model import Course
 from .enrollment_model import Enrollment
+from .id_sequence_model import IdSequence
 from .learning_path_model import LearningPath
 from .lesson_model import Lesson
+from .mail_outbox_model import MailOutbox
 from .question_model import Question
+from .revoked_token_model import RevokedToken
 from .room_model import Room
 from .schedule_model import Schedule
+from .search_index_change_model import SearchIndexChange
 from .score_model import Score
 from .skill_model import Skill
 from .student_model import Student
 from .student_words_model import StudentWords
 from .teacher_model import Teacher
+from .teacher_statistics_model import TeacherStatistic
 from .test_model import Test
 from .test_question_model import TestQuestion
 from .vocabulary_model import Vocabulary
 from .words_model import Word
+from .user_credential_model import UserCredential
 from .user_model import User  # Base model cho Student và Teacher
 
 # Cung cấp danh sách tất cả các models cho việc tạo bảng
 __all__ = [
     'User',
+    'UserCredential',
     'Student',
     'Teacher',
+    'TeacherStatistic',
     'Course',
     'Class',
+    'CalendarVersion',
     'Enrollment',
+    'IdSequence',
     'LearningPath',
     'Skill',
     'Lesson',
+    'MailOutbox',
     'Question',
     'Answer',
+    'AnswerKeyVersion',
     'Test',
     'TestQuestion',
     'Score',
+    'RevokedToken',
     'Room',
     'Schedule',
+    'SearchIndexChange',
     'Word',
     'StudentWords',
     'Vocabulary',
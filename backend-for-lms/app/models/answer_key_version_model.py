@@ -0,0 +1,18 @@
+from app.config import db
+
+
+class AnswerKeyVersion(db.Model):
+    """Model cho bảng ANSWER_KEY_VERSIONS - phiên bản đáp án của từng bài kiểm tra
+
+    Tăng version trong cùng transaction mỗi khi câu hỏi/phương án của bài thay
+    đổi, để mọi tiến trình biết đáp án đã biên dịch trong cache của mình đã cũ.
+    Bài chưa có dòng nào được coi là version 0.
+    """
+    __tablename__ = "answer_key_versions"
+
+    test_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<AnswerKeyVersion {self.test_id}: {self.version}>"
@@ -0,0 +1,19 @@
+from app.config import db
+
+
+class CalendarVersion(db.Model):
+    """Model cho bảng CALENDAR_VERSIONS - phiên bản calendar của từng lớp
+
+    Tăng version trong cùng transaction mỗi khi lịch học, tên lớp, tên phòng hay
+    tên giáo viên xuất hiện trong calendar của lớp thay đổi, để mọi tiến trình
+    biết calendar đã serialize trong bộ nhớ của mình đã cũ.
+    Lớp chưa có dòng nào được coi là version 0.
+    """
+    __tablename__ = "calendar_versions"
+
+    class_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<CalendarVersion {self.class_id}: {self.version}>"
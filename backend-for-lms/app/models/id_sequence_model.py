@@ -0,0 +1,18 @@
+from app.config import db
+from sqlalchemy import func
+
+
+class IdSequence(db.Model):
+    """Model cho bảng ID_SEQUENCES - bộ đếm sinh mã có tiền tố (S00000001, C0000001...)
+
+    next_value là số tiếp theo chưa được cấp cho tiến trình nào; mỗi tiến trình
+    giữ riêng một khối số đã đặt trước (xem app/utils/id_allocator.py).
+    """
+    __tablename__ = "id_sequences"
+
+    seq_name = db.Column(db.String(30), primary_key=True, nullable=False)
+    next_value = db.Column(db.BigInteger, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<IdSequence {self.seq_name}: {self.next_value}>"
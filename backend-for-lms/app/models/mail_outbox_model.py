@@ -0,0 +1,51 @@
+from app.config import db
+from sqlalchemy import func
+
+
+class MailOutbox(db.Model):
+    """Model cho bảng MAIL_OUTBOX - hàng đợi email gửi đi
+
+    Request chỉ thêm dòng PENDING (cùng transaction với dữ liệu nghiệp vụ);
+    worker (`flask mail worker`) nhận từng lô, gửi qua một kết nối SMTP dùng
+    chung và thử lại với thời gian chờ tăng dần khi lỗi.
+    """
+    __tablename__ = "mail_outbox"
+
+    mail_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+
+    # PENDING -> SENDING -> SENT | FAILED (hết số lần thử)
+    status = db.Column(db.String(10), nullable=False, default="PENDING")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, server_default=func.now())
+    # Worker đang giữ lô; quá locked_until mà chưa xong thì worker khác được nhận lại
+    claim_token = db.Column(db.String(32), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_mail_outbox_status_next_attempt", "status", "next_attempt_at"),
+        db.Index("ix_mail_outbox_claim_token", "claim_token"),
+    )
+
+    def __repr__(self):
+        return f"<MailOutbox {self.mail_id} {self.status}: {self.recipient}>"
+
+    def to_dict(self):
+        """Chuyển đổi thành dict để trả về qua API"""
+        return {
+            'mail_id': self.mail_id,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+        }
@@ -0,0 +1,23 @@
+from sqlalchemy.dialects.mysql import DATETIME
+
+from app.config import db
+
+
+class RevokedToken(db.Model):
+    """Model cho bảng REVOKED_TOKENS - danh sách thu hồi JWT
+
+    token_key có hai dạng:
+    - "jti:<jti>": thu hồi một token (đăng xuất)
+    - "user:<role>:<user_id>": thu hồi mọi token phát hành trước revoked_at
+      (đổi/đặt lại mật khẩu)
+    Dòng hết tác dụng sau expires_at (khi mọi token liên quan đã hết hạn).
+    """
+    __tablename__ = "revoked_tokens"
+
+    token_key = db.Column(db.String(80), primary_key=True, nullable=False)
+    # Giữ phần mili giây để so với claim iat_ms (DATETIME của MySQL mặc định làm tròn giây)
+    revoked_at = db.Column(db.DateTime().with_variant(DATETIME(fsp=6), "mysql"), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken {self.token_key}>"
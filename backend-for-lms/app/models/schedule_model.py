@@ -4,6 +4,7 @@ from datetime import date, time
 from .room_model import Room
 from .class_model import Class
 from .teacher_model import Teacher
+from app.utils.eager_loading import with_relations
 
 
 class Schedule(db.Model):
@@ -22,11 +23,23 @@ class Schedule(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
     
+    # Index phục vụ kiểm tra xung đột (phòng/giáo viên + ngày + giờ, đủ cột để không cần đọc bảng)
+    # và các danh sách sắp xếp theo (schedule_date, schedule_startime)
+    __table_args__ = (
+        db.Index('ix_schedules_room_date_time', 'room_id', 'schedule_date', 'schedule_startime', 'schedule_endtime'),
+        db.Index('ix_schedules_user_date_time', 'user_id', 'schedule_date', 'schedule_startime', 'schedule_endtime'),
+        db.Index('ix_schedules_class_date_start', 'class_id', 'schedule_date', 'schedule_startime'),
+        db.Index('ix_schedules_date_start', 'schedule_date', 'schedule_startime'),
+    )
+    
     # Relationships
     room = db.relationship('Room', backref=db.backref('schedules', lazy=True))
     class_obj = db.relationship('Class', backref=db.backref('schedules', lazy=True))  # class là từ khóa Python nên đổi tên
     teacher = db.relationship('Teacher', backref=db.backref('schedules', lazy=True))
     
+    # Các quan hệ mà to_dict() truy cập, dùng cho eager loading khi trả về danh sách
+    SERIALIZE_RELATIONS = ('room', 'class_obj', 'teacher')
+    
     def __repr__(self):
         return f"<Schedule {self.schedule_id}: Class {self.class_id} on {self.schedule_date}>"
     
@@ -75,21 +88,21 @@ class Schedule(db.Model):
         return max(0, duration)  # Đảm bảo không âm
     
     @classmethod
-    def get_schedules_by_date(cls, date_obj):
+    def get_schedules_by_date(cls, date_obj, relations=()):
         """Lấy tất cả lịch học trong ngày cụ thể"""
-        return cls.query.filter_by(schedule_date=date_obj).all()
+        return with_relations(cls.query, cls, relations).filter_by(schedule_date=date_obj).all()
     
     @classmethod
-    def get_schedules_by_class(cls, class_id):
+    def get_schedules_by_class(cls, class_id, relations=()):
         """Lấy tất cả lịch học của một lớp"""
-        return cls.query.filter_by(class_id=class_id).order_by(cls.schedule_date, cls.schedule_startime).all()
+        return with_relations(cls.query, cls, relations).filter_by(class_id=class_id).order_by(cls.schedule_date, cls.schedule_startime).all()
     
     @classmethod
-    def get_schedules_by_teacher(cls, user_id):
+    def get_schedules_by_teacher(cls, user_id, relations=()):
         """Lấy tất cả lịch dạy của một giáo viên"""
-        return cls.query.filter_by(user_id=user_id).order_by(cls.schedule_date, cls.schedule_startime).all()
+        return with_relations(cls.query, cls, relations).filter_by(user_id=user_id).order_by(cls.schedule_date, cls.schedule_startime).all()
     
     @classmethod
-    def get_schedules_by_room(cls, room_id):
+    def get_schedules_by_room(cls, room_id, relations=()):
         """Lấy tất cả lịch học trong một phòng"""
-        return cls.query.filter_by(room_id=room_id).order_by(cls.schedule_date, cls.schedule_startime).all()
\ No newline at end of file
+        return with_relations(cls.query, cls, relations).filter_by(room_id=room_id).order_by(cls.schedule_date, cls.schedule_startime).all()
\ No newline at end of file
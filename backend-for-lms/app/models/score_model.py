@@ -17,6 +17,8 @@ class Score(db.Model):
     # Foreign key đến bảng Enrollment (đã có user_id và class_id làm composite key)
     __table_args__ = (
         db.ForeignKeyConstraint(['user_id', 'class_id'], ['enrollments.user_id', 'enrollments.class_id']),
+        # Index phủ cho thống kê điểm theo lớp (GROUP BY test_id, sc_score)
+        db.Index('ix_scores_class_test_score', 'class_id', 'test_id', 'sc_score'),
     )
     
     # Điểm số
@@ -0,0 +1,23 @@
+from app.config import db
+
+
+class SearchIndexChange(db.Model):
+    """Model cho bảng SEARCH_INDEX_CHANGES - nhật ký thay đổi cho chỉ mục tìm kiếm
+
+    Mỗi lần tạo/sửa/xóa học viên, giáo viên, lớp học hoặc từ qua ORM ghi một
+    dòng trong cùng transaction. Mỗi tiến trình đọc các dòng mới sau mỗi
+    SEARCH_INDEX_SYNC_SECONDS và cập nhật chỉ mục trong bộ nhớ của mình.
+    """
+    __tablename__ = "search_index_changes"
+
+    change_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    index_name = db.Column(db.String(20), nullable=False)
+    doc_key = db.Column(db.String(50), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_search_index_changes_name_changed_at", "index_name", "changed_at"),
+    )
+
+    def __repr__(self):
+        return f"<SearchIndexChange {self.index_name}:{self.doc_key}>"
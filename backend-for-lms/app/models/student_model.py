@@ -1,7 +1,7 @@
 from app.config import db
 from sqlalchemy import func
 from datetime import date
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.password_hashing import hash_password, verify_password
 
 
 class Student(db.Model):
@@ -46,11 +46,11 @@ class Student(db.Model):
     
     def set_password(self, password):
         """Hash và lưu mật khẩu"""
-        self.user_password = generate_password_hash(password)
+        self.user_password = hash_password(password)
     
     def check_password(self, password):
         """Kiểm tra mật khẩu"""
-        return check_password_hash(self.user_password, password)
+        return verify_password(self.user_password, password)
     
     def get_age(self):
         """Tính tuổi dựa trên ngày sinh"""
@@ -3,6 +3,7 @@ from sqlalchemy import func
 from datetime import datetime
 from .student_model import Student
 from .words_model import Word
+from app.utils.spaced_repetition import ReviewState, next_review, proficiency_after, quality_from_answer
 
 
 class StudentWords(db.Model):
@@ -17,6 +18,17 @@ class StudentWords(db.Model):
     learned_date = db.Column(db.DateTime(timezone=True), server_default=func.now())
     proficiency_level = db.Column(db.Integer, default=0)  # Mức độ thành thạo: 0-5
     last_reviewed = db.Column(db.DateTime(timezone=True))  # Thời gian ôn tập gần nhất
+
+    # Lịch ôn tập SM-2 (xem app/utils/spaced_repetition.py)
+    due_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.now, server_default=func.now())
+    ease_factor = db.Column(db.Float, nullable=False, default=2.5, server_default="2.5")
+    interval_days = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    repetitions = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # "N từ đến hạn tiếp theo" của một học viên là một lần quét khoảng trên index
+    __table_args__ = (
+        db.Index('ix_student_words_user_due', 'user_id', 'due_at'),
+    )
     
     # Relationships
     student = db.relationship('Student', backref=db.backref('student_words', lazy=True))
@@ -33,21 +45,29 @@ class StudentWords(db.Model):
             'learned_date': self.learned_date.isoformat() if self.learned_date else None,
             'proficiency_level': self.proficiency_level,
             'last_reviewed': self.last_reviewed.isoformat() if self.last_reviewed else None,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'ease_factor': self.ease_factor,
+            'interval_days': self.interval_days,
+            'repetitions': self.repetitions,
             # Thông tin từ word
             'word_english': self.word.w_english if self.word else None,
             'word_vietnamese': self.word.w_vietnamese if self.word else None
         }
     
+    def apply_review(self, quality, now=None):
+        """Ghi nhận một lần ôn (quality 0-5) và tính lịch ôn tiếp theo, không commit"""
+        now = now or datetime.now()
+        state, due_at = next_review(
+            ReviewState(self.ease_factor, self.interval_days, self.repetitions), quality, now
+        )
+        self.ease_factor, self.interval_days, self.repetitions = state
+        self.due_at = due_at
+        self.proficiency_level = proficiency_after(self.proficiency_level, quality)
+        self.last_reviewed = now
+
     def update_proficiency(self, correct_answer):
-        """Cập nhật mức độ thành thạo dựa trên câu trả lời"""
-        if correct_answer:
-            # Tăng mức độ thành thạo nếu trả lời đúng, tối đa là 5
-            self.proficiency_level = min(5, self.proficiency_level + 1)
-        else:
-            # Giảm mức độ thành thạo nếu trả lời sai, tối thiểu là 0
-            self.proficiency_level = max(0, self.proficiency_level - 1)
-            
-        self.last_reviewed = datetime.now()
+        """Cập nhật mức độ thành thạo dựa trên câu trả lời (ôn nhiều từ: ReviewService.submit_answers)"""
+        self.apply_review(quality_from_answer(correct_answer))
         db.session.commit()
     
     @classmethod
@@ -57,11 +77,11 @@ class StudentWords(db.Model):
     
     @classmethod
     def get_words_to_review(cls, user_id, limit=10):
-        """Lấy danh sách từ cần ôn tập (ưu tiên mức thành thạo thấp)"""
-        return cls.query.filter_by(user_id=user_id).order_by(
-            cls.proficiency_level.asc(), 
-            cls.last_reviewed.asc().nullsfirst()
-        ).limit(limit).all()
+        """Lấy danh sách từ đã đến hạn ôn tập (đến hạn sớm nhất trước)"""
+        return cls.query.filter(
+            cls.user_id == user_id,
+            cls.due_at <= datetime.now()
+        ).order_by(cls.due_at.asc()).limit(limit).all()
     
     @classmethod
     def mark_word_as_learned(cls, user_id, w_index):
@@ -1,7 +1,15 @@
 from app.config import db
 from sqlalchemy import func
 from datetime import date
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.password_hashing import hash_password, verify_password
+
+
+# Giáo viên thâm niên: trên SENIOR_YEARS năm công tác
+SENIOR_YEARS = 5
+# (số năm tối đa, tên nhóm) theo thứ tự tăng dần; trên mốc cuối là SENIORITY_OPEN_BUCKET
+SENIORITY_BUCKETS = ((2, "0-2"), (SENIOR_YEARS, f"3-{SENIOR_YEARS}"), (10, f"{SENIOR_YEARS + 1}-10"))
+SENIORITY_OPEN_BUCKET = "11+"
+SENIOR_BUCKETS = (f"{SENIOR_YEARS + 1}-10", SENIORITY_OPEN_BUCKET)
 
 
 class Teacher(db.Model):
@@ -18,7 +26,7 @@ class Teacher(db.Model):
     user_telephone = db.Column(db.String(15), nullable=True)
     tch_specialization = db.Column(db.String(100), nullable=True)  # Chuyên môn
     tch_qualification = db.Column(db.String(100), nullable=True)   # Bằng cấp/Chứng chỉ
-    tch_hire_date = db.Column(db.Date, nullable=True)             # Ngày tuyển dụng
+    tch_hire_date = db.Column(db.Date, nullable=True, index=True)  # Ngày tuyển dụng
     
     # Thêm các trường tracking
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
@@ -45,11 +53,11 @@ class Teacher(db.Model):
     
     def set_password(self, password):
         """Hash và lưu mật khẩu"""
-        self.user_password = generate_password_hash(password)
+        self.user_password = hash_password(password)
     
     def check_password(self, password):
         """Kiểm tra mật khẩu"""
-        return check_password_hash(self.user_password, password)
+        return verify_password(self.user_password, password)
     
     def get_age(self):
         """Tính tuổi dựa trên ngày sinh"""
@@ -61,18 +69,50 @@ class Teacher(db.Model):
     
     def get_years_of_service(self):
         """Tính số năm công tác"""
-        if not self.tch_hire_date:
+        return self.years_of_service(self.tch_hire_date)
+    
+    def is_senior_teacher(self):
+        """Kiểm tra giáo viên có phải là giáo viên thâm niên (> 5 năm)"""
+        return self.get_years_of_service() > SENIOR_YEARS
+
+    @staticmethod
+    def years_of_service(hire_date, today=None):
+        """Số năm công tác tính từ ngày tuyển dụng"""
+        if not hire_date:
             return 0
         
-        today = date.today()
-        years = today.year - self.tch_hire_date.year
+        today = today or date.today()
+        years = today.year - hire_date.year
         
         # Kiểm tra nếu chưa đến ngày kỷ niệm năm nay
-        if (today.month, today.day) < (self.tch_hire_date.month, self.tch_hire_date.day):
+        if (today.month, today.day) < (hire_date.month, hire_date.day):
             years -= 1
             
         return max(0, years)
-    
-    def is_senior_teacher(self):
-        """Kiểm tra giáo viên có phải là giáo viên thâm niên (> 5 năm)"""
-        return self.get_years_of_service() > 5
\ No newline at end of file
+
+    @staticmethod
+    def senior_hire_cutoff(today=None):
+        """
+        Ngày tuyển dụng muộn nhất của giáo viên thâm niên
+        
+        is_senior_teacher() <=> tch_hire_date <= senior_hire_cutoff(), để lọc bằng SQL
+        trên index tch_hire_date.
+        """
+        today = today or date.today()
+        year = today.year - SENIOR_YEARS - 1
+        try:
+            return today.replace(year=year)
+        except ValueError:
+            # 29/02 của năm không nhuận -> 28/02
+            return date(year, 2, 28)
+
+    @classmethod
+    def seniority_bucket(cls, hire_date, today=None):
+        """Nhóm thâm niên dùng cho thống kê"""
+        if not hire_date:
+            return "unknown"
+        years = cls.years_of_service(hire_date, today)
+        for upper, name in SENIORITY_BUCKETS:
+            if years <= upper:
+                return name
+        return SENIORITY_OPEN_BUCKET
\ No newline at end of file
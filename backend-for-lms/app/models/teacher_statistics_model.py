@@ -0,0 +1,33 @@
+from app.config import db
+from sqlalchemy import func
+
+
+class TeacherStatistic(db.Model):
+    """Model cho bảng TEACHER_STATISTICS - bộ đếm giáo viên theo từng nhóm
+
+    Mỗi dòng là số giáo viên của một nhóm (dimension, bucket):
+    ("total", ""), ("gender", "M"), ("specialization", "TOEIC"), ("seniority", "6-10")...
+    Được cập nhật trong cùng transaction với thay đổi của bảng teachers
+    (xem app/services/teacher_statistics_service.py).
+    """
+    __tablename__ = "teacher_statistics"
+
+    dimension = db.Column(db.String(20), primary_key=True, nullable=False)
+    bucket = db.Column(db.String(100), primary_key=True, nullable=False)
+    teacher_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Lần đối soát gần nhất với bảng teachers
+    reconciled_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<TeacherStatistic {self.dimension}/{self.bucket}: {self.teacher_count}>"
+
+    def to_dict(self):
+        """Chuyển đổi thành dict để trả về qua API"""
+        return {
+            'dimension': self.dimension,
+            'bucket': self.bucket,
+            'teacher_count': self.teacher_count,
+            'reconciled_at': self.reconciled_at.isoformat() if self.reconciled_at else None,
+        }
@@ -0,0 +1,33 @@
+from app.config import db
+from sqlalchemy import func
+
+
+def normalize_email(email):
+    """Chuẩn hóa email để so khớp (bỏ khoảng trắng, chữ thường)"""
+    if not email:
+        return None
+    return email.strip().lower() or None
+
+
+class UserCredential(db.Model):
+    """Model cho bảng USER_CREDENTIALS - chỉ mục đăng nhập chung của Teacher và Student
+
+    Mỗi email (đã chuẩn hóa) ứng với đúng một tài khoản. Bảng được đồng bộ
+    trong cùng transaction với bảng teachers/students
+    (xem app/services/credential_service.py).
+    """
+    __tablename__ = "user_credentials"
+
+    email_normalized = db.Column(db.String(100), primary_key=True, nullable=False)
+    role = db.Column(db.String(10), nullable=False)  # "teacher" | "student"
+    user_id = db.Column(db.String(10), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=True)
+    is_email_verified = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint("role", "user_id", name="uq_user_credentials_role_user"),
+    )
+
+    def __repr__(self):
+        return f"<UserCredential {self.email_normalized}: {self.role}/{self.user_id}>"
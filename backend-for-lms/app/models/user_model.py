@@ -52,11 +52,10 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash và lưu mật khẩu"""
-        # Ví dụ dùng werkzeug để hash password
-        from werkzeug.security import generate_password_hash
-        self.user_password = generate_password_hash(password)
+        from app.utils.password_hashing import hash_password
+        self.user_password = hash_password(password)
     
     def check_password(self, password):
         """Kiểm tra mật khẩu"""
-        from werkzeug.security import check_password_hash
-        return check_password_hash(self.user_password, password)
\ No newline at end of file
+        from app.utils.password_hashing import verify_password
+        return verify_password(self.user_password, password)
\ No newline at end of file
@@ -45,14 +45,17 @@ class Vocabulary(db.Model):
         return cls.query.filter_by(ls_id=ls_id).all()
     
     @classmethod
-    def search(cls, keyword):
-        """Tìm kiếm từ vựng theo từ khóa"""
-        return cls.query.filter(
-            (cls.vc_english.ilike(f"%{keyword}%")) |
-            (cls.vc_vietnamese.ilike(f"%{keyword}%")) |
-            (cls.vc_englishmean.ilike(f"%{keyword}%")) |
-            (cls.vc_vietnamesemean.ilike(f"%{keyword}%"))
-        ).all()
+    def search(cls, keyword, limit=50):
+        """
+        Tìm kiếm từ vựng theo từ khóa (không phân biệt dấu), xếp theo độ liên quan
+
+        Dùng chỉ mục trong bộ nhớ của SearchService: khớp từ gốc xếp trước khớp
+        trong phần giải nghĩa; trả về tối đa limit kết quả.
+        """
+        from app.services.search_service import SearchService
+
+        service = SearchService()
+        return service.fetch_ranked("vocabulary", service.search_ids("vocabulary", keyword, limit))
     
     def has_full_definitions(self):
         """Kiểm tra từ vựng có đầy đủ định nghĩa không"""
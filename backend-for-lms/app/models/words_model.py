@@ -42,14 +42,17 @@ class Word(db.Model):
         return cls.query.filter(cls.w_vietnamese.ilike(f"%{keyword}%")).all()
     
     @classmethod
-    def search(cls, keyword):
-        """Tìm kiếm cả tiếng Anh và tiếng Việt"""
-        return cls.query.filter(
-            (cls.w_english.ilike(f"%{keyword}%")) | 
-            (cls.w_vietnamese.ilike(f"%{keyword}%")) |
-            (cls.w_englishmean.ilike(f"%{keyword}%")) |
-            (cls.w_vietnamesemean.ilike(f"%{keyword}%"))
-        ).all()
+    def search(cls, keyword, limit=50):
+        """
+        Tìm kiếm cả tiếng Anh và tiếng Việt (không phân biệt dấu), xếp theo độ liên quan
+
+        Dùng chỉ mục trong bộ nhớ của SearchService: khớp từ gốc xếp trước khớp
+        trong phần giải nghĩa; trả về tối đa limit kết quả.
+        """
+        from app.services.search_service import SearchService
+
+        service = SearchService()
+        return service.fetch_ranked("words", service.search_ids("words", keyword, limit))
     
     def has_english_meaning(self):
         """Kiểm tra từ có định nghĩa tiếng Anh không"""
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, render_template
+from flask_jwt_extended import jwt_required
 from app.services.auth_service import AuthService
 from app.services.register_service import RegisterService
-from app.models.student_model import Student
-from app.config import db
+from app.utils.auth_utils import admin_required
+from app.utils.rate_limiter import limiter, rate_limited
 from app.utils.response_utils import (
     success_response,
     error_response,
@@ -16,6 +17,7 @@ auth_service = AuthService()
 
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limited("login")
 def login():
     data = request.get_json()
     email = data.get("email")
@@ -29,11 +31,21 @@ def login():
         return success_response(data=result, message="Login successful")
     else:
         return error_response(
-            message=result.get("error", "Invalid credentials"), status_code=401
+            message=result.get("error", "Invalid credentials"),
+            status_code=result.get("status_code", 401),
         )
 
 
+@auth_bp.route("/rate-limits", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_rate_limit_stats():
+    """Số request cho qua/bị chặn theo từng scope của tiến trình hiện tại"""
+    return success_response(data=limiter.stats())
+
+
 @auth_bp.route("/register/student", methods=["POST"])
+@rate_limited("register")
 def register_student():
     data = request.get_json()
     result = auth_service.register_student(data)
@@ -50,6 +62,7 @@ def register_student():
 
 
 @auth_bp.route("/register/teacher", methods=["POST"])
+@rate_limited("register")
 def register_teacher():
     data = request.get_json()
     result = auth_service.register_teacher(data)
@@ -82,6 +95,26 @@ def refresh_token():
         )
 
 
+@auth_bp.route("/logout", methods=["POST"])
+def logout():
+    """Thu hồi token hiện tại (header Authorization: Bearer ... hoặc trường token)"""
+    header = request.headers.get("Authorization", "")
+    token = header[7:].strip() if header.startswith("Bearer ") else None
+    if not token:
+        token = (request.get_json(silent=True) or {}).get("token")
+
+    if not token:
+        return validation_error_response(message="Token is required")
+
+    result = auth_service.logout(token)
+    if result["success"]:
+        return success_response(message="Logged out successfully")
+    else:
+        return error_response(
+            message=result.get("error", "Invalid token"), status_code=401
+        )
+
+
 @auth_bp.route("/change-password", methods=["POST"])
 def change_password():
     data = request.get_json()
@@ -116,6 +149,7 @@ def verify_email(token):
 
 # Thêm route để gửi lại email xác nhận
 @auth_bp.route("/resend-verification", methods=["POST"])
+@rate_limited("resend_verification")
 def resend_verification():
     data = request.get_json()
     email = data.get("email")
@@ -123,29 +157,18 @@ def resend_verification():
     if not email:
         return validation_error_response("Email is required")
 
-    # Tìm tài khoản
-    student = db.session.query(Student).filter_by(user_email=email).first()
-
-    if student and not student.is_email_verified:
-        # Gửi lại email xác nhận
-        try:
-            from flask import current_app
-            from app.utils.email_utils import send_verification_email
-
-            send_verification_email(
-                current_app.extensions["mail"], student.user_email, student.user_id
-            )
-            return success_response(
-                message="Verification email sent. Please check your inbox."
-            )
-        except Exception as e:
-            return error_response(message="Failed to send verification email")
-
-    # Trả về thông báo chung để tránh leak thông tin
+    # Chỉ đưa email vào hàng đợi; trả về thông báo chung để tránh leak thông tin
+    result = auth_service.resend_verification_email(email)
+    if not result["success"]:
+        return error_response(message="Failed to send verification email")
+
     return success_response(
         message="If your email exists in our system, a verification email has been sent."
     )
+
+
 @auth_bp.route("/forgot-password", methods=["POST"])
+@rate_limited("forgot_password")
 def forgot_password():
     data = request.get_json()
     email = data.get("email")
@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify
 from app.services.class_service import ClassService
+from app.services.analytics_service import AnalyticsService
 from app.utils.response_helper import success_response, error_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 class_bp = Blueprint("classes", __name__, url_prefix="/api/classes")
 class_service = ClassService()
+analytics_service = AnalyticsService()
 
 @class_bp.route("", methods=["GET"])
 def get_classes():
@@ -40,7 +42,11 @@ def get_classes():
         if request.args.get("sort_dir"):
             filters["sort_dir"] = request.args.get("sort_dir")
         
-        result = class_service.get_all_classes(page, per_page, filters)
+        # cursor= (có thể rỗng) chuyển sang phân trang keyset thay cho page=
+        cursor = request.args.get("cursor")
+        include_total = request.args.get("include_total") == "true"
+        
+        result = class_service.get_all_classes(page, per_page, filters, cursor, include_total)
         
         if result["success"]:
             return success_response(
@@ -141,6 +147,25 @@ def enroll_student(class_id):
     except Exception as e:
         return error_response(message=f"Error enrolling student: {str(e)}", status_code=500)
 
+@class_bp.route("/<int:class_id>/enroll/bulk", methods=["POST"])
+@jwt_required()
+def bulk_enroll_students(class_id):
+    """Ghi danh nhiều sinh viên vào lớp học (nhập danh sách lớp)"""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get("student_ids"), list):
+            return error_response(message="student_ids (list) is required", status_code=400)
+        
+        result = class_service.bulk_enroll(class_id, data["student_ids"])
+        
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=400)
+    
+    except Exception as e:
+        return error_response(message=f"Error enrolling students: {str(e)}", status_code=500)
+
 @class_bp.route("/<int:class_id>/unenroll", methods=["POST"])
 @jwt_required()
 def unenroll_student(class_id):
@@ -174,6 +199,21 @@ def get_class_metrics(class_id):
     except Exception as e:
         return error_response(message=f"Error retrieving class metrics: {str(e)}", status_code=500)
 
+@class_bp.route("/<int:class_id>/analytics", methods=["GET"])
+@jwt_required()
+def get_class_analytics(class_id):
+    """Thống kê điểm các bài kiểm tra của lớp (trung bình, phân vị, tỉ lệ đạt, histogram)"""
+    try:
+        bins = request.args.get("bins", default=10, type=int)
+        result = analytics_service.get_class_analytics(class_id, bins)
+        
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=404)
+    
+    except Exception as e:
+        return error_response(message=f"Error retrieving class analytics: {str(e)}", status_code=500)
+
 # Route bổ sung: Lấy lớp học theo khóa học
 @class_bp.route("/by-course/<course_id>", methods=["GET"])
 def get_classes_by_course(course_id):
@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 from app.services.course_service import CourseService
+from app.services.analytics_service import AnalyticsService
 from app.utils.response_helper import (
     success_response,
     error_response,
@@ -16,6 +17,7 @@ from sqlalchemy.exc import OperationalError
 
 course_bp = Blueprint("courses", __name__, url_prefix="/api/courses")
 course_service = CourseService()
+analytics_service = AnalyticsService()
 
 
 @course_bp.route("/page", methods=["GET"])
@@ -264,3 +266,16 @@ def learning_paths_by_course(course_id):
         return success_response({"course": course.to_dict(), "learning_paths": data})
     except Exception as e:
         return error_response(f"Lỗi khi lấy lộ trình của khóa học: {str(e)}", 500)
+
+
+@course_bp.route("/<course_id>/analytics", methods=["GET"])
+def course_analytics(course_id):
+    """Thống kê điểm các bài kiểm tra trên tất cả các lớp của khóa học"""
+    try:
+        bins = request.args.get("bins", default=10, type=int)
+        result = analytics_service.get_course_analytics(course_id, bins)
+        if result["success"]:
+            return success_response(result["data"])
+        return error_response(result["error"], 404)
+    except Exception as e:
+        return error_response(f"Lỗi khi thống kê điểm của khóa học: {str(e)}", 500)
@@ -0,0 +1,58 @@
+from flask import Blueprint, request
+from app.services.review_service import ReviewService
+from app.utils.response_helper import success_response, error_response
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+review_bp = Blueprint("reviews", __name__, url_prefix="/api/reviews")
+review_service = ReviewService()
+
+
+def _current_student_id():
+    """ID học viên đang đăng nhập, None nếu không phải học viên"""
+    current_user = get_jwt_identity()
+    if not isinstance(current_user, dict) or current_user.get("role") != "student":
+        return None
+    return current_user.get("user_id")
+
+
+@review_bp.route("/due", methods=["GET"])
+@jwt_required()
+def get_due_words():
+    """Lấy các từ đến hạn ôn tập của học viên"""
+    try:
+        student_id = _current_student_id()
+        if not student_id:
+            return error_response(message="Access denied", status_code=403)
+
+        limit = request.args.get("limit", type=int)
+        result = review_service.get_due_words(student_id, limit)
+
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=400)
+
+    except Exception as e:
+        return error_response(message=f"Error retrieving due words: {str(e)}", status_code=500)
+
+
+@review_bp.route("/submit", methods=["POST"])
+@jwt_required()
+def submit_answers():
+    """Nộp kết quả một buổi ôn tập (nhiều từ trong một transaction)"""
+    try:
+        student_id = _current_student_id()
+        if not student_id:
+            return error_response(message="Access denied", status_code=403)
+
+        data = request.get_json()
+        if not data or not isinstance(data.get("answers"), list):
+            return error_response(message="answers (list) is required", status_code=400)
+
+        result = review_service.submit_answers(student_id, data["answers"])
+
+        if result["success"]:
+            return success_response(data=result["data"], message=result["message"], status_code=200)
+        return error_response(message=result["error"], status_code=400)
+
+    except Exception as e:
+        return error_response(message=f"Error submitting answers: {str(e)}", status_code=500)
@@ -1,10 +1,19 @@
 from flask import Blueprint, request
 from app.services.schedule_service import ScheduleService
-from app.utils.response_helper import success_response, error_response
+from app.services.calendar_service import CalendarService
+from app.services.auto_schedule_service import AutoScheduleService
+from app.utils.response_helper import (
+    success_response,
+    success_raw_response,
+    success_stream_response,
+    error_response,
+)
 from flask_jwt_extended import jwt_required
 
 schedule_bp = Blueprint("schedules", __name__, url_prefix="/api/schedules")
 schedule_service = ScheduleService()
+calendar_service = CalendarService()
+auto_schedule_service = AutoScheduleService(schedule_service=schedule_service)
 
 
 # Lấy lịch học theo ID
@@ -116,6 +125,45 @@ def find_available_rooms():
     return error_response(result["error"], 400)
 
 
+# Ma trận phòng trống cho cả khoảng ngày (ví dụ một tuần)
+@schedule_bp.route("/available-rooms/range", methods=["GET"])
+@jwt_required()
+def find_available_rooms_range():
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+
+    if not start_date or not end_date:
+        return error_response("Missing required parameters: start_date, end_date", 400)
+
+    # slots=08:00-09:30,09:45-11:15 (không bắt buộc)
+    slots = None
+    if request.args.get("slots"):
+        try:
+            slots = [
+                tuple(part.strip().split("-", 1))
+                for part in request.args["slots"].split(",")
+                if part.strip()
+            ]
+        except ValueError:
+            return error_response("Invalid slots format. Use HH:MM-HH:MM,...", 400)
+        if any(len(slot) != 2 for slot in slots):
+            return error_response("Invalid slots format. Use HH:MM-HH:MM,...", 400)
+
+    result = schedule_service.find_available_rooms_range(
+        start_date,
+        end_date,
+        slots=slots,
+        slot_minutes=request.args.get("slot_minutes", 60, type=int),
+        day_start_str=request.args.get("day_start", "08:00"),
+        day_end_str=request.args.get("day_end", "18:00"),
+        min_capacity=request.args.get("min_capacity", type=int),
+        room_status=request.args.get("room_status", "AVAILABLE") or None,
+    )
+    if result["success"]:
+        return success_response(result["data"])
+    return error_response(result["error"], 400)
+
+
 # Tạo lịch học lặp lại
 @schedule_bp.route("/recurring", methods=["POST"])
 @jwt_required()
@@ -132,12 +180,42 @@ def create_recurring_schedule():
     weekdays = data.get("weekdays")
 
     result = schedule_service.create_recurring_schedule(
-        data["base_data"], data["recurrence_type"], data["end_date"], weekdays
+        data["base_data"],
+        data["recurrence_type"],
+        data["end_date"],
+        weekdays,
+        bulk=data.get("bulk", True),
+        all_or_nothing=data.get("all_or_nothing", False),
     )
 
     if result["success"]:
         return success_response(result["data"], 201)
-    return error_response(result["error"], 400)
+    return error_response(result["error"], 400, details=result.get("data"))
+
+
+# Tự động xếp thời khóa biểu cho nhiều lớp
+@schedule_bp.route("/auto", methods=["POST"])
+@jwt_required()
+def generate_timetable():
+    data = request.get_json()
+    if not data:
+        return error_response("Missing required parameters", 400)
+
+    # slots: ["08:00-09:30", ...] hoặc [["08:00", "09:30"], ...]
+    if data.get("slots"):
+        slots = [
+            tuple(slot.split("-", 1)) if isinstance(slot, str) else tuple(slot)
+            for slot in data["slots"]
+        ]
+        if any(len(slot) != 2 for slot in slots):
+            return error_response("Invalid slots format. Use HH:MM-HH:MM", 400)
+        data["slots"] = slots
+
+    result = auto_schedule_service.generate_timetable(data)
+
+    if result["success"]:
+        return success_response(result["data"], status_code=200 if data.get("dry_run") else 201)
+    return error_response(result["error"], 400, details=result.get("data"))
 
 
 # Kiểm tra tình trạng sẵn sàng của giáo viên
@@ -147,17 +225,27 @@ def get_teacher_availability(teacher_id):
     date = request.args.get("date")
     start_date = request.args.get("start_date")
     end_date = request.args.get("end_date")
+    cursor = request.args.get("cursor")
+    limit = request.args.get("limit", type=int)
+    stream = request.args.get("stream", "false").lower() in ("1", "true", "yes")
 
     if date:
-        result = schedule_service.get_teacher_availability(teacher_id, date_str=date)
+        result = schedule_service.get_teacher_availability(
+            teacher_id, date_str=date, cursor=cursor, limit=limit, stream=stream
+        )
     elif start_date and end_date:
         result = schedule_service.get_teacher_availability(
-            teacher_id, start_date_str=start_date, end_date_str=end_date
+            teacher_id, start_date_str=start_date, end_date_str=end_date,
+            cursor=cursor, limit=limit, stream=stream
         )
     else:
-        result = schedule_service.get_teacher_availability(teacher_id)
+        result = schedule_service.get_teacher_availability(
+            teacher_id, cursor=cursor, limit=limit, stream=stream
+        )
 
     if result["success"]:
+        if stream:
+            return success_stream_response(result["data"])
         return success_response(result["data"])
     return error_response(result["error"], 400)
 
@@ -171,6 +259,13 @@ def get_class_schedule(class_id):
     if format_type not in ["list", "calendar"]:
         return error_response("Format type must be 'list' or 'calendar'", 400)
 
+    if format_type == "calendar":
+        # Calendar được phục vụ từ projection đã serialize sẵn, hỗ trợ If-None-Match
+        result = calendar_service.get_class_calendar(class_id)
+        if result["success"]:
+            return success_raw_response(result["data"]["body"], etag=result["data"]["etag"])
+        return error_response(result["error"], 404)
+
     result = schedule_service.get_class_schedule(class_id, format_type)
 
     if result["success"]:
@@ -21,10 +21,13 @@ def get_students():
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 10, type=int)
         search = request.args.get("search", None)
+        # cursor= (may be empty) switches to keyset pagination instead of page=
+        cursor = request.args.get("cursor")
+        include_total = request.args.get("include_total") == "true"
         
         # Handle search query if provided
         if search:
-            result = student_service.search_students(search, page, per_page)
+            result = student_service.search_students(search, page, per_page, cursor, include_total)
             if result["success"]:
                 return success_response(data=result["data"])
             return error_response(message=result["error"])
@@ -43,13 +46,13 @@ def get_students():
                     filters[field] = request.args[field]
         
         if filters:
-            result = student_service.filter_students(filters, page, per_page)
+            result = student_service.filter_students(filters, page, per_page, cursor, include_total)
             if result["success"]:
                 return success_response(data=result["data"])
             return error_response(message=result["error"])
         
         # Default: get all students with pagination
-        result = student_service.get_all_students(page, per_page)
+        result = student_service.get_all_students(page, per_page, cursor, include_total)
         if result["success"]:
             return success_response(data=result["data"])
         return error_response(message=result["error"])
@@ -0,0 +1,108 @@
+from flask import Blueprint, request
+from app.services.grading_service import GradingService
+from app.utils.response_helper import success_response, error_response
+from app.utils.auth_utils import admin_required, teacher_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+test_bp = Blueprint("tests", __name__, url_prefix="/api/tests")
+grading_service = GradingService()
+
+
+@test_bp.route("/answer-key-cache", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_answer_key_cache_stats():
+    """Số liệu cache đáp án (hit/miss, số bài đang giữ)"""
+    result = grading_service.get_cache_stats()
+    return success_response(data=result["data"], status_code=200)
+
+
+@test_bp.route("/answer-key-cache/invalidate", methods=["POST"])
+@jwt_required()
+@admin_required
+def invalidate_answer_key_cache():
+    """Buộc mọi worker nạp lại đáp án của một bài ({"test_id": ...}) hoặc tất cả"""
+    data = request.get_json(silent=True) or {}
+    test_id = data.get("test_id")
+    if test_id is not None and not isinstance(test_id, int):
+        return error_response(message="test_id must be an integer", status_code=400)
+
+    result = grading_service.invalidate_answer_key(test_id)
+    if result["success"]:
+        return success_response(data=result["data"], status_code=200)
+    return error_response(message=result["error"], status_code=500)
+
+
+@test_bp.route("/<int:test_id>", methods=["GET"])
+def get_test(test_id):
+    """Lấy thông tin bài kiểm tra"""
+    try:
+        result = grading_service.get_test(test_id)
+
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=404)
+
+    except Exception as e:
+        return error_response(message=f"Error retrieving test: {str(e)}", status_code=500)
+
+
+@test_bp.route("/<int:test_id>/questions", methods=["GET"])
+@jwt_required()
+def get_test_questions(test_id):
+    """Lấy câu hỏi và phương án của bài kiểm tra (không kèm đáp án)"""
+    try:
+        result = grading_service.get_test_questions(test_id)
+
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=404)
+
+    except Exception as e:
+        return error_response(message=f"Error retrieving questions: {str(e)}", status_code=500)
+
+
+@test_bp.route("/<int:test_id>/submit", methods=["POST"])
+@jwt_required()
+def submit_test(test_id):
+    """Học viên nộp bài kiểm tra"""
+    try:
+        current_user = get_jwt_identity()
+        if not isinstance(current_user, dict) or current_user.get("role") != "student":
+            return error_response(message="Access denied", status_code=403)
+
+        data = request.get_json()
+        if not data or "class_id" not in data or "answers" not in data:
+            return error_response(message="class_id and answers are required", status_code=400)
+
+        result = grading_service.submit_test(
+            test_id, current_user.get("user_id"), data["class_id"], data["answers"]
+        )
+
+        if result["success"]:
+            return success_response(data=result["data"], message=result["message"], status_code=200)
+        return error_response(message=result["error"], status_code=400)
+
+    except Exception as e:
+        return error_response(message=f"Error submitting test: {str(e)}", status_code=500)
+
+
+@test_bp.route("/<int:test_id>/classes/<int:class_id>/grade", methods=["POST"])
+@jwt_required()
+@teacher_required
+def grade_class(test_id, class_id):
+    """Chấm bài nộp của cả lớp"""
+    try:
+        data = request.get_json()
+
+        if not data or not isinstance(data.get("submissions"), list):
+            return error_response(message="submissions (list) is required", status_code=400)
+
+        result = grading_service.grade_class(test_id, class_id, data["submissions"])
+
+        if result["success"]:
+            return success_response(data=result["data"], status_code=200)
+        return error_response(message=result["error"], status_code=400)
+
+    except Exception as e:
+        return error_response(message=f"Error grading submissions: {str(e)}", status_code=500)
@@ -0,0 +1,106 @@
+from typing import Dict, Any, Optional
+from flask import current_app
+from sqlalchemy import func
+
+from app.config import db
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.score_model import Score
+from app.models.test_model import Test
+from app.utils.score_statistics import summarize, DEFAULT_BINS
+
+MAX_BINS = 100
+
+
+class AnalyticsService:
+    """Service thống kê điểm theo lớp học hoặc khóa học"""
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def get_class_analytics(self, class_id: int, bins: int = DEFAULT_BINS) -> Dict[str, Any]:
+        """Thống kê điểm từng bài kiểm tra của một lớp"""
+        try:
+            class_row = self.db.session.query(Class.class_id, Class.class_name).filter(
+                Class.class_id == class_id
+            ).first()
+            if not class_row:
+                return {"success": False, "error": f"Class with ID {class_id} not found"}
+
+            tests = self._score_analytics(Score.class_id == class_id, bins)
+            return {
+                "success": True,
+                "data": {"class_id": class_row.class_id, "class_name": class_row.class_name, "tests": tests},
+            }
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_class_analytics: {str(e)}")
+            return {"success": False, "error": f"Error retrieving class analytics: {str(e)}"}
+
+    def get_course_analytics(self, course_id: str, bins: int = DEFAULT_BINS) -> Dict[str, Any]:
+        """Thống kê điểm từng bài kiểm tra trên tất cả các lớp của một khóa học"""
+        try:
+            course_row = self.db.session.query(Course.course_id, Course.course_name).filter(
+                Course.course_id == course_id
+            ).first()
+            if not course_row:
+                return {"success": False, "error": f"Course with ID {course_id} not found"}
+
+            class_ids = self.db.session.query(Class.class_id).filter(Class.course_id == course_id)
+            tests = self._score_analytics(Score.class_id.in_(class_ids.scalar_subquery()), bins)
+            return {
+                "success": True,
+                "data": {"course_id": course_row.course_id, "course_name": course_row.course_name, "tests": tests},
+            }
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_course_analytics: {str(e)}")
+            return {"success": False, "error": f"Error retrieving course analytics: {str(e)}"}
+
+    def _score_analytics(self, condition, bins: int) -> list:
+        """
+        Một truy vấn GROUP BY (test, điểm) -> bảng tần suất từng bài -> thống kê
+
+        Số dòng trả về bằng số mức điểm khác nhau của mỗi bài, không phụ thuộc
+        số bài làm; index (class_id, test_id, sc_score) phủ toàn bộ phần đọc scores.
+        """
+        bins = min(max(1, bins or DEFAULT_BINS), MAX_BINS)
+        rows = (
+            self.db.session.query(
+                Score.test_id, Test.test_name, Test.test_total_score, Test.test_passing_score,
+                Score.sc_score, func.count().label("count"),
+            )
+            .join(Test, Test.test_id == Score.test_id)
+            .filter(condition, Score.sc_score.isnot(None))
+            .group_by(Score.test_id, Test.test_name, Test.test_total_score, Test.test_passing_score, Score.sc_score)
+            .all()
+        )
+
+        by_test: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            entry = by_test.get(row.test_id)
+            if entry is None:
+                entry = by_test[row.test_id] = {
+                    "test_name": row.test_name,
+                    "total_score": self._as_float(row.test_total_score),
+                    "passing_score": self._as_float(row.test_passing_score),
+                    "frequencies": {},
+                }
+            entry["frequencies"][row.sc_score] = entry["frequencies"].get(row.sc_score, 0) + row.count
+
+        return [
+            dict(
+                {
+                    "test_id": test_id,
+                    "test_name": entry["test_name"],
+                    "total_score": entry["total_score"],
+                    "passing_score": entry["passing_score"],
+                },
+                **summarize(entry["frequencies"], entry["passing_score"], entry["total_score"], bins),
+            )
+            for test_id, entry in sorted(by_test.items())
+        ]
+
+    @staticmethod
+    def _as_float(value) -> Optional[float]:
+        return None if value is None else float(value)
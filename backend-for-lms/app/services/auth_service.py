@@ -7,14 +7,20 @@ from flask import current_app
 from app.config import db
 from app.models.student_model import Student
 from app.models.teacher_model import Teacher
-from werkzeug.security import check_password_hash
-from app.config import mail
-from flask_mail import Message
+from app.services.credential_service import CredentialService
+from app.services.mail_queue_service import MailQueueService
+from app.services.token_session_service import TokenSessionService, TOKEN_LIFETIME, epoch_ms
+from app.utils.id_allocator import ids
+from app.utils.password_hashing import HashingBusyError, needs_rehash, verify_password
+from app.utils.email_utils import send_verification_email
 
 
 class AuthService:
     def __init__(self, database=None):
         self.db = database or db
+        self.credentials = CredentialService(self.db)
+        self.mail_queue = MailQueueService(self.db)
+        self.sessions = TokenSessionService(self.db)
 
     def login(self, email: str, password: str) -> Dict[str, Any]:
         """
@@ -28,42 +34,47 @@ class AuthService:
             Dict với access_token, user_info và role nếu thành công,
             Dict với error nếu thất bại
         """
-        # Kiểm tra teacher
-        teacher = self.db.session.query(Teacher).filter_by(user_email=email).first()
-        if teacher is not None and teacher.check_password(password):
-            # Với teacher, có thể không cần xác minh email
-            access_token = self._create_token(teacher.user_id, "teacher")
+        # Một lần tra cứu theo email trên user_credentials (teacher hoặc student)
+        credential = self.credentials.lookup(email)
+        if credential is None or not credential.password_hash:
+            return {"success": False, "error": "Invalid email or password"}
+        try:
+            if not verify_password(credential.password_hash, password):
+                return {"success": False, "error": "Invalid email or password"}
+        except HashingBusyError:
+            return {"success": False, "error": "Server is busy, please try again", "status_code": 503}
+
+        # Với teacher, không cần xác minh email; student chỉ được đăng nhập khi đã xác minh
+        if credential.role == "student" and not credential.is_email_verified:
             return {
-                "success": True,
-                "access_token": access_token,
-                "user": teacher.to_dict(),
-                "role": "teacher",
+                "success": False,
+                "error": "Email not verified. Please check your inbox and verify your email before logging in.",
             }
 
-        # Kiểm tra student
-        student = self.db.session.query(Student).filter_by(user_email=email).first()
+        user = self.credentials.load_user(credential)
+        if user is None:
+            return {"success": False, "error": "Invalid email or password"}
 
-        # Ensure we do not access attributes on None and avoid leaking sensitive data
-        if student is not None and student.check_password(password):
+        # Nâng cấp hash cũ theo cấu hình hiện tại khi đã có mật khẩu gốc
+        if needs_rehash(credential.password_hash):
+            self._rehash_password(user, password)
 
-            # Kiểm tra xem email đã được xác minh chưa
-            if not student.is_email_verified:
-                return {
-                    "success": False,
-                    "error": "Email not verified. Please check your inbox and verify your email before logging in.",
-                }
-
-            # Chỉ cho đăng nhập nếu email đã xác minh
-            access_token = self._create_token(student.user_id, "student")
-            return {
-                "success": True,
-                "access_token": access_token,
-                "user": student.to_dict(),
-                "role": "student",
-            }
+        access_token = self._create_token(user.user_id, credential.role)
+        return {
+            "success": True,
+            "access_token": access_token,
+            "user": user.to_dict(),
+            "role": credential.role,
+        }
 
-        # Không tìm thấy hoặc sai mật khẩu
-        return {"success": False, "error": "Invalid email or password"}
+    def _rehash_password(self, user, password: str) -> None:
+        """Băm lại mật khẩu bằng phương thức hiện tại; lỗi không làm hỏng đăng nhập"""
+        try:
+            user.set_password(password)
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in _rehash_password: {str(e)}")
 
     def register_student(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -91,24 +102,14 @@ class AuthService:
             # Thiết lập trạng thái xác thực email
             data["is_email_verified"] = False
 
-            # Tạo token xác minh email
-            verification_token = self._generate_verification_token()
-
             student = Student(user_id=user_id, **data)
             student.set_password(password)
 
             self.db.session.add(student)
+            # Email xác nhận được đưa vào hàng đợi và lưu cùng transaction với học viên
+            self._send_verification_email(student.user_email, student.user_id, commit=False)
             self.db.session.commit()
 
-            # Gửi email xác nhận
-            try:
-                self._send_verification_email(
-                    student.user_email, student.user_id, verification_token
-                )
-            except Exception as e:
-                # Log lỗi nhưng không làm fail quá trình đăng ký
-                current_app.logger.error(f"Error sending verification email: {e}")
-
             # Tạo token đăng nhập (nhưng người dùng vẫn cần xác minh email để đăng nhập)
             access_token = self._create_token(student.user_id, "student")
 
@@ -178,17 +179,7 @@ class AuthService:
         Returns:
             (is_valid, payload): Tuple gồm trạng thái token và thông tin trong token
         """
-        try:
-            from flask import current_app
-
-            payload = jwt.decode(
-                token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"]
-            )
-            return True, payload
-        except jwt.ExpiredSignatureError:
-            return False, {"error": "Token expired"}
-        except jwt.InvalidTokenError:
-            return False, {"error": "Invalid token"}
+        return self.sessions.verify(token)
 
     def get_user_by_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
@@ -200,23 +191,24 @@ class AuthService:
         Returns:
             Dict thông tin user hoặc None nếu token không hợp lệ
         """
-        is_valid, payload = self.verify_token(token)
-        if not is_valid:
-            return None
+        return self.sessions.get_user(token)
 
-        user_id = payload.get("sub")
-        role = payload.get("role")
+    def logout(self, token: str) -> Dict[str, Any]:
+        """
+        Đăng xuất: thu hồi token hiện tại
 
-        if role == "teacher":
-            teacher = self.db.session.query(Teacher).filter_by(user_id=user_id).first()
-            if teacher:
-                return {"user": teacher.to_dict(), "role": "teacher"}
-        elif role == "student":
-            student = self.db.session.query(Student).filter_by(user_id=user_id).first()
-            if student:
-                return {"user": student.to_dict(), "role": "student"}
+        Args:
+            token: JWT token cần thu hồi
 
-        return None
+        Returns:
+            Dict kết quả đăng xuất
+        """
+        try:
+            if not self.sessions.revoke_token(token):
+                return {"success": False, "error": "Invalid token"}
+            return {"success": True, "message": "Logged out successfully"}
+        except Exception as e:
+            return {"success": False, "error": f"Logout failed: {str(e)}"}
 
     def change_password(
         self, user_id: str, role: str, old_password: str, new_password: str
@@ -247,9 +239,11 @@ class AuthService:
             if not user.check_password(old_password):
                 return {"success": False, "error": "Incorrect old password"}
 
-            # Đặt mật khẩu mới
+            # Đặt mật khẩu mới và thu hồi các token đã phát hành trước đó trong cùng transaction
             user.set_password(new_password)
+            revocation = self.sessions.stage_user_revocation(role, user_id)
             self.db.session.commit()
+            self.sessions.apply_revocation(revocation)
 
             return {"success": True, "message": "Password changed successfully"}
 
@@ -293,26 +287,16 @@ class AuthService:
             Dict kết quả xử lý
         """
         try:
-            # Kiểm tra email tồn tại - ưu tiên student trước
-            student = self.db.session.query(Student).filter_by(user_email=email).first()
-            teacher = None
-
-            if student:
-                user_id = student.user_id
-                role = "student"
-            else:
-                teacher = (
-                    self.db.session.query(Teacher).filter_by(user_email=email).first()
-                )
-                if teacher:
-                    user_id = teacher.user_id
-                    role = "teacher"
-                else:
-                    # Trả về thành công dù không tìm thấy để tránh lộ thông tin
-                    return {
-                        "success": True,
-                        "message": "If your email exists, a password reset link has been sent",
-                    }
+            # Kiểm tra email tồn tại
+            credential = self.credentials.lookup(email)
+            if credential is None:
+                # Trả về thành công dù không tìm thấy để tránh lộ thông tin
+                return {
+                    "success": True,
+                    "message": "If your email exists, a password reset link has been sent",
+                }
+            user_id = credential.user_id
+            role = credential.role
 
             # Tạo JWT token cho reset password
             payload = {
@@ -344,7 +328,7 @@ class AuthService:
             }
 
     def _send_password_reset_email(self, email, user_id, token):
-        """Gửi email đặt lại mật khẩu"""
+        """Đưa email đặt lại mật khẩu vào hàng đợi gửi"""
         # URL đặt lại mật khẩu - sử dụng FRONTEND_URL từ config
         reset_url = f"{current_app.config.get('FRONTEND_URL', 'http://localhost:5173')}/login?mode=reset/{token}"
 
@@ -358,8 +342,7 @@ class AuthService:
         <p>Nếu bạn không yêu cầu đặt lại mật khẩu, vui lòng bỏ qua email này.</p>
         """
 
-        msg = Message(subject=subject, recipients=[email], html=html_body)
-        mail.send(msg)
+        self.mail_queue.enqueue(email, subject, html_body)
 
     def verify_reset_token(self, token: str) -> Dict[str, Any]:
         """
@@ -421,9 +404,11 @@ class AuthService:
             if not user:
                 return {"success": False, "message": "User not found"}
 
-            # Cập nhật mật khẩu
+            # Cập nhật mật khẩu và thu hồi các token đã phát hành trước đó trong cùng transaction
             user.set_password(new_password)
+            revocation = self.sessions.stage_user_revocation(role, user_id)
             self.db.session.commit()
+            self.sessions.apply_revocation(revocation)
 
             return {"success": True, "message": "Password has been reset successfully"}
 
@@ -441,12 +426,14 @@ class AuthService:
         if not secret_key:
             raise ValueError("JWT_SECRET_KEY not configured")
 
+        issued_at = datetime.datetime.utcnow()
         payload = {
             "sub": user_id,  # subject (user_id)
             "role": role,  # role (teacher/student)
-            "iat": datetime.datetime.utcnow(),  # issued at
-            "exp": datetime.datetime.utcnow()
-            + datetime.timedelta(hours=24),  # hết hạn sau 24h
+            "iat": issued_at,  # issued at
+            "iat_ms": epoch_ms(issued_at),  # issued at (mili giây), so với thời điểm thu hồi
+            "exp": issued_at + TOKEN_LIFETIME,  # hết hạn sau 24h
+            "jti": secrets.token_hex(16),  # token id, dùng để thu hồi khi đăng xuất
         }
 
         token = jwt.encode(payload, secret_key, algorithm="HS256")
@@ -455,92 +442,19 @@ class AuthService:
 
     def _check_email_exists(self, email: str) -> bool:
         """Kiểm tra email đã tồn tại chưa"""
-        if not email:
-            return False
-
-        teacher = self.db.session.query(Teacher).filter_by(user_email=email).first()
-        if teacher:
-            return True
-
-        student = self.db.session.query(Student).filter_by(user_email=email).first()
-        if student:
-            return True
-
-        return False
+        return self.credentials.email_exists(email)
 
     def _generate_student_id(self) -> str:
         """Sinh ID học viên tự động"""
-        last_student = (
-            self.db.session.query(Student).order_by(Student.user_id.desc()).first()
-        )
-
-        if not last_student:
-            return "S00000001"  # ID đầu tiên
-
-        if last_student.user_id.startswith("S") and len(last_student.user_id) == 9:
-            try:
-                num = int(last_student.user_id[1:])
-                return f"S{(num + 1):08d}"
-            except ValueError:
-                pass
-
-        # Fallback: số học viên + 1
-        count = self.db.session.query(Student).count()
-        return f"S{(count + 1):08d}"
+        return ids.next_id("student")
 
     def _generate_teacher_id(self) -> str:
         """Sinh ID giáo viên tự động"""
-        last_teacher = (
-            self.db.session.query(Teacher).order_by(Teacher.user_id.desc()).first()
-        )
-
-        if not last_teacher:
-            return "T00000001"  # ID đầu tiên
-
-        if last_teacher.user_id.startswith("T") and len(last_teacher.user_id) == 9:
-            try:
-                num = int(last_teacher.user_id[1:])
-                return f"T{(num + 1):08d}"
-            except ValueError:
-                pass
-
-        # Fallback: số giáo viên + 1
-        count = self.db.session.query(Teacher).count()
-        return f"T{(count + 1):08d}"
-
-    def _generate_verification_token(self) -> str:
-        """Tạo JWT token cho xác minh email"""
-        return secrets.token_urlsafe(32)
-
-    def _send_verification_email(self, email, user_id, token):
-        """Gửi email xác nhận tới người dùng"""
-        # Tạo JWT token chứa thông tin user_id
-        payload = {
-            "user_id": user_id,
-            "purpose": "email_verification",
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(days=1),
-        }
+        return ids.next_id("teacher")
 
-        jwt_token = jwt.encode(
-            payload, current_app.config.get("JWT_SECRET_KEY"), algorithm="HS256"
-        )
-
-        # URL xác minh với token
-        verification_url = f"{current_app.config.get('BASE_URL', 'http://localhost:5000')}/api/auth/verify-email/{jwt_token}"
-
-        subject = "Xác minh tài khoản LMS của bạn"
-
-        html_body = f"""
-        <h2>Xác minh tài khoản của bạn</h2>
-        <p>Cảm ơn bạn đã đăng ký tài khoản trên hệ thống LMS.</p>
-        <p>Vui lòng nhấn vào <a href="{verification_url}">liên kết này</a> để xác minh tài khoản.</p>
-        <p>Liên kết này sẽ hết hạn sau 24 giờ.</p>
-        <p>Nếu bạn không yêu cầu đăng ký này, vui lòng bỏ qua email này.</p>
-        """
-
-        msg = Message(subject=subject, recipients=[email], html=html_body)
-
-        mail.send(msg)
+    def _send_verification_email(self, email, user_id, commit=True):
+        """Đưa email xác nhận tới người dùng vào hàng đợi gửi"""
+        return send_verification_email(email, user_id, commit=commit)
 
     def _decode_verification_token(self, token):
         """Giải mã token xác minh email"""
@@ -624,11 +538,8 @@ class AuthService:
             if student.is_email_verified:
                 return {"success": True, "message": "Email already verified"}
 
-            # Tạo token mới và gửi email
-            verification_token = self._generate_verification_token()
-            self._send_verification_email(
-                student.user_email, student.user_id, verification_token
-            )
+            # Tạo token mới và đưa email vào hàng đợi gửi
+            self._send_verification_email(student.user_email, student.user_id)
 
             return {"success": True, "message": "Verification email has been sent"}
 
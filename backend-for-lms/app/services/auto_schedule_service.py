@@ -0,0 +1,235 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+import time as _time
+from flask import current_app
+from sqlalchemy import or_
+
+from app.config import db
+from app.models.schedule_model import Schedule
+from app.models.class_model import Class
+from app.models.teacher_model import Teacher
+from app.models.room_model import Room
+from app.services.schedule_service import ScheduleService
+from app.utils.interval_index import slot_mask, time_to_seconds
+from app.utils.timetable_solver import TimetableSolver
+
+
+class AutoScheduleService:
+    """Service tự động xếp thời khóa biểu cho nhiều lớp"""
+
+    # Ca học mặc định trong ngày
+    DEFAULT_SLOTS = [
+        ("07:30", "09:00"),
+        ("09:15", "10:45"),
+        ("13:30", "15:00"),
+        ("15:15", "16:45"),
+        ("18:00", "19:30"),
+        ("19:45", "21:15"),
+    ]
+    # Thứ 2 -> Thứ 7
+    DEFAULT_WEEKDAYS = [0, 1, 2, 3, 4, 5]
+    MAX_PLAN_DAYS = 366
+
+    def __init__(self, database=None, schedule_service: Optional[ScheduleService] = None):
+        self.db = database or db
+        self.schedule_service = schedule_service or ScheduleService(self.db)
+
+    def generate_timetable(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Xếp lịch tuần cho các lớp rồi nhân ra toàn bộ khoảng ngày
+
+        Args:
+            data: Dict gồm
+                - start_date, end_date: Khoảng ngày áp dụng (YYYY-MM-DD)
+                - classes: [{"class_id", "user_id" (giáo viên), "sessions_per_week"}]
+                - slots: Danh sách ca (HH:MM, HH:MM), mặc định DEFAULT_SLOTS
+                - weekdays: Các thứ được xếp (0=Thứ 2 ... 6=Chủ Nhật), mặc định Thứ 2 - Thứ 7
+                - room_ids: Chỉ dùng các phòng này (mặc định mọi phòng AVAILABLE)
+                - dry_run: True để chỉ trả về phương án, không ghi database
+                - all_or_nothing: Truyền cho bulk_create_schedules
+
+        Returns:
+            Dict chứa phương án theo tuần, các lớp không xếp được và kết quả ghi lịch
+        """
+        try:
+            missing_fields = [f for f in ("start_date", "end_date", "classes") if not data.get(f)]
+            if missing_fields:
+                return {"success": False, "error": f"Missing required fields: {', '.join(missing_fields)}"}
+
+            start_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
+            end_date = datetime.strptime(data["end_date"], "%Y-%m-%d").date()
+            if end_date < start_date:
+                return {"success": False, "error": "End date must be after start date"}
+            if (end_date - start_date).days >= self.MAX_PLAN_DAYS:
+                return {"success": False, "error": f"Date range must not exceed {self.MAX_PLAN_DAYS} days"}
+
+            slot_times = sorted(
+                (datetime.strptime(s, "%H:%M").time(), datetime.strptime(e, "%H:%M").time())
+                for s, e in (data.get("slots") or self.DEFAULT_SLOTS)
+            )
+            if any(s >= e for s, e in slot_times):
+                return {"success": False, "error": "Each slot must end after it starts"}
+            if any(slot_times[i][1] > slot_times[i + 1][0] for i in range(len(slot_times) - 1)):
+                return {"success": False, "error": "Slots must not overlap"}
+
+            weekdays = sorted(set(int(d) for d in (data.get("weekdays") or self.DEFAULT_WEEKDAYS)))
+            if any(d < 0 or d > 6 for d in weekdays):
+                return {"success": False, "error": "Weekdays must be between 0 and 6"}
+
+            # Gộp yêu cầu theo lớp
+            requests = {}
+            for item in data["classes"]:
+                if "class_id" not in item or "user_id" not in item:
+                    return {"success": False, "error": "Each class needs class_id and user_id"}
+                requests[int(item["class_id"])] = {
+                    "user_id": item["user_id"],
+                    "sessions": int(item.get("sessions_per_week", 1)),
+                }
+
+            # Lớp, giáo viên, phòng: mỗi bảng một truy vấn
+            classes = {
+                row.class_id: row
+                for row in self.db.session.query(
+                    Class.class_id, Class.class_maxstudents, Class.class_startdate, Class.class_enddate
+                ).filter(Class.class_id.in_(requests))
+            }
+            teacher_ids = {request["user_id"] for request in requests.values()}
+            teachers = {
+                row[0] for row in self.db.session.query(Teacher.user_id).filter(Teacher.user_id.in_(teacher_ids))
+            }
+
+            room_query = self.db.session.query(Room.room_id, Room.room_capacity)
+            if data.get("room_ids"):
+                room_query = room_query.filter(Room.room_id.in_([int(r) for r in data["room_ids"]]))
+            else:
+                room_query = room_query.filter(Room.room_status == "AVAILABLE")
+            rooms = {row.room_id: row.room_capacity for row in room_query}
+            if not rooms:
+                return {"success": False, "error": "No rooms available for scheduling"}
+
+            unassigned = []
+            solver_requests = []
+            for class_id, request in requests.items():
+                if class_id not in classes:
+                    unassigned.append({"class_id": class_id, "error": f"Class with ID {class_id} not found"})
+                elif request["user_id"] not in teachers:
+                    unassigned.append({"class_id": class_id, "error": f"Teacher with ID {request['user_id']} not found"})
+                else:
+                    solver_requests.append({
+                        "key": class_id,
+                        "teacher": request["user_id"],
+                        "size": classes[class_id].class_maxstudents or 0,
+                        "sessions": request["sessions"],
+                    })
+
+            solver = TimetableSolver(len(weekdays), len(slot_times), rooms)
+            self._block_existing(solver, start_date, end_date, weekdays, slot_times, set(rooms), teacher_ids)
+
+            started = _time.perf_counter()
+            solution = solver.solve(solver_requests)
+            solve_ms = (_time.perf_counter() - started) * 1000
+
+            for class_id, reason in solution["unassigned"].items():
+                unassigned.append({"class_id": class_id, "error": reason})
+
+            # Phương án tuần và các dòng lịch cụ thể
+            pattern = []
+            rows = []
+            for class_id, cells in solution["assignments"].items():
+                class_row = classes[class_id]
+                first = max(start_date, class_row.class_startdate or start_date)
+                last = min(end_date, class_row.class_enddate or end_date)
+                user_id = requests[class_id]["user_id"]
+                for day, slot, room_id in cells:
+                    weekday = weekdays[day]
+                    start_time, end_time = slot_times[slot]
+                    pattern.append({
+                        "class_id": class_id,
+                        "user_id": user_id,
+                        "room_id": room_id,
+                        "weekday": weekday,
+                        "schedule_startime": start_time.strftime("%H:%M"),
+                        "schedule_endtime": end_time.strftime("%H:%M"),
+                    })
+                    current = first + timedelta(days=(weekday - first.weekday()) % 7)
+                    while current <= last:
+                        rows.append({
+                            "room_id": room_id,
+                            "class_id": class_id,
+                            "user_id": user_id,
+                            "schedule_date": current,
+                            "schedule_startime": start_time,
+                            "schedule_endtime": end_time,
+                        })
+                        current += timedelta(days=7)
+
+            rows.sort(key=lambda row: (row["schedule_date"], row["schedule_startime"], row["class_id"]))
+            result = {
+                "pattern": pattern,
+                "unassigned": unassigned,
+                "planned_count": len(rows),
+                "dry_run": bool(data.get("dry_run")),
+                "stats": {
+                    "classes": len(solver_requests),
+                    "rooms": len(rooms),
+                    "backtracks": solution["backtracks"],
+                    "steps": solution["steps"],
+                    "solve_ms": round(solve_ms, 2),
+                },
+            }
+
+            if data.get("dry_run") or not rows:
+                return {"success": True, "data": result}
+
+            created = self.schedule_service.bulk_create_schedules(
+                rows, all_or_nothing=bool(data.get("all_or_nothing"))
+            )
+            result["result"] = created.get("data")
+            if not created["success"]:
+                return {"success": False, "error": created["error"], "data": result}
+            return {"success": True, "data": result}
+
+        except (TypeError, ValueError) as e:
+            self.db.session.rollback()
+            return {"success": False, "error": f"Data format error: {str(e)}"}
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in generate_timetable: {str(e)}")
+            return {"success": False, "error": f"Error generating timetable: {str(e)}"}
+
+    def _block_existing(self, solver: TimetableSolver, start_date: date, end_date: date,
+                        weekdays: List[int], slot_times: List[Tuple], room_ids: set,
+                        teacher_ids: set) -> None:
+        """
+        Đánh dấu các ô tuần đã bị lịch hiện có chiếm
+
+        Một ô (thứ, ca) bị coi là bận nếu ở bất kỳ tuần nào trong khoảng ngày
+        phòng/giáo viên đã có lịch trùng ca đó, để phương án lặp lại mỗi tuần
+        không va chạm với lịch cũ.
+        """
+        slot_starts = [time_to_seconds(s) for s, _ in slot_times]
+        slot_ends = [time_to_seconds(e) for _, e in slot_times]
+        day_index = {weekday: i for i, weekday in enumerate(weekdays)}
+
+        rows = self.db.session.query(
+            Schedule.room_id, Schedule.user_id, Schedule.schedule_date,
+            Schedule.schedule_startime, Schedule.schedule_endtime
+        ).filter(
+            Schedule.schedule_date.between(start_date, end_date),
+            Schedule.schedule_startime.isnot(None),
+            Schedule.schedule_endtime.isnot(None),
+            or_(Schedule.room_id.in_(room_ids), Schedule.user_id.in_(teacher_ids))
+        )
+
+        for room_id, user_id, schedule_date, start_time, end_time in rows:
+            day = day_index.get(schedule_date.weekday())
+            if day is None:
+                continue
+            mask = slot_mask(time_to_seconds(start_time), time_to_seconds(end_time), slot_starts, slot_ends)
+            if not mask:
+                continue
+            mask <<= day * len(slot_times)
+            if room_id in room_ids:
+                solver.block_room(room_id, mask)
+            if user_id in teacher_ids:
+                solver.block_teacher(user_id, mask)
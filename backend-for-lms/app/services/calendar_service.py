@@ -0,0 +1,230 @@
+from typing import Dict, Any, Iterable, List, Tuple
+from flask import current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import db
+from app.models.schedule_model import Schedule
+from app.models.class_model import Class
+from app.models.teacher_model import Teacher
+from app.models.room_model import Room
+from app.models.calendar_version_model import CalendarVersion
+from app.utils.calendar_projection import class_calendars
+from app.utils.version_rows import bump_versions, read_versions
+
+
+class CalendarService:
+    """Service phục vụ calendar của lớp từ projection đã serialize sẵn"""
+
+    # Thời gian sống mặc định (giây) của một calendar trong bộ nhớ; giới hạn độ trễ
+    # khi dữ liệu bị sửa bằng câu lệnh SQL trực tiếp (thay đổi qua ORM ở tiến trình
+    # khác được phát hiện qua bảng calendar_versions)
+    DEFAULT_TTL = 300
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def get_class_calendar(self, class_id: int) -> Dict[str, Any]:
+        """
+        Lấy calendar của lớp dưới dạng JSON đã serialize
+
+        Mỗi lần lấy đọc version của lớp (một truy vấn theo khóa chính) để không
+        trả calendar (và ETag) đã cũ sau khi tiến trình khác sửa lịch.
+
+        Returns:
+            Dict {"success": True, "data": {"body": <JSON của data>, "etag": <sha1>}}
+        """
+        try:
+            ttl = current_app.config.get("CALENDAR_CACHE_TTL", self.DEFAULT_TTL)
+            db_version = (
+                self.db.session.query(CalendarVersion.version)
+                .filter(CalendarVersion.class_id == class_id)
+                .scalar()
+                or 0
+            )
+            cached = class_calendars.get(class_id, ttl, db_version)
+            if cached is None:
+                version = class_calendars.version(class_id)
+
+                class_row = (
+                    self.db.session.query(Class.class_id, Class.class_name)
+                    .filter(Class.class_id == class_id)
+                    .first()
+                )
+                if not class_row:
+                    return {"success": False, "error": f"Class with ID {class_id} not found"}
+
+                cached = class_calendars.put(
+                    class_row.class_id, class_row.class_name, self._load_rows(class_id), version, db_version
+                )
+
+            body, etag = cached
+            return {"success": True, "data": {"body": body, "etag": etag}}
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_class_calendar: {str(e)}")
+            return {"success": False, "error": f"Error retrieving class calendar: {str(e)}"}
+
+    def _load_rows(self, class_id: int) -> List[Tuple]:
+        """Một truy vấn lấy các cột cần cho calendar (kèm tên phòng và giáo viên)"""
+        rows = (
+            self.db.session.query(
+                Schedule.schedule_id,
+                Schedule.schedule_date,
+                Schedule.schedule_startime,
+                Schedule.schedule_endtime,
+                Schedule.room_id,
+                Room.room_id.label("room_exists"),
+                Room.room_name,
+                Schedule.user_id,
+                Teacher.user_name,
+            )
+            .outerjoin(Room, Room.room_id == Schedule.room_id)
+            .outerjoin(Teacher, Teacher.user_id == Schedule.user_id)
+            .filter(Schedule.class_id == class_id)
+            .all()
+        )
+        return [
+            (
+                row.schedule_id, row.schedule_date, row.schedule_startime, row.schedule_endtime,
+                row.room_id,
+                row.room_name if row.room_exists is not None else f"Room {row.room_id}",
+                row.user_id, row.user_name,
+            )
+            for row in rows
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Đồng bộ projection với các thay đổi qua ORM
+#
+# after_flush ghi lại thay đổi vào session.info, chỉ áp dụng vào projection khi
+# transaction commit thành công. Nếu rollback thì các lớp liên quan bị bỏ khỏi
+# projection để lần đọc sau nạp lại từ database.
+#
+# Cũng trong after_flush (cùng transaction), version của các lớp bị ảnh hưởng
+# trong bảng calendar_versions được tăng để các tiến trình khác nạp lại calendar
+# ở lần đọc tiếp theo. Sau commit, tiến trình hiện tại ghi nhận version mới cho
+# các calendar vừa tự cập nhật.
+# ---------------------------------------------------------------------------
+
+_CHANGES_KEY = "calendar_changes"
+# class_id -> (số lần tăng version trong transaction, version sau lần tăng cuối)
+_VERSIONS_KEY = "calendar_versions"
+
+
+def _changed(obj, attribute: str) -> bool:
+    return inspect(obj).attrs[attribute].history.has_changes()
+
+
+def record_schedule_inserts(session, schedules: Iterable[Schedule]) -> None:
+    """
+    Ghi nhận các lịch vừa chèn bằng câu lệnh INSERT hàng loạt (không đi qua ORM)
+
+    Tăng version của các lớp ngay trong transaction hiện tại và đưa các buổi học
+    vào danh sách thay đổi, áp dụng vào projection khi commit như thay đổi qua ORM.
+    """
+    schedules = list(schedules)
+    if not schedules:
+        return
+    changes = session.info.setdefault(_CHANGES_KEY, [])
+    for schedule in schedules:
+        changes.append(("upsert", schedule.schedule_id, schedule.class_id, schedule.schedule_date,
+                        schedule.schedule_startime, schedule.schedule_endtime,
+                        schedule.room_id, schedule.user_id))
+    _bump_calendar_versions(session, {schedule.class_id for schedule in schedules})
+
+
+def _bump_calendar_versions(session, class_ids) -> None:
+    class_ids = {class_id for class_id in class_ids if class_id is not None}
+    if not class_ids:
+        return
+    connection = session.connection()
+    table = CalendarVersion.__table__
+    bump_versions(connection, table, class_ids)
+    tracked = session.info.setdefault(_VERSIONS_KEY, {})
+    for class_id, version in read_versions(connection, table, class_ids).items():
+        bumps = tracked[class_id][0] if class_id in tracked else 0
+        tracked[class_id] = (bumps + 1, version)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_calendar_changes(session, flush_context):
+    changes = session.info.setdefault(_CHANGES_KEY, [])
+    affected = set()
+    renamed_rooms = set()
+    renamed_teachers = set()
+
+    for obj in list(session.new) + list(session.dirty):
+        is_new = obj in session.new
+        if isinstance(obj, Schedule):
+            history = inspect(obj).attrs.class_id.history
+            for old_class_id in history.deleted or ():
+                if old_class_id is not None and old_class_id != obj.class_id:
+                    changes.append(("remove", obj.schedule_id, old_class_id))
+                    affected.add(old_class_id)
+            changes.append(("upsert", obj.schedule_id, obj.class_id, obj.schedule_date,
+                            obj.schedule_startime, obj.schedule_endtime, obj.room_id, obj.user_id))
+            if is_new or session.is_modified(obj, include_collections=False):
+                affected.add(obj.class_id)
+        elif isinstance(obj, Class) and _changed(obj, "class_name"):
+            changes.append(("class", obj.class_id, obj.class_name))
+            affected.add(obj.class_id)
+        elif isinstance(obj, Room) and (is_new or _changed(obj, "room_name")):
+            changes.append(("room", obj.room_id, obj.room_name))
+            renamed_rooms.add(obj.room_id)
+        elif isinstance(obj, Teacher) and (is_new or _changed(obj, "user_name")):
+            changes.append(("teacher", obj.user_id, obj.user_name))
+            renamed_teachers.add(obj.user_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Schedule):
+            changes.append(("remove", obj.schedule_id, obj.class_id))
+            affected.add(obj.class_id)
+        elif isinstance(obj, Class):
+            changes.append(("drop", obj.class_id))
+            affected.add(obj.class_id)
+
+    # Đổi tên phòng/giáo viên ảnh hưởng mọi lớp có buổi học dùng phòng/giáo viên đó
+    schedules = Schedule.__table__
+    for column, keys in ((schedules.c.room_id, renamed_rooms), (schedules.c.user_id, renamed_teachers)):
+        if keys:
+            affected.update(session.connection().execute(
+                select(schedules.c.class_id).where(column.in_(keys)).distinct()
+            ).scalars())
+
+    _bump_calendar_versions(session, affected)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_calendar_changes(session):
+    for change in session.info.pop(_CHANGES_KEY, ()):
+        kind = change[0]
+        if kind == "upsert":
+            class_calendars.upsert(*change[1:])
+        elif kind == "remove":
+            class_calendars.remove(*change[1:])
+        elif kind == "class":
+            class_calendars.rename_class(*change[1:])
+        elif kind == "room":
+            class_calendars.rename_room(*change[1:])
+        elif kind == "teacher":
+            class_calendars.rename_teacher(*change[1:])
+        elif kind == "drop":
+            class_calendars.invalidate(change[1])
+
+    for class_id, (bumps, version) in session.info.pop(_VERSIONS_KEY, {}).items():
+        class_calendars.stamp(class_id, version - bumps, version)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_calendar_changes(session, previous_transaction):
+    for class_id in session.info.pop(_VERSIONS_KEY, {}):
+        class_calendars.invalidate(class_id)
+    for change in session.info.pop(_CHANGES_KEY, ()):
+        if change[0] in ("upsert", "remove"):
+            class_calendars.invalidate(change[2])
+        elif change[0] in ("class", "drop"):
+            class_calendars.invalidate(change[1])
+        else:
+            class_calendars.clear()
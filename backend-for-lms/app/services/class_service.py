@@ -2,21 +2,33 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, date
 from flask import current_app
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, update, delete
 
 from app.config import db
 from app.models.class_model import Class
 from app.models.course_model import Course
+from app.utils.eager_loading import with_relations
+from app.utils.cursor import keyset_page
+from app.services.search_service import SearchService
 
 
 class ClassService:
     """Service quản lý lớp học"""
 
+    # Quan hệ cần eager load khi trả về danh sách
+    LIST_RELATIONS = ("course",)
+    ENROLLMENT_RELATIONS = ("student", "class_obj")
+
+    # Giới hạn của ghi danh hàng loạt
+    MAX_BULK_ENROLL = 10000
+    IN_CHUNK_SIZE = 1000
+
     def __init__(self, database=None):
         self.db = database or db
 
     def get_all_classes(
-        self, page: int = 1, per_page: int = 10, filters: Dict[str, Any] = None
+        self, page: int = 1, per_page: int = 10, filters: Dict[str, Any] = None,
+        cursor: Optional[str] = None, include_total: bool = False
     ) -> Dict[str, Any]:
         """
         Lấy danh sách lớp học với phân trang và lọc
@@ -25,12 +37,15 @@ class ClassService:
             page: Trang hiện tại
             per_page: Số lượng record trên mỗi trang
             filters: Các tiêu chí lọc (course_id, status, active_only, etc.)
+            cursor: Phân trang theo keyset thay cho page ("" = trang đầu,
+                    sau đó truyền next_cursor của trang trước)
+            include_total: Chỉ dùng với cursor, đếm tổng số dòng (thêm một COUNT)
 
         Returns:
             Dict chứa danh sách lớp học và thông tin phân trang
         """
         try:
-            query = Class.query
+            query = with_relations(Class.query, Class, self.LIST_RELATIONS)
 
             # Áp dụng các bộ lọc
             if filters:
@@ -63,15 +78,32 @@ class ClassService:
                         )
                     )
 
-                # Search by name
+                # Search by name (chỉ mục không dấu; từ khóa quá rộng quay về LIKE '%...%')
                 if filters.get("search"):
-                    search_term = f"%{filters['search']}%"
-                    query = query.filter(Class.class_name.like(search_term))
+                    query = query.filter(SearchService(self.db).id_filter("classes", filters["search"]))
 
             # Sắp xếp
             sort_by = filters.get("sort_by", "class_id") if filters else "class_id"
             sort_dir = filters.get("sort_dir", "asc") if filters else "asc"
 
+            if cursor is not None:
+                if sort_by not in Class.__table__.columns:
+                    return {"success": False, "error": f"Invalid sort field: {sort_by}"}
+                try:
+                    classes, page_info = keyset_page(
+                        query, getattr(Class, sort_by), Class.class_id,
+                        cursor, per_page, descending=sort_dir == "desc"
+                    )
+                except ValueError as e:
+                    return {"success": False, "error": str(e)}
+                if include_total:
+                    page_info["total"] = query.order_by(None).count()
+                return {
+                    "success": True,
+                    "data": [class_obj.to_dict() for class_obj in classes],
+                    "pagination": page_info,
+                }
+
             if sort_dir == "desc":
                 query = query.order_by(getattr(Class, sort_by).desc())
             else:
@@ -290,6 +322,11 @@ class ClassService:
         """
         Ghi danh sinh viên vào lớp học
 
+        Sĩ số được tăng bằng một câu UPDATE có điều kiện (lớp ACTIVE và còn chỗ)
+        trong cùng transaction với bản ghi enrollment, nên nhiều request đồng thời
+        không thể vượt quá class_maxstudents. Khóa dòng của lớp chỉ được giữ
+        trong khoảng UPDATE -> INSERT -> COMMIT.
+
         Args:
             class_id: ID của lớp học
             student_id: ID của sinh viên
@@ -297,64 +334,217 @@ class ClassService:
         Returns:
             Dict kết quả thực hiện
         """
+        from app.models.enrollment_model import Enrollment
+        from app.models.student_model import Student
+
         try:
-            # Kiểm tra lớp học tồn tại
-            class_obj = Class.query.get(class_id)
-            if not class_obj:
+            # Kiểm tra sinh viên tồn tại (chỉ đọc, ngoài phần ghi)
+            student_exists = self.db.session.query(Student.user_id).filter(
+                Student.user_id == student_id
+            ).first()
+            if not student_exists:
+                self.db.session.rollback()
                 return {
                     "success": False,
-                    "error": f"Class with ID {class_id} not found",
+                    "error": f"Student with ID {student_id} not found",
                 }
 
-            # Kiểm tra trạng thái lớp học
-            if not class_obj.is_active():
-                return {"success": False, "error": "Cannot enroll in inactive class"}
+            # Giữ chỗ: tăng sĩ số nếu lớp còn active và chưa đầy
+            reserved = self.db.session.execute(
+                update(Class)
+                .where(
+                    Class.class_id == class_id,
+                    Class.class_status == "ACTIVE",
+                    or_(
+                        Class.class_maxstudents.is_(None),
+                        func.coalesce(Class.class_currentenrollment, 0) < Class.class_maxstudents,
+                    ),
+                )
+                .values(class_currentenrollment=func.coalesce(Class.class_currentenrollment, 0) + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+            if reserved == 0:
+                self.db.session.rollback()
+                return {"success": False, "error": self._enrollment_rejection(class_id)}
+
+            # Tạo bản ghi enrollment; khóa chính (user_id, class_id) chặn đăng ký trùng
+            self.db.session.add(
+                Enrollment(user_id=student_id, class_id=class_id, status="ACTIVE")
+            )
+            self.db.session.flush()
+            self.db.session.commit()
 
-            # Kiểm tra lớp học đã đầy chưa
-            if class_obj.is_full():
-                return {"success": False, "error": "Class is already full"}
+            return {"success": True, "message": "Student enrolled successfully"}
 
-            # Kiểm tra sinh viên đã đăng ký chưa
-            from app.models.enrollment_model import Enrollment
-            from app.models.student_model import Student
+        except IntegrityError:
+            # Đã đăng ký trước đó: rollback luôn cả phần tăng sĩ số
+            self.db.session.rollback()
+            return {
+                "success": False,
+                "error": "Student already enrolled in this class",
+            }
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in enroll_student: {str(e)}")
+            return {"success": False, "error": f"Error enrolling student: {str(e)}"}
 
-            # Kiểm tra sinh viên tồn tại
-            student = Student.query.get(student_id)
-            if not student:
-                return {
-                    "success": False,
-                    "error": f"Student with ID {student_id} not found",
-                }
+    def _enrollment_rejection(self, class_id: int) -> str:
+        """Xác định lý do UPDATE giữ chỗ không tác động dòng nào"""
+        class_row = self.db.session.query(
+            Class.class_status, Class.class_maxstudents, Class.class_currentenrollment
+        ).filter(Class.class_id == class_id).first()
+        if not class_row:
+            return f"Class with ID {class_id} not found"
+        if class_row.class_status != "ACTIVE":
+            return "Cannot enroll in inactive class"
+        return "Class is already full"
+
+    def bulk_enroll(self, class_id: int, student_ids: List[str]) -> Dict[str, Any]:
+        """
+        Ghi danh nhiều sinh viên vào lớp trong một transaction
 
-            # Kiểm tra đã đăng ký trước đó chưa
-            if Enrollment.is_enrolled(student_id, class_id):
-                return {
-                    "success": False,
-                    "error": "Student already enrolled in this class",
-                }
+        Kiểm tra sinh viên và các enrollment đã có bằng truy vấn IN theo lô,
+        chèn các bản ghi mới bằng một lệnh executemany và tăng sĩ số một lần
+        (đọc sĩ số với SELECT ... FOR UPDATE rồi UPDATE). Nếu lớp không đủ chỗ cho tất cả,
+        chỉ những sinh viên đầu danh sách vừa với số chỗ còn lại được ghi danh.
 
-            # Tạo bản ghi enrollment mới
-            enrollment = Enrollment(
-                user_id=student_id, class_id=class_id, status="ACTIVE"
-            )
-            self.db.session.add(enrollment)
+        Args:
+            class_id: ID của lớp học
+            student_ids: Danh sách ID sinh viên
+
+        Returns:
+            Dict gồm enrolled_count, các bộ đếm theo trạng thái và kết quả từng sinh viên
+            (status: enrolled, already_enrolled, not_found, duplicate, class_full)
+        """
+        from app.models.enrollment_model import Enrollment
+        from app.models.student_model import Student
+
+        try:
+            if not student_ids:
+                return {"success": False, "error": "student_ids must not be empty"}
+            if len(student_ids) > self.MAX_BULK_ENROLL:
+                return {"success": False, "error": f"At most {self.MAX_BULK_ENROLL} students per request"}
+
+            class_row = self.db.session.query(Class.class_id, Class.class_status).filter(
+                Class.class_id == class_id
+            ).first()
+            if not class_row:
+                return {"success": False, "error": f"Class with ID {class_id} not found"}
+            if class_row.class_status != "ACTIVE":
+                return {"success": False, "error": "Cannot enroll in inactive class"}
 
-            # Tăng số lượng học viên
-            class_obj.class_currentenrollment += 1
+            # Bỏ ID trùng trong request, giữ nguyên thứ tự (kể cả vị trí các ID trùng trong kết quả)
+            requested = []
+            statuses = {}
+            order = []
+            for student_id in student_ids:
+                student_id = str(student_id)
+                order.append((student_id, student_id in statuses))
+                if student_id in statuses:
+                    continue
+                statuses[student_id] = None
+                requested.append(student_id)
+
+            existing_students = set()
+            already_enrolled = set()
+            for chunk in self._chunks(requested):
+                existing_students.update(
+                    row[0] for row in self.db.session.query(Student.user_id).filter(Student.user_id.in_(chunk))
+                )
+                already_enrolled.update(
+                    row[0] for row in self.db.session.query(Enrollment.user_id).filter(
+                        Enrollment.class_id == class_id, Enrollment.user_id.in_(chunk)
+                    )
+                )
+
+            candidates = []
+            for student_id in requested:
+                if student_id not in existing_students:
+                    statuses[student_id] = "not_found"
+                elif student_id in already_enrolled:
+                    statuses[student_id] = "already_enrolled"
+                else:
+                    candidates.append(student_id)
+
+            # Khóa dòng lớp trước khi đọc sĩ số: với REPEATABLE READ (InnoDB) một
+            # SELECT thường trả về snapshot cũ, còn SELECT ... FOR UPDATE đọc bản
+            # mới nhất và chặn các ghi danh khác tới khi transaction này commit
+            seats = 0
+            if candidates:
+                current = self.db.session.query(
+                    Class.class_status, Class.class_maxstudents, Class.class_currentenrollment
+                ).filter(Class.class_id == class_id).with_for_update().first()
+                if current.class_status != "ACTIVE":
+                    self.db.session.rollback()
+                    return {"success": False, "error": "Cannot enroll in inactive class"}
+                enrolled_now = current.class_currentenrollment or 0
+                available = len(candidates) if current.class_maxstudents is None else max(
+                    0, current.class_maxstudents - enrolled_now
+                )
+                seats = min(len(candidates), available)
+                if seats:
+                    self.db.session.execute(
+                        update(Class)
+                        .where(Class.class_id == class_id)
+                        .values(class_currentenrollment=enrolled_now + seats)
+                        .execution_options(synchronize_session=False)
+                    )
 
+            enrolled = candidates[:seats]
+            for student_id in candidates[seats:]:
+                statuses[student_id] = "class_full"
+            for student_id in enrolled:
+                statuses[student_id] = "enrolled"
+
+            if enrolled:
+                self.db.session.execute(
+                    Enrollment.__table__.insert(),
+                    [{"user_id": student_id, "class_id": class_id, "status": "ACTIVE"} for student_id in enrolled],
+                )
             self.db.session.commit()
 
-            return {"success": True, "message": "Student enrolled successfully"}
+            results = [
+                {"student_id": student_id, "status": "duplicate" if duplicate else statuses[student_id]}
+                for student_id, duplicate in order
+            ]
+            counts = {}
+            for item in results:
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+
+            return {
+                "success": True,
+                "data": {
+                    "class_id": class_id,
+                    "requested_count": len(student_ids),
+                    "enrolled_count": len(enrolled),
+                    "counts": counts,
+                    "results": results,
+                },
+            }
 
+        except IntegrityError as e:
+            # Một sinh viên vừa được ghi danh bởi request khác: hủy cả lô
+            self.db.session.rollback()
+            current_app.logger.error(f"Integrity error in bulk_enroll: {str(e)}")
+            return {"success": False, "error": "Enrollments changed concurrently, please retry"}
         except Exception as e:
             self.db.session.rollback()
-            current_app.logger.error(f"Error in enroll_student: {str(e)}")
-            return {"success": False, "error": f"Error enrolling student: {str(e)}"}
+            current_app.logger.error(f"Error in bulk_enroll: {str(e)}")
+            return {"success": False, "error": f"Error enrolling students: {str(e)}"}
+
+    @classmethod
+    def _chunks(cls, values: List[Any]):
+        """Chia danh sách thành các lô cho truy vấn IN"""
+        for start in range(0, len(values), cls.IN_CHUNK_SIZE):
+            yield values[start:start + cls.IN_CHUNK_SIZE]
 
     def unenroll_student(self, class_id: int, student_id: str) -> Dict[str, Any]:
         """
         Hủy ghi danh sinh viên khỏi lớp học
 
+        Xóa bản ghi enrollment và giảm sĩ số bằng UPDATE nguyên tử trong cùng transaction.
+
         Args:
             class_id: ID của lớp học
             student_id: ID của sinh viên
@@ -362,23 +552,35 @@ class ClassService:
         Returns:
             Dict kết quả thực hiện
         """
+        from app.models.enrollment_model import Enrollment
+
         try:
-            class_obj = Class.query.get(class_id)
-            if not class_obj:
+            class_exists = self.db.session.query(Class.class_id).filter(
+                Class.class_id == class_id
+            ).first()
+            if not class_exists:
+                self.db.session.rollback()
                 return {
                     "success": False,
                     "error": f"Class with ID {class_id} not found",
                 }
 
-            # TODO: Xóa enrollment record (cần model Student_Class)
-            # enrollment = Student_Class.query.filter_by(student_id=student_id, class_id=class_id).first()
-            # if not enrollment:
-            #    return {"success": False, "error": "Student not enrolled in this class"}
-            # self.db.session.delete(enrollment)
+            deleted = self.db.session.execute(
+                delete(Enrollment)
+                .where(Enrollment.class_id == class_id, Enrollment.user_id == student_id)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if deleted == 0:
+                self.db.session.rollback()
+                return {"success": False, "error": "Student not enrolled in this class"}
 
             # Giảm số lượng học viên
-            if class_obj.class_currentenrollment > 0:
-                class_obj.class_currentenrollment -= 1
+            self.db.session.execute(
+                update(Class)
+                .where(Class.class_id == class_id, Class.class_currentenrollment > 0)
+                .values(class_currentenrollment=Class.class_currentenrollment - 1)
+                .execution_options(synchronize_session=False)
+            )
 
             self.db.session.commit()
 
@@ -400,7 +602,9 @@ class ClassService:
             Dict chứa danh sách lớp học
         """
         try:
-            classes = Class.query.filter_by(course_id=course_id).all()
+            classes = with_relations(Class.query, Class, self.LIST_RELATIONS).filter_by(
+                course_id=course_id
+            ).all()
 
             return {
                 "success": True,
@@ -530,7 +734,9 @@ class ClassService:
             from app.models.enrollment_model import Enrollment
             
             # Tạo query base
-            query = Enrollment.query.filter_by(class_id=class_id)
+            query = with_relations(
+                Enrollment.query, Enrollment, self.ENROLLMENT_RELATIONS
+            ).filter_by(class_id=class_id)
             
             # Áp dụng lọc theo status nếu có
             if status:
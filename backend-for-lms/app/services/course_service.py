@@ -2,10 +2,10 @@ from typing import Dict, Any, Optional
 from datetime import datetime, date
 from flask import current_app
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
 
 from app.config import db
 from app.models.course_model import Course
+from app.utils.id_allocator import ids
 
 
 class CourseService:
@@ -15,10 +15,7 @@ class CourseService:
         self.db = database or db
 
     def _generate_course_id(self) -> str:
-        last_id = self.db.session.query(func.max(Course.course_id)).scalar()
-        if not last_id:
-            return "C0000001"
-        return f"C{int(last_id[1:]) + 1:07d}"
+        return ids.next_id("course")
 
     def get_all_courses(
         self, page: int = 1, per_page: int = 10, filters: Dict[str, Any] = None
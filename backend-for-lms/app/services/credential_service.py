@@ -0,0 +1,142 @@
+from typing import Dict, Any, Optional, List
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import db
+from app.models.student_model import Student
+from app.models.teacher_model import Teacher
+from app.models.user_credential_model import UserCredential, normalize_email
+
+# Thứ tự ưu tiên khi một email trùng giữa hai bảng (giống thứ tự đăng nhập cũ)
+ROLE_MODELS = (("teacher", Teacher), ("student", Student))
+
+
+class CredentialService:
+    """
+    Service tra cứu bảng user_credentials
+
+    Đăng nhập và kiểm tra email trùng chỉ cần một truy vấn theo khóa chính
+    (email đã chuẩn hóa) thay vì lần lượt dò bảng teachers rồi students.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def lookup(self, email: str) -> Optional[UserCredential]:
+        """Tìm thông tin đăng nhập theo email"""
+        email_normalized = normalize_email(email)
+        if not email_normalized:
+            return None
+        return self.db.session.get(UserCredential, email_normalized)
+
+    def email_exists(self, email: str) -> bool:
+        """Email đã được dùng bởi giáo viên hoặc học viên nào chưa"""
+        return self.lookup(email) is not None
+
+    def load_user(self, credential: UserCredential):
+        """Lấy Teacher/Student tương ứng với credential (truy vấn theo khóa chính)"""
+        model = dict(ROLE_MODELS)[credential.role]
+        return self.db.session.get(model, credential.user_id)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Dựng lại toàn bộ bảng user_credentials từ teachers và students
+
+        Dùng sau khi dữ liệu bị sửa trực tiếp bằng SQL hoặc bulk update (không đi
+        qua ORM events). Email trùng được giữ cho tài khoản ưu tiên (giáo viên
+        trước, sau đó mã nhỏ hơn) và trả về trong "duplicates".
+        """
+        try:
+            rows: Dict[str, Dict[str, Any]] = {}
+            duplicates: List[str] = []
+            for role, model in ROLE_MODELS:
+                query = self.db.session.query(model).filter(model.user_email.isnot(None)).order_by(model.user_id)
+                for user in query:
+                    entry = _credential_values(role, user)
+                    if entry is None:
+                        continue
+                    if entry["email_normalized"] in rows:
+                        duplicates.append(f"{role}/{user.user_id}")
+                        continue
+                    rows[entry["email_normalized"]] = entry
+
+            self.db.session.query(UserCredential).delete(synchronize_session=False)
+            if rows:
+                self.db.session.execute(UserCredential.__table__.insert(), list(rows.values()))
+            self.db.session.commit()
+
+            if duplicates:
+                current_app.logger.warning(f"Credential rebuild skipped {len(duplicates)} duplicate emails")
+            return {"rows": len(rows), "duplicates": duplicates}
+
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in rebuild: {str(e)}")
+            raise
+
+
+def _credential_values(role: str, user) -> Optional[Dict[str, Any]]:
+    email_normalized = normalize_email(user.user_email)
+    if not email_normalized:
+        return None
+    return {
+        "email_normalized": email_normalized,
+        "role": role,
+        "user_id": user.user_id,
+        "password_hash": user.user_password,
+        # Giáo viên không cần xác minh email để đăng nhập
+        "is_email_verified": bool(getattr(user, "is_email_verified", True)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Đồng bộ user_credentials trong cùng transaction với teachers/students
+# ---------------------------------------------------------------------------
+
+_TRACKED = ("user_email", "user_password", "is_email_verified")
+
+
+def _role_of(obj) -> Optional[str]:
+    for role, model in ROLE_MODELS:
+        if isinstance(obj, model):
+            return role
+    return None
+
+
+def _credentials_changed(obj) -> bool:
+    state = inspect(obj)
+    return any(name in state.attrs and state.attrs[name].history.has_changes() for name in _TRACKED)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_user_credentials(session, flush_context):
+    removed = []
+    added = []
+
+    for obj in session.new:
+        role = _role_of(obj)
+        if role:
+            added.append(_credential_values(role, obj))
+    for obj in session.dirty:
+        role = _role_of(obj)
+        if role and _credentials_changed(obj):
+            removed.append((role, obj.user_id))
+            added.append(_credential_values(role, obj))
+    for obj in session.deleted:
+        role = _role_of(obj)
+        if role:
+            removed.append((role, obj.user_id))
+
+    added = [entry for entry in added if entry is not None]
+    if not removed and not added:
+        return
+
+    table = UserCredential.__table__
+    connection = session.connection()
+    # Xóa trước rồi mới thêm để hai tài khoản đổi email cho nhau trong cùng lần flush
+    for role, user_id in removed:
+        connection.execute(table.delete().where(table.c.role == role, table.c.user_id == user_id))
+    if added:
+        # Email đã thuộc tài khoản khác -> IntegrityError, transaction bị rollback
+        connection.execute(table.insert(), added)
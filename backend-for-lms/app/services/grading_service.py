@@ -0,0 +1,363 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, exists, inspect, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import db
+from app.models.test_model import Test
+from app.models.test_question_model import TestQuestion
+from app.models.question_model import Question
+from app.models.answer_model import Answer
+from app.models.answer_key_version_model import AnswerKeyVersion
+from app.models.score_model import Score
+from app.models.enrollment_model import Enrollment
+from app.utils.answer_key import AnswerKey, answer_keys, compile_answer_key, normalize_sheet, grade_sheet
+from app.utils.version_rows import bump_versions
+
+
+class GradingService:
+    """Service chấm bài kiểm tra: đáp án biên dịch sẵn, chấm trong bộ nhớ, ghi điểm theo lô"""
+
+    MAX_CLASS_SUBMISSIONS = 5000
+    IN_CHUNK_SIZE = 1000
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    # ------------------------------------------------------------------ đáp án
+
+    def get_answer_key(self, test_id: int) -> Optional[AnswerKey]:
+        """
+        Đáp án của bài kiểm tra (None nếu bài không tồn tại), lấy từ cache dùng chung
+
+        Mỗi lần lấy đọc version của bài (một truy vấn theo khóa chính) để thấy
+        thay đổi đã commit ở tiến trình khác; ANSWER_KEY_CACHE_TTL giới hạn thêm
+        tuổi của đáp án trong cache.
+        """
+        version = (
+            self.db.session.query(AnswerKeyVersion.version).filter(AnswerKeyVersion.test_id == test_id).scalar()
+            or 0
+        )
+        return answer_keys.get(
+            test_id, self._load_answer_key, version, current_app.config.get("ANSWER_KEY_CACHE_TTL")
+        )
+
+    def invalidate_answer_key(self, test_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Bỏ đáp án đã biên dịch của một bài (hoặc tất cả) ở mọi tiến trình
+
+        Thay đổi qua ORM đã tự làm mất hiệu lực cache; chỉ cần gọi hàm này sau
+        khi sửa answers/has_question bằng câu lệnh SQL trực tiếp.
+        """
+        try:
+            connection = self.db.session.connection()
+            if test_id is None:
+                table = AnswerKeyVersion.__table__
+                now = datetime.utcnow()
+                connection.execute(table.update().values(version=table.c.version + 1, updated_at=now))
+                connection.execute(table.insert().from_select(
+                    ["test_id", "version", "updated_at"],
+                    select(Test.test_id, literal(1), literal(now)).where(
+                        ~exists().where(table.c.test_id == Test.test_id)
+                    ),
+                ))
+            else:
+                _bump_versions(connection, {test_id})
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in invalidate_answer_key: {str(e)}")
+            return {"success": False, "error": f"Error invalidating answer keys: {str(e)}"}
+
+        if test_id is None:
+            answer_keys.clear()
+        else:
+            answer_keys.invalidate(test_ids=(test_id,))
+        return {"success": True, "data": {"test_id": test_id}}
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Số liệu cache đáp án (hit/miss, số bài đang giữ)"""
+        return {"success": True, "data": answer_keys.stats()}
+
+    def _load_answer_key(self, test_id: int) -> Optional[AnswerKey]:
+        """Một truy vấn: tests LEFT JOIN has_question LEFT JOIN answers"""
+        rows = (
+            self.db.session.query(
+                Test.test_total_score, Test.test_passing_score,
+                TestQuestion.qs_index, TestQuestion.question_order,
+                Answer.as_index, Answer.as_true,
+            )
+            .outerjoin(TestQuestion, TestQuestion.test_id == Test.test_id)
+            .outerjoin(Answer, Answer.qs_index == TestQuestion.qs_index)
+            .filter(Test.test_id == test_id)
+            .all()
+        )
+        return compile_answer_key(test_id, rows)
+
+    # ------------------------------------------------------------------ đọc
+
+    def get_test(self, test_id: int) -> Dict[str, Any]:
+        """Lấy thông tin bài kiểm tra"""
+        try:
+            test = self.db.session.get(Test, test_id)
+            if not test:
+                return {"success": False, "error": f"Test with ID {test_id} not found"}
+
+            data = test.to_dict()
+            key = self.get_answer_key(test_id)
+            data["question_count"] = len(key.question_ids) if key else 0
+            return {"success": True, "data": data}
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_test: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def get_test_questions(self, test_id: int) -> Dict[str, Any]:
+        """
+        Lấy câu hỏi và phương án của bài kiểm tra (không kèm đáp án đúng)
+
+        Một truy vấn has_question JOIN questions LEFT JOIN answers, sắp theo thứ tự câu.
+        """
+        try:
+            if not self.db.session.query(Test.test_id).filter(Test.test_id == test_id).first():
+                return {"success": False, "error": f"Test with ID {test_id} not found"}
+
+            rows = (
+                self.db.session.query(
+                    TestQuestion.qs_index, TestQuestion.question_order, Question.qs_desciption,
+                    Answer.as_index, Answer.as_content,
+                )
+                .join(Question, Question.qs_index == TestQuestion.qs_index)
+                .outerjoin(Answer, Answer.qs_index == TestQuestion.qs_index)
+                .filter(TestQuestion.test_id == test_id)
+                .order_by(
+                    TestQuestion.question_order.is_(None),
+                    TestQuestion.question_order.asc(),
+                    TestQuestion.qs_index.asc(),
+                    Answer.as_index.asc(),
+                )
+                .all()
+            )
+
+            questions = []
+            by_index = {}
+            for row in rows:
+                question = by_index.get(row.qs_index)
+                if question is None:
+                    question = {
+                        "qs_index": row.qs_index,
+                        "question_order": row.question_order,
+                        "qs_desciption": row.qs_desciption,
+                        "answers": [],
+                    }
+                    by_index[row.qs_index] = question
+                    questions.append(question)
+                if row.as_index is not None:
+                    question["answers"].append({"as_index": row.as_index, "as_content": row.as_content})
+
+            return {"success": True, "data": questions}
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_test_questions: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    # ------------------------------------------------------------------ chấm bài
+
+    def submit_test(self, test_id: int, user_id: str, class_id: int, answers: Any) -> Dict[str, Any]:
+        """
+        Chấm bài nộp của một học viên và lưu điểm
+
+        Args:
+            test_id: ID bài kiểm tra
+            user_id: ID học viên
+            class_id: Lớp mà học viên làm bài (điểm gắn với enrollment)
+            answers: Bài nộp (xem app/utils/answer_key.py)
+        """
+        result = self.grade_class(test_id, class_id, [{"user_id": user_id, "answers": answers}])
+        if not result["success"]:
+            return result
+
+        item = result["data"]["results"][0]
+        if item["status"] != "graded":
+            return {"success": False, "error": item.get("error", f"Submission {item['status']}")}
+        return {"success": True, "data": item, "message": "Test submitted successfully"}
+
+    def grade_class(self, test_id: int, class_id: int, submissions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Chấm bài nộp của cả lớp trong một lượt và ghi điểm theo lô
+
+        Đáp án lấy từ cache, enrollment kiểm tra bằng truy vấn IN theo lô, điểm
+        được upsert trong một transaction (executemany INSERT cho bài mới,
+        executemany UPDATE cho bài nộp lại).
+
+        Args:
+            test_id: ID bài kiểm tra
+            class_id: ID lớp học
+            submissions: [{"user_id": str, "answers": <bài nộp>}]
+
+        Returns:
+            Dict gồm graded_count, các bộ đếm và kết quả từng học viên
+            (status: graded, invalid, duplicate, not_enrolled)
+        """
+        try:
+            if not submissions:
+                return {"success": False, "error": "submissions must not be empty"}
+            if len(submissions) > self.MAX_CLASS_SUBMISSIONS:
+                return {"success": False, "error": f"At most {self.MAX_CLASS_SUBMISSIONS} submissions per request"}
+
+            key = self.get_answer_key(test_id)
+            if key is None:
+                return {"success": False, "error": f"Test with ID {test_id} not found"}
+            if not key.question_ids:
+                return {"success": False, "error": "Test has no questions"}
+
+            results = []
+            graded = {}
+            for submission in submissions:
+                user_id = str(submission.get("user_id") or "") if isinstance(submission, dict) else ""
+                if not user_id:
+                    results.append({"user_id": None, "status": "invalid", "error": "user_id is required"})
+                    continue
+                if user_id in graded:
+                    results.append({"user_id": user_id, "status": "duplicate"})
+                    continue
+                try:
+                    sheet = normalize_sheet(submission.get("answers"))
+                except ValueError as e:
+                    results.append({"user_id": user_id, "status": "invalid", "error": str(e)})
+                    continue
+                graded[user_id] = grade_sheet(key, sheet)
+
+            enrolled = set()
+            existing = set()
+            user_ids = list(graded)
+            for chunk in self._chunks(user_ids):
+                enrolled.update(
+                    row[0] for row in self.db.session.query(Enrollment.user_id).filter(
+                        Enrollment.class_id == class_id, Enrollment.user_id.in_(chunk)
+                    )
+                )
+                existing.update(
+                    row[0] for row in self.db.session.query(Score.user_id).filter(
+                        Score.class_id == class_id, Score.test_id == test_id, Score.user_id.in_(chunk)
+                    )
+                )
+
+            now = datetime.now()
+            inserts, updates = [], []
+            for user_id in user_ids:
+                if user_id not in enrolled:
+                    results.append({"user_id": user_id, "status": "not_enrolled",
+                                    "error": "Student is not enrolled in this class"})
+                    continue
+                row = {"user_id": user_id, "class_id": class_id, "test_id": test_id,
+                       "sc_score": graded[user_id]["score"], "submitted_at": now}
+                (updates if user_id in existing else inserts).append(row)
+                results.append(dict(graded[user_id], user_id=user_id, status="graded"))
+
+            if inserts:
+                self.db.session.execute(Score.__table__.insert(), inserts)
+            if updates:
+                self.db.session.bulk_update_mappings(Score, updates)
+            self.db.session.commit()
+
+            counts = {}
+            for item in results:
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+
+            return {
+                "success": True,
+                "data": {
+                    "test_id": test_id,
+                    "class_id": class_id,
+                    "graded_count": len(inserts) + len(updates),
+                    "counts": counts,
+                    "results": results,
+                },
+            }
+
+        except IntegrityError as e:
+            # Cùng học viên vừa được chấm bởi request khác: hủy cả lô
+            self.db.session.rollback()
+            current_app.logger.error(f"Integrity error in grade_class: {str(e)}")
+            return {"success": False, "error": "Scores changed concurrently, please retry"}
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in grade_class: {str(e)}")
+            return {"success": False, "error": f"Error grading submissions: {str(e)}"}
+
+    @classmethod
+    def _chunks(cls, values: List[Any]):
+        """Chia danh sách thành các lô cho truy vấn IN"""
+        for start in range(0, len(values), cls.IN_CHUNK_SIZE):
+            yield values[start:start + cls.IN_CHUNK_SIZE]
+
+
+# ---------------------------------------------------------------------------
+# Làm mất hiệu lực cache đáp án khi câu hỏi/phương án thay đổi qua ORM:
+# - tăng version của các bài bị ảnh hưởng ngay trong after_flush (cùng
+#   transaction), để các tiến trình khác nạp lại ở lần get() tiếp theo
+# - bỏ cache của tiến trình hiện tại khi commit (và cả khi rollback, vì trong
+#   transaction có thể đã nạp đáp án từ dữ liệu chưa commit)
+# ---------------------------------------------------------------------------
+
+_CHANGES_KEY = "answer_key_changes"
+
+
+def _old_values(obj, attribute: str) -> List[Any]:
+    return [value for value in inspect(obj).attrs[attribute].history.deleted or () if value is not None]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_answer_key_changes(session, flush_context):
+    flushed_tests, flushed_questions = set(), set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Answer):
+            flushed_questions.add(obj.qs_index)
+            flushed_questions.update(_old_values(obj, "qs_index"))
+        elif isinstance(obj, TestQuestion):
+            flushed_tests.add(obj.test_id)
+            flushed_tests.update(_old_values(obj, "test_id"))
+        elif isinstance(obj, Question):
+            flushed_questions.add(obj.qs_index)
+        elif isinstance(obj, Test):
+            flushed_tests.add(obj.test_id)
+
+    flushed_tests.discard(None)
+    flushed_questions.discard(None)
+    if not flushed_tests and not flushed_questions:
+        return
+
+    connection = session.connection()
+    affected = set(flushed_tests)
+    if flushed_questions:
+        has_question = TestQuestion.__table__
+        affected.update(connection.execute(
+            select(has_question.c.test_id).where(has_question.c.qs_index.in_(flushed_questions))
+        ).scalars())
+    if affected:
+        _bump_versions(connection, affected)
+
+    tests, questions = session.info.setdefault(_CHANGES_KEY, (set(), set()))
+    tests.update(flushed_tests)
+    questions.update(flushed_questions)
+
+
+def _bump_versions(connection, test_ids) -> None:
+    """Tăng version đáp án của các bài"""
+    bump_versions(connection, AnswerKeyVersion.__table__, test_ids)
+
+
+def _apply_answer_key_changes(session, *args):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes:
+        tests, questions = changes
+        answer_keys.invalidate(test_ids=tests, question_ids=questions)
+
+
+event.listen(Session, "after_commit", _apply_answer_key_changes)
+event.listen(Session, "after_soft_rollback", _apply_answer_key_changes)
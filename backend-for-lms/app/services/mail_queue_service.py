@@ -0,0 +1,314 @@
+import random
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, func, or_
+
+from app.config import db, mail
+from app.models.mail_outbox_model import MailOutbox
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_RETRY_BASE_DELAY = 30  # giây, nhân đôi sau mỗi lần lỗi
+DEFAULT_RETRY_MAX_DELAY = 3600
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_POLL_INTERVAL = 2.0
+# Chờ tối đa (giây) giữa các lần thử lại khi worker gặp lỗi ngoài SMTP (vd. mất kết nối DB)
+DEFAULT_ERROR_BACKOFF_MAX = 60.0
+
+# Lỗi ở tầng kết nối: dừng lô hiện tại, trả các thư chưa gửi về hàng đợi.
+# Mọi smtplib.SMTPException đều là OSError nên phải loại các lỗi phản hồi
+# (người nhận bị từ chối, lỗi DATA, ...) ra: những lỗi đó chỉ thuộc về một thư.
+TRANSPORT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """Phản hồi 5xx của server cho riêng thư này (vd. địa chỉ không tồn tại): thử lại cũng không gửi được"""
+    if isinstance(error, smtplib.SMTPSenderRefused):
+        # Địa chỉ gửi bị từ chối là lỗi cấu hình, sửa xong thì thư vẫn gửi được
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(code >= 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class MailQueueService:
+    """
+    Service hàng đợi email gửi đi (bảng mail_outbox)
+
+    - enqueue(): dùng trong request, chỉ ghi một dòng vào DB
+    - claim_batch() + deliver(): dùng trong worker, gửi cả lô qua một kết nối SMTP
+    Mỗi lô được nhận bằng claim_token nên nhiều worker (thread hoặc tiến trình)
+    chạy song song không gửi trùng thư.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    # --------- ENQUEUE ----------
+    def enqueue(self, recipient: str, subject: str, html: str, commit: bool = True) -> MailOutbox:
+        """
+        Đưa một email vào hàng đợi
+
+        Args:
+            commit: False để commit cùng transaction của dữ liệu nghiệp vụ
+                    (vd. học viên mới và email xác minh được lưu cùng lúc)
+        """
+        item = MailOutbox(
+            recipient=recipient,
+            subject=subject,
+            html=html,
+            status="PENDING",
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        self.db.session.add(item)
+        if commit:
+            self.db.session.commit()
+        return item
+
+    # --------- WORKER ----------
+    def claim_batch(self, limit: Optional[int] = None) -> List[MailOutbox]:
+        """Nhận tối đa `limit` thư đến hạn gửi (kể cả thư của worker đã quá hạn giữ)"""
+        limit = limit or current_app.config.get("MAIL_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+        lease = current_app.config.get("MAIL_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+
+        try:
+            due = or_(
+                and_(MailOutbox.status == "PENDING", MailOutbox.next_attempt_at <= now),
+                and_(MailOutbox.status == "SENDING", MailOutbox.locked_until < now),
+            )
+            candidate_ids = [
+                row.mail_id
+                for row in self.db.session.query(MailOutbox.mail_id)
+                .filter(due)
+                .order_by(MailOutbox.next_attempt_at, MailOutbox.mail_id)
+                .limit(limit)
+            ]
+            if not candidate_ids:
+                self.db.session.rollback()
+                return []
+
+            # Điều kiện `due` được kiểm tra lại trong UPDATE: dòng đã bị worker khác
+            # nhận giữa hai câu lệnh sẽ không mang claim_token của worker này
+            self.db.session.query(MailOutbox).filter(MailOutbox.mail_id.in_(candidate_ids), due).update(
+                {
+                    MailOutbox.status: "SENDING",
+                    MailOutbox.claim_token: token,
+                    MailOutbox.locked_until: now + timedelta(seconds=lease),
+                },
+                synchronize_session=False,
+            )
+            self.db.session.commit()
+
+            return (
+                self.db.session.query(MailOutbox)
+                .filter(MailOutbox.claim_token == token, MailOutbox.status == "SENDING")
+                .order_by(MailOutbox.mail_id)
+                .all()
+            )
+
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in claim_batch: {str(e)}")
+            return []
+
+    def deliver(self, batch: List[MailOutbox]) -> Dict[str, int]:
+        """
+        Gửi một lô thư qua một kết nối SMTP, cập nhật trạng thái từng thư
+
+        Trạng thái được commit ngay sau mỗi thư: lỗi DB ở giữa lô không làm mất
+        các dòng SENT trước đó (nếu mất, thư sẽ bị gửi lại khi hết lease).
+
+        Raises:
+            Exception: Lỗi không thuộc SMTP (vd. lỗi DB) khi đang gửi; các thư chưa
+            ghi trạng thái được worker khác nhận lại sau khi hết lease
+        """
+        result = {"sent": 0, "retry": 0, "failed": 0, "lost": 0}
+        if not batch:
+            return result
+
+        pending = list(batch)
+        connected = False
+        try:
+            with mail.connect() as connection:
+                connected = True
+                while pending:
+                    item = pending[0]
+                    try:
+                        connection.send(Message(subject=item.subject, recipients=[item.recipient], html=item.html))
+                    except Exception as e:
+                        if is_connection_error(e):
+                            raise
+                        outcome = self._mark_failed(item, e, permanent=is_permanent_error(e))
+                    else:
+                        outcome = self._finish(item, {
+                            MailOutbox.status: "SENT",
+                            MailOutbox.sent_at: datetime.utcnow(),
+                            MailOutbox.claim_token: None,
+                            MailOutbox.locked_until: None,
+                            MailOutbox.last_error: None,
+                        }, "sent")
+                    self.db.session.commit()
+                    result[outcome] += 1
+                    pending.pop(0)
+        except Exception as e:
+            if connected and not is_connection_error(e):
+                raise
+            current_app.logger.error(f"SMTP connection error in deliver: {str(e)}")
+            if connected and pending:
+                # Mất kết nối giữa lô: chỉ tính một lần thử cho thư đang gửi,
+                # các thư chưa tới lượt quay lại hàng đợi không bị trừ lượt
+                result[self._mark_failed(pending.pop(0), e)] += 1
+                for item in pending:
+                    result[self._release(item)] += 1
+            else:
+                # Không kết nối/đăng nhập được: cả lô chờ theo backoff
+                for item in pending:
+                    result[self._mark_failed(item, e)] += 1
+
+        try:
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in deliver: {str(e)}")
+        return result
+
+    def process_once(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Nhận và gửi một lô; trả về số thư đã gửi/thử lại/thất bại/mất quyền giữ"""
+        return self.deliver(self.claim_batch(limit))
+
+    def _finish(self, item: MailOutbox, values: Dict[Any, Any], outcome: str) -> str:
+        """
+        Ghi trạng thái của một thư, chỉ khi lô vẫn thuộc worker này
+
+        Lô chạy quá locked_until có thể đã bị worker khác nhận lại (claim_token
+        khác); khi đó bỏ qua để không ghi đè trạng thái của worker kia.
+        """
+        updated = (
+            self.db.session.query(MailOutbox)
+            .filter(MailOutbox.mail_id == item.mail_id, MailOutbox.claim_token == item.claim_token)
+            .update(values, synchronize_session=False)
+        )
+        if not updated:
+            current_app.logger.warning(f"Mail {item.mail_id}: lease expired, result of this worker discarded")
+            return "lost"
+        return outcome
+
+    def _release(self, item: MailOutbox) -> str:
+        return self._finish(item, {
+            MailOutbox.status: "PENDING",
+            MailOutbox.next_attempt_at: datetime.utcnow(),
+            MailOutbox.claim_token: None,
+            MailOutbox.locked_until: None,
+        }, "retry")
+
+    def _mark_failed(self, item: MailOutbox, error: Exception, permanent: bool = False) -> str:
+        max_attempts = current_app.config.get("MAIL_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+        attempts = (item.attempts or 0) + 1
+        values = {
+            MailOutbox.attempts: attempts,
+            MailOutbox.last_error: str(error)[:1000],
+            MailOutbox.claim_token: None,
+            MailOutbox.locked_until: None,
+        }
+        if attempts >= max_attempts or permanent:
+            values[MailOutbox.status] = "FAILED"
+            outcome = self._finish(item, values, "failed")
+            if outcome == "failed":
+                current_app.logger.error(f"Mail {item.mail_id} to {item.recipient} failed after {attempts} attempts")
+            return outcome
+
+        values[MailOutbox.status] = "PENDING"
+        values[MailOutbox.next_attempt_at] = datetime.utcnow() + timedelta(seconds=self._retry_delay(attempts))
+        return self._finish(item, values, "retry")
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> float:
+        """Backoff lũy thừa có jitter ±20% để các thư lỗi cùng lúc không dồn lại"""
+        base = current_app.config.get("MAIL_RETRY_BASE_DELAY", DEFAULT_RETRY_BASE_DELAY)
+        ceiling = current_app.config.get("MAIL_RETRY_MAX_DELAY", DEFAULT_RETRY_MAX_DELAY)
+        return min(ceiling, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Số thư theo trạng thái"""
+        rows = self.db.session.query(MailOutbox.status, func.count()).group_by(MailOutbox.status).all()
+        return {status: count for status, count in rows}
+
+
+class MailWorkerPool:
+    """
+    Nhóm thread gửi email nền, mỗi thread có app context và kết nối SMTP riêng
+
+    Thread ngủ `poll_interval` giây khi hàng đợi rỗng; drain=True dừng khi hết thư
+    đến hạn (dùng cho lệnh chạy một lần và script đo throughput).
+    """
+
+    def __init__(self, app, workers: int = 2, batch_size: Optional[int] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.app = app
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.totals = {"sent": 0, "retry": 0, "failed": 0, "lost": 0}
+
+    def start(self, drain: bool = False) -> "MailWorkerPool":
+        self._threads = [
+            threading.Thread(target=self._run, args=(drain,), name=f"mail-worker-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self, drain: bool) -> None:
+        with self.app.app_context():
+            service = MailQueueService()
+            errors = 0
+            while not self._stop.is_set():
+                try:
+                    result = service.process_once(self.batch_size)
+                except Exception as e:
+                    # Lỗi DB giữa lô: không để thread dừng im lặng, chờ rồi thử lại
+                    db.session.rollback()
+                    current_app.logger.error(f"Error in mail worker: {str(e)}")
+                    if drain:
+                        break
+                    errors += 1
+                    self._stop.wait(min(self.poll_interval * 2 ** errors, DEFAULT_ERROR_BACKOFF_MAX))
+                    continue
+                errors = 0
+                with self._lock:
+                    for key, value in result.items():
+                        self.totals[key] += value
+                if not any(result.values()):
+                    if drain:
+                        break
+                    self._stop.wait(self.poll_interval)
+            db.session.remove()
@@ -4,7 +4,8 @@ from sqlalchemy.exc import IntegrityError
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, date
 import re
-import uuid
+from app.services.credential_service import CredentialService
+from app.utils.id_allocator import ids
 from app.utils.email_utils import send_verification_email
 
 
@@ -88,20 +89,10 @@ class RegisterService:
         # Lưu vào database
         try:
             self.db.session.add(student)
-            self.db.session.commit()
-            # Gửi email xác nhận nếu cần
+            # Email xác nhận được đưa vào hàng đợi, lưu cùng transaction với học viên
             if send_email:
-                try:
-                    from flask import current_app
-
-                    send_verification_email(
-                        current_app.extensions["mail"],
-                        student.user_email,
-                        student.user_id,
-                    )
-                except Exception as e:
-                    # Log lỗi nhưng không làm fail quá trình đăng ký
-                    current_app.logger.error(f"Error sending verification email: {e}")
+                send_verification_email(student.user_email, student.user_id, commit=False)
+            self.db.session.commit()
             return student
         except IntegrityError:
             self.db.session.rollback()
@@ -166,29 +157,11 @@ class RegisterService:
 
     def _check_email_exists(self, email: str) -> bool:
         """Kiểm tra email đã tồn tại trong database chưa"""
-        if not email:
-            return False
-        return (
-            self.db.session.query(Student).filter(Student.user_email == email).first()
-            is not None
-        )
+        return CredentialService(self.db).email_exists(email)
 
     def _generate_student_id(self) -> str:
         """Sinh ID học viên tự động theo định dạng S00000001"""
-        # Phương thức này giữ nguyên
-        last_student = (
-            self.db.session.query(Student).order_by(Student.user_id.desc()).first()
-        )
-        if not last_student:
-            return "S00000001"
-        if last_student.user_id.startswith("S") and len(last_student.user_id) == 9:
-            try:
-                num = int(last_student.user_id[1:])
-                return f"S{(num + 1):08d}"
-            except ValueError:
-                pass
-        unique_id = str(uuid.uuid4())[:8].upper()
-        return f"S{unique_id}"
+        return ids.next_id("student")
 
     def verify_email(self, token: str) -> Dict[str, Any]:
         """
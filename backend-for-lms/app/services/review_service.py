@@ -0,0 +1,179 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from flask import current_app
+
+from app.config import db
+from app.models.student_words_model import StudentWords
+from app.models.words_model import Word
+from app.utils.spaced_repetition import (
+    ReviewState, next_review, proficiency_after, quality_from_answer, MAX_QUALITY
+)
+
+
+class ReviewService:
+    """Service ôn tập từ vựng theo lịch lặp lại ngắt quãng (SM-2)"""
+
+    DEFAULT_DUE_LIMIT = 20
+    MAX_DUE_LIMIT = 200
+    # Số câu trả lời tối đa trong một lần nộp (một buổi ôn)
+    MAX_REVIEW_BATCH = 500
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def get_due_words(self, user_id: str, limit: Optional[int] = None,
+                      now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Lấy các từ đã đến hạn ôn của học viên, đến hạn sớm nhất trước
+
+        Một truy vấn duy nhất: quét khoảng trên index (user_id, due_at) và
+        join bảng words để lấy nội dung từ.
+
+        Args:
+            user_id: ID học viên
+            limit: Số từ tối đa (mặc định DEFAULT_DUE_LIMIT)
+            now: Thời điểm so sánh (mặc định datetime.now())
+        """
+        try:
+            limit = min(max(1, limit or self.DEFAULT_DUE_LIMIT), self.MAX_DUE_LIMIT)
+            now = now or datetime.now()
+
+            rows = (
+                self.db.session.query(
+                    StudentWords.w_index, StudentWords.due_at, StudentWords.proficiency_level,
+                    StudentWords.repetitions, StudentWords.interval_days, StudentWords.last_reviewed,
+                    Word.w_english, Word.w_vietnamese, Word.w_englishmean, Word.w_vietnamesemean,
+                )
+                .join(Word, Word.w_index == StudentWords.w_index)
+                .filter(StudentWords.user_id == user_id, StudentWords.due_at <= now)
+                .order_by(StudentWords.due_at.asc())
+                .limit(limit)
+                .all()
+            )
+
+            items = [
+                {
+                    "w_index": row.w_index,
+                    "w_english": row.w_english,
+                    "w_vietnamese": row.w_vietnamese,
+                    "w_englishmean": row.w_englishmean,
+                    "w_vietnamesemean": row.w_vietnamesemean,
+                    "proficiency_level": row.proficiency_level,
+                    "repetitions": row.repetitions,
+                    "interval_days": row.interval_days,
+                    "due_at": row.due_at.isoformat() if row.due_at else None,
+                    "last_reviewed": row.last_reviewed.isoformat() if row.last_reviewed else None,
+                }
+                for row in rows
+            ]
+            return {"success": True, "data": {"items": items, "count": len(items), "limit": limit}}
+
+        except Exception as e:
+            current_app.logger.error(f"Error in get_due_words: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    def submit_answers(self, user_id: str, answers: List[Dict[str, Any]],
+                       now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Ghi nhận kết quả cả buổi ôn trong một transaction
+
+        Mỗi phần tử của answers: {"w_index": int, "quality": 0-5} hoặc
+        {"w_index": int, "correct": bool}. Các từ được đọc bằng một truy vấn IN
+        (khóa dòng để hai lần nộp đồng thời không ghi đè nhau) và cập nhật bằng
+        một lệnh executemany.
+
+        Returns:
+            Dict gồm reviewed_count và kết quả từng từ
+            (status: reviewed, not_found, duplicate, invalid)
+        """
+        try:
+            if not answers:
+                return {"success": False, "error": "answers must not be empty"}
+            if len(answers) > self.MAX_REVIEW_BATCH:
+                return {"success": False, "error": f"At most {self.MAX_REVIEW_BATCH} answers per request"}
+            now = now or datetime.now()
+
+            results = []
+            qualities = {}
+            for answer in answers:
+                parsed = self._parse_answer(answer)
+                if isinstance(parsed, str):
+                    results.append({"w_index": answer.get("w_index") if isinstance(answer, dict) else None,
+                                    "status": "invalid", "error": parsed})
+                    continue
+                w_index, quality = parsed
+                if w_index in qualities:
+                    results.append({"w_index": w_index, "status": "duplicate"})
+                    continue
+                qualities[w_index] = quality
+
+            rows = {}
+            if qualities:
+                rows = {
+                    row.w_index: row
+                    for row in self.db.session.query(
+                        StudentWords.w_index, StudentWords.ease_factor, StudentWords.interval_days,
+                        StudentWords.repetitions, StudentWords.proficiency_level,
+                    )
+                    .filter(StudentWords.user_id == user_id, StudentWords.w_index.in_(list(qualities)))
+                    .with_for_update()
+                }
+
+            mappings = []
+            for w_index, quality in qualities.items():
+                row = rows.get(w_index)
+                if row is None:
+                    results.append({"w_index": w_index, "status": "not_found"})
+                    continue
+                state, due_at = next_review(
+                    ReviewState(row.ease_factor, row.interval_days, row.repetitions), quality, now
+                )
+                mappings.append({
+                    "user_id": user_id,
+                    "w_index": w_index,
+                    "ease_factor": state.ease_factor,
+                    "interval_days": state.interval_days,
+                    "repetitions": state.repetitions,
+                    "due_at": due_at,
+                    "proficiency_level": proficiency_after(row.proficiency_level, quality),
+                    "last_reviewed": now,
+                })
+                results.append({
+                    "w_index": w_index,
+                    "status": "reviewed",
+                    "quality": quality,
+                    "interval_days": state.interval_days,
+                    "due_at": due_at.isoformat(),
+                })
+
+            if mappings:
+                self.db.session.bulk_update_mappings(StudentWords, mappings)
+            self.db.session.commit()
+
+            return {
+                "success": True,
+                "data": {"reviewed_count": len(mappings), "results": results},
+                "message": f"Recorded {len(mappings)} review(s)",
+            }
+
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in submit_answers: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    @staticmethod
+    def _parse_answer(answer: Any):
+        """Trả về (w_index, quality) hoặc chuỗi lỗi"""
+        if not isinstance(answer, dict):
+            return "answer must be an object"
+        w_index = answer.get("w_index")
+        if isinstance(w_index, bool) or not isinstance(w_index, int):
+            return "w_index must be an integer"
+        if "quality" in answer:
+            quality = answer["quality"]
+            if isinstance(quality, bool) or not isinstance(quality, int) or not 0 <= quality <= MAX_QUALITY:
+                return f"quality must be an integer between 0 and {MAX_QUALITY}"
+            return w_index, quality
+        if isinstance(answer.get("correct"), bool):
+            return w_index, quality_from_answer(answer["correct"])
+        return "quality or correct is required"
@@ -1,4 +1,5 @@
-from typing import Dict, Any, List, Optional, Union, Tuple
+import json
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union, Tuple
 from datetime import datetime, date, time, timedelta
 from flask import current_app
 from sqlalchemy.exc import IntegrityError
@@ -9,18 +10,38 @@ from app.models.schedule_model import Schedule
 from app.models.class_model import Class
 from app.models.teacher_model import Teacher
 from app.models.room_model import Room
+from app.services.calendar_service import record_schedule_inserts
+from app.utils.interval_index import ScheduleIntervalIndex, slot_mask, time_to_seconds
+from app.utils.eager_loading import with_relations
+from app.utils.cursor import decode_cursor, encode_cursor, keyset_after
 
 
 class ScheduleService:
     """Service để quản lý lịch học"""
 
+    # Quan hệ cần eager load cho mỗi kiểu danh sách trả về
+    LIST_RELATIONS = Schedule.SERIALIZE_RELATIONS
+    CALENDAR_RELATIONS = ("room", "teacher")
+
+    # Giới hạn số ngày của ma trận phòng trống
+    MAX_AVAILABILITY_DAYS = 62
+
+    # Cửa sổ mặc định (tính từ hôm nay) và kích thước trang của lịch dạy giáo viên
+    AVAILABILITY_PAST_DAYS = 30
+    AVAILABILITY_FUTURE_DAYS = 90
+    AVAILABILITY_PAGE_SIZE = 500
+    MAX_AVAILABILITY_PAGE_SIZE = 5000
+    # Số dòng mỗi lần fetch và số ký tự tối thiểu mỗi đoạn khi stream
+    AVAILABILITY_STREAM_BATCH = 200
+    AVAILABILITY_STREAM_CHUNK = 16384
+
     def __init__(self, database=None):
         self.db = database or db
 
     def get_schedule_by_id(self, schedule_id: int) -> Dict[str, Any]:
         """Lấy thông tin lịch học theo ID"""
         try:
-            schedule = Schedule.query.get(schedule_id)
+            schedule = with_relations(Schedule.query, Schedule, self.LIST_RELATIONS).get(schedule_id)
             if not schedule:
                 return {"success": False, "error": f"Schedule with ID {schedule_id} not found"}
             
@@ -32,7 +53,7 @@ class ScheduleService:
     def get_schedules_by_class(self, class_id: int) -> Dict[str, Any]:
         """Lấy tất cả lịch học của một lớp"""
         try:
-            schedules = Schedule.get_schedules_by_class(class_id)
+            schedules = Schedule.get_schedules_by_class(class_id, self.LIST_RELATIONS)
             return {
                 "success": True,
                 "data": [schedule.to_dict() for schedule in schedules]
@@ -44,7 +65,7 @@ class ScheduleService:
     def get_schedules_by_teacher(self, teacher_id: str) -> Dict[str, Any]:
         """Lấy tất cả lịch dạy của một giáo viên"""
         try:
-            schedules = Schedule.get_schedules_by_teacher(teacher_id)
+            schedules = Schedule.get_schedules_by_teacher(teacher_id, self.LIST_RELATIONS)
             return {
                 "success": True,
                 "data": [schedule.to_dict() for schedule in schedules]
@@ -56,7 +77,7 @@ class ScheduleService:
     def get_schedules_by_room(self, room_id: int) -> Dict[str, Any]:
         """Lấy tất cả lịch học trong một phòng"""
         try:
-            schedules = Schedule.get_schedules_by_room(room_id)
+            schedules = Schedule.get_schedules_by_room(room_id, self.LIST_RELATIONS)
             return {
                 "success": True,
                 "data": [schedule.to_dict() for schedule in schedules]
@@ -69,7 +90,7 @@ class ScheduleService:
         """Lấy tất cả lịch học trong ngày cụ thể"""
         try:
             schedule_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            schedules = Schedule.get_schedules_by_date(schedule_date)
+            schedules = Schedule.get_schedules_by_date(schedule_date, self.LIST_RELATIONS)
             return {
                 "success": True,
                 "data": [schedule.to_dict() for schedule in schedules]
@@ -271,6 +292,53 @@ class ScheduleService:
             current_app.logger.error(f"Error in delete_schedule: {str(e)}")
             return {"success": False, "error": f"Error deleting schedule: {str(e)}"}
 
+    def build_conflict_index(self, start_date: date, end_date: date,
+                             room_ids: Optional[Iterable[int]] = None,
+                             user_ids: Optional[Iterable[str]] = None) -> ScheduleIntervalIndex:
+        """
+        Nạp lịch chiếm dụng phòng/giáo viên trong khoảng ngày vào chỉ mục bộ nhớ
+
+        Chỉ chạy một truy vấn theo khoảng ngày, chỉ lấy các cột cần thiết.
+
+        Args:
+            start_date: Ngày bắt đầu
+            end_date: Ngày kết thúc
+            room_ids: Giới hạn theo các phòng (None = tất cả)
+            user_ids: Giới hạn theo các giáo viên (None = tất cả)
+        """
+        query = self.db.session.query(
+            Schedule.schedule_id,
+            Schedule.room_id,
+            Schedule.user_id,
+            Schedule.schedule_date,
+            Schedule.schedule_startime,
+            Schedule.schedule_endtime,
+        ).filter(
+            Schedule.schedule_date.between(start_date, end_date),
+            Schedule.schedule_startime.isnot(None),
+            Schedule.schedule_endtime.isnot(None),
+        )
+
+        owner_filters = []
+        if room_ids is not None:
+            owner_filters.append(Schedule.room_id.in_(set(room_ids)))
+        if user_ids is not None:
+            owner_filters.append(Schedule.user_id.in_(set(user_ids)))
+        if owner_filters:
+            query = query.filter(or_(*owner_filters))
+
+        index = ScheduleIntervalIndex()
+        for row in query:
+            index.add(
+                row.schedule_id,
+                row.room_id,
+                row.user_id,
+                row.schedule_date,
+                row.schedule_startime,
+                row.schedule_endtime,
+            )
+        return index
+
     def check_schedule_conflicts(self, room_id: int, user_id: str, 
                                schedule_date: date, start_time: time, 
                                end_time: time, current_schedule_id: Optional[int] = None) -> Dict[str, Any]:
@@ -292,80 +360,82 @@ class ScheduleService:
             return {"success": True, "message": "No time specified for conflict check"}
         
         try:
-            # Tìm các lịch trùng ngày và có sự giao thoa về thời gian
-            conflicts_query = Schedule.query.filter(
-                Schedule.schedule_date == schedule_date,
-                or_(
-                    # Phòng đã có lịch khác vào khung giờ này
-                    and_(
-                        Schedule.room_id == room_id,
-                        # Kiểm tra giao thoa thời gian
-                        or_(
-                            # Lịch mới bắt đầu trong lịch cũ
-                            and_(
-                                Schedule.schedule_startime <= start_time,
-                                start_time < Schedule.schedule_endtime
-                            ),
-                            # Lịch mới kết thúc trong lịch cũ
-                            and_(
-                                Schedule.schedule_startime < end_time,
-                                end_time <= Schedule.schedule_endtime
-                            ),
-                            # Lịch mới bao trọn lịch cũ
-                            and_(
-                                start_time <= Schedule.schedule_startime,
-                                Schedule.schedule_endtime <= end_time
-                            )
-                        )
-                    ),
-                    # Hoặc giáo viên đã có lịch khác vào khung giờ này
-                    and_(
-                        Schedule.user_id == user_id,
-                        # Kiểm tra giao thoa thời gian tương tự
-                        or_(
-                            and_(
-                                Schedule.schedule_startime <= start_time,
-                                start_time < Schedule.schedule_endtime
-                            ),
-                            and_(
-                                Schedule.schedule_startime < end_time,
-                                end_time <= Schedule.schedule_endtime
-                            ),
-                            and_(
-                                start_time <= Schedule.schedule_startime,
-                                Schedule.schedule_endtime <= end_time
-                            )
-                        )
-                    )
-                )
+            index = self.build_conflict_index(schedule_date, schedule_date, [room_id], [user_id])
+            conflicts = index.find_conflicts(
+                room_id, user_id, schedule_date, start_time, end_time, current_schedule_id
             )
-            
-            # Nếu đang cập nhật, loại trừ lịch hiện tại
-            if current_schedule_id is not None:
-                conflicts_query = conflicts_query.filter(Schedule.schedule_id != current_schedule_id)
-            
-            conflicts = conflicts_query.all()
-            
-            if conflicts:
-                conflict_details = []
-                for conflict in conflicts:
-                    if conflict.room_id == room_id:
-                        conflict_details.append(f"Room {room_id} is already booked from {conflict.schedule_startime} to {conflict.schedule_endtime}")
-                    if conflict.user_id == user_id:
-                        conflict_details.append(f"Teacher {user_id} already has a class from {conflict.schedule_startime} to {conflict.schedule_endtime}")
-                
-                return {
-                    "success": False,
-                    "error": "Schedule conflicts detected",
-                    "conflicts": conflict_details
-                }
-            
-            return {"success": True, "message": "No conflicts found"}
+            return self._conflict_result(index, conflicts, room_id, user_id)
             
         except Exception as e:
             current_app.logger.error(f"Error in check_schedule_conflicts: {str(e)}")
             return {"success": False, "error": f"Error checking schedule conflicts: {str(e)}"}
 
+    def check_schedule_conflicts_batch(self, candidates: List[Dict[str, Any]],
+                                       index: Optional[ScheduleIntervalIndex] = None) -> Dict[str, Any]:
+        """
+        Kiểm tra xung đột cho nhiều khung giờ bằng một truy vấn duy nhất
+
+        Args:
+            candidates: Danh sách dict gồm room_id, user_id, schedule_date (date),
+                        schedule_startime, schedule_endtime (time) và schedule_id (nếu cập nhật)
+            index: Chỉ mục đã nạp sẵn (nếu không có sẽ nạp theo khoảng ngày của candidates)
+
+        Returns:
+            Dict chứa danh sách kết quả theo thứ tự candidates,
+            mỗi kết quả có conflict_ids và conflicts (mô tả)
+        """
+        try:
+            dated = [c for c in candidates if c.get("schedule_date") is not None]
+            if index is None:
+                index = ScheduleIntervalIndex()
+                if dated:
+                    index = self.build_conflict_index(
+                        min(c["schedule_date"] for c in dated),
+                        max(c["schedule_date"] for c in dated),
+                        {c["room_id"] for c in dated},
+                        {c["user_id"] for c in dated},
+                    )
+
+            results = []
+            for candidate, conflicts in zip(candidates, index.find_conflicts_batch(candidates)):
+                check = self._conflict_result(
+                    index, conflicts, candidate.get("room_id"), candidate.get("user_id")
+                )
+                results.append({
+                    "has_conflict": not check["success"],
+                    "conflict_ids": check.get("conflict_ids", []),
+                    "conflicts": check.get("conflicts", []),
+                })
+
+            return {"success": True, "data": results}
+
+        except Exception as e:
+            current_app.logger.error(f"Error in check_schedule_conflicts_batch: {str(e)}")
+            return {"success": False, "error": f"Error checking schedule conflicts: {str(e)}"}
+
+    @staticmethod
+    def _conflict_result(index: ScheduleIntervalIndex, conflicts: Dict[str, List[Any]],
+                         room_id: int, user_id: str) -> Dict[str, Any]:
+        """Chuyển kết quả tra chỉ mục thành dict giống định dạng check_schedule_conflicts"""
+        conflict_ids = list(dict.fromkeys(conflicts["room"] + conflicts["teacher"]))
+        if not conflict_ids:
+            return {"success": True, "message": "No conflicts found"}
+
+        conflict_details = []
+        for conflict_id in conflict_ids:
+            conflict = index.get(conflict_id)
+            if conflict["room_id"] == room_id:
+                conflict_details.append(f"Room {room_id} is already booked from {conflict['schedule_startime']} to {conflict['schedule_endtime']}")
+            if conflict["user_id"] == user_id:
+                conflict_details.append(f"Teacher {user_id} already has a class from {conflict['schedule_startime']} to {conflict['schedule_endtime']}")
+
+        return {
+            "success": False,
+            "error": "Schedule conflicts detected",
+            "conflicts": conflict_details,
+            "conflict_ids": conflict_ids
+        }
+
     def find_available_rooms(self, date_str: str, start_time_str: str, end_time_str: str, 
                           min_capacity: Optional[int] = None) -> Dict[str, Any]:
         """
@@ -433,10 +503,144 @@ class ScheduleService:
             current_app.logger.error(f"Error in find_available_rooms: {str(e)}")
             return {"success": False, "error": f"Error finding available rooms: {str(e)}"}
 
+    def find_available_rooms_range(self, start_date_str: str, end_date_str: str,
+                                   slots: Optional[List[Tuple[str, str]]] = None,
+                                   slot_minutes: int = 60,
+                                   day_start_str: str = "08:00",
+                                   day_end_str: str = "18:00",
+                                   min_capacity: Optional[int] = None,
+                                   room_status: Optional[str] = "AVAILABLE") -> Dict[str, Any]:
+        """
+        Tính ma trận phòng × slot còn trống cho cả một khoảng ngày
+
+        Chỉ dùng hai truy vấn: một cho danh sách phòng, một cho toàn bộ lịch
+        trong khoảng ngày. Mỗi (phòng, ngày) được biểu diễn bằng một bitmask
+        các slot đã bị chiếm.
+
+        Args:
+            start_date_str: Ngày bắt đầu (YYYY-MM-DD)
+            end_date_str: Ngày kết thúc (YYYY-MM-DD)
+            slots: Danh sách khung giờ (HH:MM, HH:MM); nếu không có sẽ chia đều
+                   từ day_start_str tới day_end_str theo slot_minutes
+            slot_minutes: Độ dài mỗi slot (phút) khi tự chia
+            day_start_str: Giờ bắt đầu ngày (HH:MM)
+            day_end_str: Giờ kết thúc ngày (HH:MM)
+            min_capacity: Sức chứa tối thiểu
+            room_status: Trạng thái phòng cần lọc (None = mọi trạng thái)
+
+        Returns:
+            Dict chứa danh sách slot, danh sách ngày và tình trạng trống của từng phòng
+        """
+        try:
+            start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+            end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+            if end_date < start_date:
+                return {"success": False, "error": "End date must be after start date"}
+            if (end_date - start_date).days >= self.MAX_AVAILABILITY_DAYS:
+                return {"success": False, "error": f"Date range must not exceed {self.MAX_AVAILABILITY_DAYS} days"}
+
+            # Chuẩn hóa danh sách slot
+            if slots:
+                slot_times = sorted(
+                    (datetime.strptime(s, "%H:%M").time(), datetime.strptime(e, "%H:%M").time())
+                    for s, e in slots
+                )
+            else:
+                if slot_minutes <= 0:
+                    return {"success": False, "error": "slot_minutes must be positive"}
+                day_start = datetime.strptime(day_start_str, "%H:%M")
+                day_end = datetime.strptime(day_end_str, "%H:%M")
+                slot_times = []
+                current = day_start
+                while current + timedelta(minutes=slot_minutes) <= day_end:
+                    following = current + timedelta(minutes=slot_minutes)
+                    slot_times.append((current.time(), following.time()))
+                    current = following
+
+            if not slot_times or any(s >= e for s, e in slot_times):
+                return {"success": False, "error": "Invalid time slots"}
+
+            slot_starts = [time_to_seconds(s) for s, _ in slot_times]
+            slot_ends = [time_to_seconds(e) for _, e in slot_times]
+            full_mask = (1 << len(slot_times)) - 1
+
+            # Danh sách phòng
+            room_query = Room.query
+            if room_status:
+                room_query = room_query.filter(Room.room_status == room_status)
+            if min_capacity:
+                room_query = room_query.filter(Room.room_capacity >= min_capacity)
+            rooms = room_query.order_by(Room.room_id).all()
+
+            dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+            # Toàn bộ lịch trong khoảng ngày, chỉ lấy các cột cần thiết
+            occupancy: Dict[Tuple[int, date], int] = {}
+            room_ids = [room.room_id for room in rooms]
+            if room_ids:
+                bookings = self.db.session.query(
+                    Schedule.room_id,
+                    Schedule.schedule_date,
+                    Schedule.schedule_startime,
+                    Schedule.schedule_endtime,
+                ).filter(
+                    Schedule.schedule_date.between(start_date, end_date),
+                    Schedule.room_id.in_(room_ids),
+                    Schedule.schedule_startime.isnot(None),
+                    Schedule.schedule_endtime.isnot(None),
+                )
+                for booking in bookings:
+                    key = (booking.room_id, booking.schedule_date)
+                    occupancy[key] = occupancy.get(key, 0) | slot_mask(
+                        time_to_seconds(booking.schedule_startime),
+                        time_to_seconds(booking.schedule_endtime),
+                        slot_starts,
+                        slot_ends,
+                    )
+
+            slot_range = range(len(slot_times))
+            rooms_data = []
+            for room in rooms:
+                availability = {}
+                free_slot_count = 0
+                for day in dates:
+                    free_mask = full_mask & ~occupancy.get((room.room_id, day), 0)
+                    free_slot_count += bin(free_mask).count("1")
+                    availability[day.strftime("%Y-%m-%d")] = [
+                        bool(free_mask >> i & 1) for i in slot_range
+                    ]
+
+                room_data = room.to_dict()
+                room_data["availability"] = availability
+                room_data["free_slot_count"] = free_slot_count
+                rooms_data.append(room_data)
+
+            return {
+                "success": True,
+                "data": {
+                    "start_date": start_date.strftime("%Y-%m-%d"),
+                    "end_date": end_date.strftime("%Y-%m-%d"),
+                    "dates": [day.strftime("%Y-%m-%d") for day in dates],
+                    "slots": [
+                        {"index": i, "start": s.strftime("%H:%M"), "end": e.strftime("%H:%M")}
+                        for i, (s, e) in enumerate(slot_times)
+                    ],
+                    "rooms": rooms_data
+                }
+            }
+
+        except ValueError:
+            return {"success": False, "error": "Invalid date or time format"}
+        except Exception as e:
+            current_app.logger.error(f"Error in find_available_rooms_range: {str(e)}")
+            return {"success": False, "error": f"Error finding available rooms: {str(e)}"}
+
     def create_recurring_schedule(self, base_data: Dict[str, Any], 
                                 recurrence_type: str, 
                                 end_date_str: str,
-                                weekdays: List[int] = None) -> Dict[str, Any]:
+                                weekdays: List[int] = None,
+                                bulk: bool = True,
+                                all_or_nothing: bool = False) -> Dict[str, Any]:
         """
         Tạo lịch học lặp lại (recurring)
         
@@ -446,6 +650,9 @@ class ScheduleService:
             end_date_str: Ngày kết thúc lặp (YYYY-MM-DD)
             weekdays: Danh sách các ngày trong tuần (0=Thứ 2, 1=Thứ 3, ..., 6=Chủ Nhật)
                       Chỉ cần khi recurrence_type='weekly'
+            bulk: True để chèn toàn bộ trong một transaction (bulk_create_schedules),
+                  False để tạo từng lịch qua create_schedule như trước
+            all_or_nothing: Chỉ dùng với bulk, không tạo lịch nào nếu có ngày bị lỗi
                       
         Returns:
             Dict chứa kết quả tạo lịch
@@ -511,28 +718,54 @@ class ScheduleService:
             else:
                 return {"success": False, "error": f"Unsupported recurrence type: {recurrence_type}"}
             
+            if bulk:
+                rows = [
+                    {
+                        "room_id": int(base_data["room_id"]),
+                        "class_id": int(base_data["class_id"]),
+                        "user_id": base_data["user_id"],
+                        "schedule_date": schedule_date,
+                        "schedule_startime": start_time,
+                        "schedule_endtime": end_time,
+                    }
+                    for schedule_date in dates_to_schedule
+                ]
+                return self.bulk_create_schedules(rows, all_or_nothing)
+
+            # Kiểm tra xung đột cho toàn bộ các ngày bằng một truy vấn
+            candidates = [
+                {
+                    "room_id": base_data["room_id"],
+                    "user_id": base_data["user_id"],
+                    "schedule_date": schedule_date,
+                    "schedule_startime": start_time,
+                    "schedule_endtime": end_time,
+                }
+                for schedule_date in dates_to_schedule
+            ]
+            index = ScheduleIntervalIndex()
+            if dates_to_schedule:
+                index = self.build_conflict_index(
+                    dates_to_schedule[0], dates_to_schedule[-1],
+                    [base_data["room_id"]], [base_data["user_id"]]
+                )
+            batch_check = self.check_schedule_conflicts_batch(candidates, index)
+            if not batch_check["success"]:
+                return {"success": False, "error": batch_check["error"]}
+
             # Tạo lịch học cho từng ngày
             created_schedules = []
             failed_schedules = []
             
-            for schedule_date in dates_to_schedule:
+            for schedule_date, conflict_check in zip(dates_to_schedule, batch_check["data"]):
                 schedule_data = base_data.copy()
                 schedule_data["schedule_date"] = schedule_date
                 
-                # Kiểm tra xung đột lịch
-                conflict_check = self.check_schedule_conflicts(
-                    schedule_data["room_id"], 
-                    schedule_data["user_id"], 
-                    schedule_date, 
-                    start_time, 
-                    end_time,
-                    None
-                )
-                
-                if not conflict_check["success"]:
+                if conflict_check["has_conflict"]:
                     failed_schedules.append({
                         "date": schedule_date.strftime("%Y-%m-%d"),
-                        "error": conflict_check["error"]
+                        "error": "Schedule conflicts detected",
+                        "conflict_ids": conflict_check["conflict_ids"]
                     })
                     continue
                 
@@ -564,17 +797,189 @@ class ScheduleService:
             current_app.logger.error(f"Error in create_recurring_schedule: {str(e)}")
             return {"success": False, "error": f"Error creating recurring schedule: {str(e)}"}
 
+    def bulk_create_schedules(self, rows: List[Dict[str, Any]],
+                              all_or_nothing: bool = False) -> Dict[str, Any]:
+        """
+        Tạo nhiều lịch học trong một transaction
+
+        Kiểm tra phòng/lớp/giáo viên bằng một truy vấn IN cho mỗi bảng, kiểm tra
+        xung đột qua chỉ mục bộ nhớ (kể cả xung đột giữa các dòng trong cùng lô),
+        rồi chèn các dòng hợp lệ bằng một lệnh executemany.
+
+        Args:
+            rows: Danh sách dict gồm room_id, class_id, user_id, schedule_date (date),
+                  schedule_startime, schedule_endtime (time hoặc None)
+            all_or_nothing: True để không tạo lịch nào nếu có ít nhất một dòng lỗi
+
+        Returns:
+            Dict cùng định dạng với create_recurring_schedule
+            (created_count, failed_count, created_schedules, failed_schedules)
+        """
+        try:
+            room_ids = {row["room_id"] for row in rows}
+            class_ids = {row["class_id"] for row in rows}
+            user_ids = {row["user_id"] for row in rows}
+
+            existing_rooms = self._existing_ids(Room.room_id, room_ids)
+            existing_classes = self._existing_ids(Class.class_id, class_ids)
+            existing_teachers = self._existing_ids(Teacher.user_id, user_ids)
+
+            dated = [row["schedule_date"] for row in rows if row.get("schedule_date")]
+            index = ScheduleIntervalIndex()
+            if dated:
+                index = self.build_conflict_index(min(dated), max(dated), room_ids, user_ids)
+
+            accepted = []
+            failed_schedules = []
+            for position, row in enumerate(rows):
+                schedule_date = row.get("schedule_date")
+                date_label = schedule_date.strftime("%Y-%m-%d") if schedule_date else None
+
+                error = None
+                if row["room_id"] not in existing_rooms:
+                    error = f"Room with ID {row['room_id']} not found"
+                elif row["class_id"] not in existing_classes:
+                    error = f"Class with ID {row['class_id']} not found"
+                elif row["user_id"] not in existing_teachers:
+                    error = f"Teacher with ID {row['user_id']} not found"
+
+                if error:
+                    failed_schedules.append({"date": date_label, "error": error})
+                    continue
+
+                conflicts = index.find_conflicts(
+                    row["room_id"], row["user_id"], schedule_date,
+                    row.get("schedule_startime"), row.get("schedule_endtime")
+                )
+                check = self._conflict_result(index, conflicts, row["room_id"], row["user_id"])
+                if not check["success"]:
+                    # Chỉ trả về ID của lịch đã có trong DB, bỏ qua dòng cùng lô
+                    failed_schedules.append({
+                        "date": date_label,
+                        "error": check["error"],
+                        "conflict_ids": [i for i in check["conflict_ids"] if not isinstance(i, tuple)]
+                    })
+                    continue
+
+                # Đưa dòng đã chấp nhận vào chỉ mục để phát hiện trùng trong cùng lô
+                index.add(
+                    ("new", position), row["room_id"], row["user_id"], schedule_date,
+                    row.get("schedule_startime"), row.get("schedule_endtime")
+                )
+                accepted.append({
+                    "room_id": row["room_id"],
+                    "class_id": row["class_id"],
+                    "user_id": row["user_id"],
+                    "schedule_date": schedule_date,
+                    "schedule_startime": row.get("schedule_startime"),
+                    "schedule_endtime": row.get("schedule_endtime"),
+                })
+
+            report = {
+                "created_count": 0,
+                "failed_count": len(failed_schedules),
+                "created_schedules": [],
+                "failed_schedules": failed_schedules
+            }
+
+            if all_or_nothing and failed_schedules:
+                report["rolled_back"] = True
+                return {
+                    "success": False,
+                    "error": "Some schedules could not be created, nothing was saved",
+                    "data": report
+                }
+
+            created_schedules = []
+            if accepted:
+                # Các dòng đã có trong cùng phạm vi (lớp, phòng, ngày) trước khi chèn
+                batch_filter = self._batch_filter(accepted)
+                existing_ids = {
+                    row[0] for row in self.db.session.query(Schedule.schedule_id).filter(*batch_filter)
+                }
+                self.db.session.execute(Schedule.__table__.insert(), accepted)
+
+                # Đọc lại trong cùng transaction theo khóa tự nhiên, bỏ các dòng đã có
+                # từ trước (dòng được chấp nhận không trùng khóa nhờ chỉ mục xung đột)
+                wanted = {self._schedule_key(row) for row in accepted}
+                inserted = with_relations(Schedule.query, Schedule, self.LIST_RELATIONS).filter(
+                    *batch_filter
+                ).order_by(Schedule.schedule_id).all()
+                created_schedules = [
+                    schedule for schedule in inserted
+                    if schedule.schedule_id not in existing_ids and self._schedule_key(schedule) in wanted
+                ]
+
+                # Lệnh INSERT hàng loạt không đi qua ORM nên tự báo cho calendar projection
+                record_schedule_inserts(self.db.session, created_schedules)
+
+            # Serialize trước khi commit để không phải nạp lại từng dòng sau khi hết hạn
+            report["created_count"] = len(created_schedules)
+            report["created_schedules"] = [schedule.to_dict() for schedule in created_schedules]
+
+            self.db.session.commit()
+
+            return {"success": True, "data": report}
+
+        except IntegrityError as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Integrity error in bulk_create_schedules: {str(e)}")
+            return {"success": False, "error": f"Database integrity error: {str(e)}"}
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in bulk_create_schedules: {str(e)}")
+            return {"success": False, "error": f"Error creating schedules: {str(e)}"}
+
+    def _existing_ids(self, column, ids: set) -> set:
+        """Trả về tập các ID thực sự tồn tại (một truy vấn IN)"""
+        if not ids:
+            return set()
+        return {row[0] for row in self.db.session.query(column).filter(column.in_(ids))}
+
+    @staticmethod
+    def _batch_filter(rows: List[Dict[str, Any]]) -> List[Any]:
+        """Điều kiện lọc các lịch cùng lớp, cùng phòng và trong khoảng ngày của một lô"""
+        conditions = [
+            Schedule.class_id.in_({row["class_id"] for row in rows}),
+            Schedule.room_id.in_({row["room_id"] for row in rows}),
+        ]
+        dates = [row["schedule_date"] for row in rows if row["schedule_date"] is not None]
+        in_range = Schedule.schedule_date.between(min(dates), max(dates)) if dates else None
+        if len(dates) < len(rows):
+            undated = Schedule.schedule_date.is_(None)
+            in_range = undated if in_range is None else or_(in_range, undated)
+        conditions.append(in_range)
+        return conditions
+
+    @staticmethod
+    def _schedule_key(row) -> Tuple:
+        """Khóa tự nhiên của một dòng lịch (dict hoặc Schedule) để đối chiếu sau khi chèn"""
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        return (
+            get("class_id"), get("schedule_date"), get("schedule_startime"),
+            get("schedule_endtime"), get("room_id"), get("user_id"),
+        )
+
     def get_teacher_availability(self, teacher_id: str, date_str: Optional[str] = None, 
                                start_date_str: Optional[str] = None, 
-                               end_date_str: Optional[str] = None) -> Dict[str, Any]:
+                               end_date_str: Optional[str] = None,
+                               cursor: Optional[str] = None,
+                               limit: Optional[int] = None,
+                               stream: bool = False) -> Dict[str, Any]:
         """
         Kiểm tra tình trạng sẵn sàng của giáo viên
         
+        Khi không truyền ngày, chỉ lấy lịch trong cửa sổ mặc định quanh hôm nay.
+        Mỗi lần trả về tối đa `limit` buổi; nếu còn, next_cursor dùng để lấy tiếp.
+        
         Args:
             teacher_id: ID của giáo viên
             date_str: Ngày cụ thể (YYYY-MM-DD)
             start_date_str: Ngày bắt đầu khoảng thời gian (YYYY-MM-DD)
             end_date_str: Ngày kết thúc khoảng thời gian (YYYY-MM-DD)
+            cursor: next_cursor của lần gọi trước
+            limit: Số buổi tối đa mỗi lần (mặc định AVAILABILITY_PAGE_SIZE)
+            stream: True để data là generator các đoạn JSON (dùng cho response dạng stream)
             
         Returns:
             Dict chứa thông tin lịch dạy của giáo viên
@@ -585,40 +990,73 @@ class ScheduleService:
             if not teacher:
                 return {"success": False, "error": f"Teacher with ID {teacher_id} not found"}
             
-            query = Schedule.query.filter(Schedule.user_id == teacher_id)
-            
-            # Lọc theo ngày
+            # Xác định khoảng ngày
             if date_str:
-                specific_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                query = query.filter(Schedule.schedule_date == specific_date)
+                start_date = end_date = datetime.strptime(date_str, "%Y-%m-%d").date()
             elif start_date_str and end_date_str:
                 start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
                 end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-                query = query.filter(Schedule.schedule_date.between(start_date, end_date))
+            else:
+                today = date.today()
+                start_date = today - timedelta(days=self.AVAILABILITY_PAST_DAYS)
+                end_date = today + timedelta(days=self.AVAILABILITY_FUTURE_DAYS)
+            
+            page_size = self.AVAILABILITY_PAGE_SIZE if limit is None else int(limit)
+            if page_size < 1 or page_size > self.MAX_AVAILABILITY_PAGE_SIZE:
+                return {"success": False, "error": f"Limit must be between 1 and {self.MAX_AVAILABILITY_PAGE_SIZE}"}
+            
+            order = (Schedule.schedule_date, Schedule.schedule_startime, Schedule.schedule_id)
+            query = with_relations(Schedule.query, Schedule, self.LIST_RELATIONS).filter(
+                Schedule.user_id == teacher_id,
+                Schedule.schedule_date.between(start_date, end_date)
+            )
+            
+            # Tiếp tục sau dòng cuối của lần trước
+            if cursor:
+                try:
+                    position = decode_cursor(cursor)
+                    values = (position["d"], position["s"], position["id"])
+                except (KeyError, ValueError):
+                    return {"success": False, "error": "Invalid cursor"}
+                query = query.filter(keyset_after(order, values))
+            
+            # Lấy thừa một dòng để biết còn trang sau hay không
+            query = query.order_by(*order).limit(page_size + 1)
+            
+            header = {
+                "teacher": {
+                    "user_id": teacher.user_id,
+                    "user_name": teacher.user_name
+                },
+                "window": {
+                    "start_date": start_date.strftime("%Y-%m-%d"),
+                    "end_date": end_date.strftime("%Y-%m-%d")
+                }
+            }
             
-            # Sắp xếp kết quả
-            query = query.order_by(Schedule.schedule_date, Schedule.schedule_startime)
+            if stream:
+                return {"success": True, "data": self._stream_teacher_availability(query, header, page_size)}
             
             schedules = query.all()
+            has_more = len(schedules) > page_size
+            schedules = schedules[:page_size]
             
             # Nhóm lịch theo ngày
             schedules_by_date = {}
             for schedule in schedules:
-                date_str = schedule.schedule_date.strftime("%Y-%m-%d")
-                if date_str not in schedules_by_date:
-                    schedules_by_date[date_str] = []
+                date_key = schedule.schedule_date.strftime("%Y-%m-%d")
+                if date_key not in schedules_by_date:
+                    schedules_by_date[date_key] = []
                 
-                schedules_by_date[date_str].append(schedule.to_dict())
+                schedules_by_date[date_key].append(schedule.to_dict())
             
             return {
                 "success": True,
                 "data": {
-                    "teacher": {
-                        "user_id": teacher.user_id,
-                        "user_name": teacher.user_name
-                    },
+                    **header,
                     "schedules_by_date": schedules_by_date,
-                    "total_schedules": len(schedules)
+                    "total_schedules": len(schedules),
+                    "next_cursor": self._availability_cursor(schedules[-1]) if has_more else None
                 }
             }
             
@@ -627,6 +1065,71 @@ class ScheduleService:
         except Exception as e:
             current_app.logger.error(f"Error in get_teacher_availability: {str(e)}")
             return {"success": False, "error": f"Error retrieving teacher availability: {str(e)}"}
+
+    def _stream_teacher_availability(self, query, header: Dict[str, Any],
+                                     page_size: int) -> Iterator[str]:
+        """
+        Sinh JSON của get_teacher_availability theo từng đoạn
+
+        Các dòng được đọc dần bằng yield_per và nhóm theo ngày ngay khi đọc
+        (truy vấn đã sắp xếp theo ngày), không giữ toàn bộ kết quả trong bộ nhớ.
+        """
+        try:
+            buffer = [
+                '{"teacher":', json.dumps(header["teacher"]),
+                ',"window":', json.dumps(header["window"]),
+                ',"schedules_by_date":{',
+            ]
+            buffered = 0
+            current_date = None
+            count = 0
+            last = None
+            has_more = False
+
+            for schedule in query.yield_per(self.AVAILABILITY_STREAM_BATCH):
+                if count == page_size:
+                    has_more = True
+                    break
+
+                date_key = schedule.schedule_date.strftime("%Y-%m-%d")
+                if date_key != current_date:
+                    if current_date is not None:
+                        buffer.append("],")
+                    buffer.append(json.dumps(date_key))
+                    buffer.append(":[")
+                    current_date = date_key
+                else:
+                    buffer.append(",")
+
+                chunk = json.dumps(schedule.to_dict())
+                buffer.append(chunk)
+                buffered += len(chunk)
+                count += 1
+                last = schedule
+
+                if buffered >= self.AVAILABILITY_STREAM_CHUNK:
+                    yield "".join(buffer)
+                    buffer = []
+                    buffered = 0
+
+            if current_date is not None:
+                buffer.append("]")
+            next_cursor = self._availability_cursor(last) if has_more else None
+            buffer.append('},"total_schedules":%d,"next_cursor":%s}' % (count, json.dumps(next_cursor)))
+            yield "".join(buffer)
+
+        except Exception as e:
+            # Header HTTP đã được gửi, chỉ có thể ghi log và ngắt response
+            current_app.logger.error(f"Error in stream_teacher_availability: {str(e)}")
+            raise
+
+    @staticmethod
+    def _availability_cursor(schedule: Schedule) -> str:
+        return encode_cursor({
+            "d": schedule.schedule_date,
+            "s": schedule.schedule_startime,
+            "id": schedule.schedule_id,
+        })
             
     def get_class_schedule(self, class_id: int, format_type: str = "list") -> Dict[str, Any]:
         """
@@ -646,7 +1149,8 @@ class ScheduleService:
                 return {"success": False, "error": f"Class with ID {class_id} not found"}
             
             # Lấy lịch học
-            schedules = Schedule.get_schedules_by_class(class_id)
+            relations = self.LIST_RELATIONS if format_type == "list" else self.CALENDAR_RELATIONS
+            schedules = Schedule.get_schedules_by_class(class_id, relations)
             
             if format_type == "list":
                 # Trả về danh sách lịch học
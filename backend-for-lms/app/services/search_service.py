@@ -0,0 +1,286 @@
+from typing import Dict, Any, Hashable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import threading
+import time as _time
+from flask import current_app
+from sqlalchemy import and_, event, inspect, or_
+from sqlalchemy.orm import Session
+
+from app.config import db
+from app.models.student_model import Student
+from app.models.teacher_model import Teacher
+from app.models.class_model import Class
+from app.models.words_model import Word
+from app.models.vocabulary_model import Vocabulary
+from app.models.search_index_change_model import SearchIndexChange
+from app.utils.text_search import TextIndex
+
+
+class _IndexSpec:
+    """Cấu hình một chỉ mục: model, khóa chính, các trường và trọng số"""
+
+    def __init__(self, model, key: str, fields: Tuple[str, ...], weights: Tuple[float, ...],
+                 primary_fields: int = 0, cache_size: int = 0):
+        self.model = model
+        self.key = key
+        self.fields = fields
+        self.weights = weights
+        self.primary_fields = primary_fields
+        self.cache_size = cache_size
+
+    def values(self, obj) -> Tuple[Optional[str], ...]:
+        return tuple(getattr(obj, field) for field in self.fields)
+
+    def changed(self, obj) -> bool:
+        """Có trường được đánh chỉ mục nào của obj (đang dirty) thay đổi không"""
+        attrs = inspect(obj).attrs
+        return any(attrs[field].history.has_changes() for field in self.fields)
+
+    def parse_key(self, raw: str) -> Hashable:
+        """Khóa chính từ cột doc_key (chuỗi) của nhật ký thay đổi"""
+        python_type = getattr(self.model, self.key).type.python_type
+        return python_type(raw)
+
+
+class _IndexState:
+    def __init__(self, spec: _IndexSpec):
+        self.spec = spec
+        self.index = TextIndex(spec.weights, spec.primary_fields, spec.cache_size)
+        self.built_at: Optional[float] = None
+        # Đã áp các thay đổi trong nhật ký tới thời điểm này (giờ của database)
+        self.synced_until: Optional[datetime] = None
+        self.last_sync: float = 0.0
+        self.lock = threading.Lock()
+
+
+class SearchService:
+    """Service tìm kiếm toàn văn (không dấu, xếp hạng) cho học viên, giáo viên, lớp học và từ điển"""
+
+    SPECS = {
+        "students": _IndexSpec(
+            Student, "user_id",
+            ("user_name", "user_email", "user_telephone", "user_id"),
+            (3.0, 2.0, 1.5, 1.0),
+        ),
+        "teachers": _IndexSpec(
+            Teacher, "user_id",
+            ("user_name", "user_email", "tch_specialization", "user_telephone"),
+            (3.0, 2.0, 1.5, 1.5),
+        ),
+        "classes": _IndexSpec(Class, "class_id", ("class_name",), (1.0,)),
+        # Từ điển: từ gốc Anh/Việt là trường chính, nghĩa giải thích là trường phụ
+        "words": _IndexSpec(
+            Word, "w_index",
+            ("w_english", "w_vietnamese", "w_englishmean", "w_vietnamesemean"),
+            (4.0, 4.0, 1.0, 1.0),
+            primary_fields=2, cache_size=1024,
+        ),
+        "vocabulary": _IndexSpec(
+            Vocabulary, "vc_index",
+            ("vc_english", "vc_vietnamese", "vc_englishmean", "vc_vietnamesemean"),
+            (4.0, 4.0, 1.0, 1.0),
+            primary_fields=2, cache_size=1024,
+        ),
+    }
+
+    # Thay đổi qua ORM ở tiến trình khác: đọc nhật ký search_index_changes sau
+    # mỗi SEARCH_INDEX_SYNC_SECONDS giây
+    DEFAULT_SYNC_SECONDS = 5
+    # Đọc lại các dòng trong khoảng này trước lần đồng bộ trước
+    # (transaction commit chậm hơn thời điểm ghi changed_at)
+    SYNC_OVERLAP = timedelta(seconds=30)
+    # Chỉ mục được xây lại định kỳ để bắt các thay đổi không đi qua ORM
+    # (câu lệnh SQL trực tiếp)
+    DEFAULT_TTL = 900
+    # Nhật ký cũ hơn thời gian này bị xóa (`flask search purge-changes`);
+    # tiến trình không đồng bộ lâu hơn TTL đã tự xây lại chỉ mục
+    CHANGE_RETENTION = timedelta(days=1)
+    # Từ khóa quá rộng (khớp nhiều hơn số này) lọc bằng LIKE thay cho IN (...)
+    MAX_SQL_IDS = 1000
+
+    _states: Dict[str, _IndexState] = {name: _IndexState(spec) for name, spec in SPECS.items()}
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def search_ids(self, name: str, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        Tìm khóa chính khớp với từ khóa, xếp theo độ liên quan
+
+        Args:
+            name: Tên chỉ mục ("students", "teachers", "classes", "words", "vocabulary")
+            query: Từ khóa tìm kiếm
+            limit: Số kết quả tối đa
+
+        Returns:
+            Danh sách khóa chính
+        """
+        state = self._states[name]
+        self._ensure_built(state)
+        return state.index.search(query, limit)
+
+    def id_filter(self, name: str, query: str):
+        """
+        Điều kiện SQL chọn các bản ghi khớp từ khóa, dùng để kết hợp với bộ lọc khác
+
+        Ít hơn MAX_SQL_IDS kết quả: `khóa IN (...)` từ chỉ mục. Từ khóa rộng
+        (vd. 1-2 ký tự khớp gần hết bảng) dùng LIKE '%từ%' trên các trường của
+        chỉ mục để câu lệnh không chứa danh sách ID khổng lồ; với collation
+        utf8mb4_unicode_ci của MySQL LIKE cũng không phân biệt hoa thường và dấu.
+        """
+        spec = SearchService.SPECS[name]
+        matched_ids = self.search_ids(name, query)
+        if len(matched_ids) <= self.MAX_SQL_IDS:
+            return getattr(spec.model, spec.key).in_(matched_ids)
+
+        columns = [getattr(spec.model, field) for field in spec.fields]
+        return and_(*(
+            or_(*(column.contains(term, autoescape=True) for column in columns))
+            for term in query.split()
+        ))
+
+    def fetch_ranked(self, name: str, ids: List[Hashable]) -> List[Any]:
+        """Lấy các bản ghi theo danh sách khóa chính (một truy vấn IN), giữ nguyên thứ tự"""
+        if not ids:
+            return []
+        spec = SearchService.SPECS[name]
+        key_column = getattr(spec.model, spec.key)
+        rows = {
+            getattr(obj, spec.key): obj
+            for obj in self.db.session.query(spec.model).filter(key_column.in_(ids))
+        }
+        # Bản ghi đã bị xóa ngoài ORM sẽ không có trong kết quả
+        return [rows[i] for i in ids if i in rows]
+
+    def rebuild(self, name: str) -> int:
+        """Xây lại chỉ mục từ database, trả về số tài liệu"""
+        state = self._states[name]
+        with state.lock:
+            self._build(state)
+        return len(state.index)
+
+    def purge_changes(self) -> int:
+        """Xóa nhật ký thay đổi cũ hơn CHANGE_RETENTION, trả về số dòng đã xóa"""
+        try:
+            deleted = self.db.session.query(SearchIndexChange).filter(
+                SearchIndexChange.changed_at < datetime.utcnow() - self.CHANGE_RETENTION
+            ).delete(synchronize_session=False)
+            self.db.session.commit()
+            return deleted
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in purge_changes: {str(e)}")
+            raise
+
+    def _ensure_built(self, state: _IndexState) -> None:
+        ttl = current_app.config.get("SEARCH_INDEX_TTL", self.DEFAULT_TTL)
+        interval = current_app.config.get("SEARCH_INDEX_SYNC_SECONDS", self.DEFAULT_SYNC_SECONDS)
+        now = _time.monotonic()
+        if state.built_at is not None and now - state.built_at <= ttl and now - state.last_sync < interval:
+            return
+        with state.lock:
+            now = _time.monotonic()
+            if state.built_at is None or now - state.built_at > ttl:
+                self._build(state)
+            elif now - state.last_sync >= interval:
+                self._sync(state)
+
+    def _build(self, state: _IndexState) -> None:
+        spec = state.spec
+        columns = [getattr(spec.model, spec.key)] + [getattr(spec.model, f) for f in spec.fields]
+        # Lấy version trước khi đọc: thay đổi được áp trong lúc đọc sẽ được áp
+        # lại lên chỉ mục mới thay vì bị ảnh chụp cũ ghi đè
+        version = state.index.version()
+        synced_until = datetime.utcnow()
+        try:
+            rows = self.db.session.query(*columns).all()
+        except Exception:
+            state.index.abort_rebuild()
+            raise
+        state.index.rebuild(((row[0], tuple(row[1:])) for row in rows), version)
+        state.built_at = state.last_sync = _time.monotonic()
+        state.synced_until = synced_until
+        current_app.logger.info(f"Search index '{spec.model.__tablename__}' rebuilt with {len(rows)} documents")
+
+    def _sync(self, state: _IndexState) -> None:
+        """Áp các thay đổi của tiến trình khác từ nhật ký search_index_changes"""
+        spec = state.spec
+        name = _MODEL_INDEXES[spec.model]
+        synced_until = datetime.utcnow()
+        raw_keys = {
+            row[0]
+            for row in self.db.session.query(SearchIndexChange.doc_key).filter(
+                SearchIndexChange.index_name == name,
+                SearchIndexChange.changed_at >= state.synced_until - self.SYNC_OVERLAP,
+            )
+        }
+        if raw_keys:
+            keys = [spec.parse_key(raw) for raw in raw_keys]
+            key_column = getattr(spec.model, spec.key)
+            columns = [key_column] + [getattr(spec.model, f) for f in spec.fields]
+            found = {}
+            for start in range(0, len(keys), self.MAX_SQL_IDS):
+                chunk = keys[start:start + self.MAX_SQL_IDS]
+                for row in self.db.session.query(*columns).filter(key_column.in_(chunk)):
+                    found[row[0]] = tuple(row[1:])
+            for key in keys:
+                if key in found:
+                    state.index.add(key, found[key])
+                else:
+                    state.index.remove(key)
+        state.synced_until = synced_until
+        state.last_sync = _time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# Đồng bộ chỉ mục với thay đổi qua ORM:
+# - ghi nhật ký search_index_changes ngay trong after_flush (cùng transaction)
+#   cho các tiến trình khác
+# - ghi nhận ở after_flush, áp dụng vào chỉ mục của tiến trình này khi commit
+# ---------------------------------------------------------------------------
+
+_CHANGES_KEY = "search_index_changes"
+_MODEL_INDEXES = {spec.model: name for name, spec in SearchService.SPECS.items()}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_search_changes(session, flush_context):
+    flushed = []
+    for obj in list(session.new) + list(session.dirty):
+        name = _MODEL_INDEXES.get(type(obj))
+        if name is None:
+            continue
+        spec = SearchService.SPECS[name]
+        # Sửa cột không được đánh chỉ mục (vd. is_email_verified, băm lại mật khẩu) thì bỏ qua
+        if obj in session.new or spec.changed(obj):
+            flushed.append((name, getattr(obj, spec.key), spec.values(obj)))
+    for obj in session.deleted:
+        name = _MODEL_INDEXES.get(type(obj))
+        if name is not None:
+            flushed.append((name, getattr(obj, SearchService.SPECS[name].key), None))
+    if not flushed:
+        return
+
+    session.info.setdefault(_CHANGES_KEY, []).extend(flushed)
+    now = datetime.utcnow()
+    session.connection().execute(
+        SearchIndexChange.__table__.insert(),
+        [{"index_name": name, "doc_key": str(key), "changed_at": now} for name, key, _ in flushed],
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_changes(session):
+    for name, key, values in session.info.pop(_CHANGES_KEY, ()):
+        state = SearchService._states[name]
+        if state.built_at is None:
+            continue
+        if values is None:
+            state.index.remove(key)
+        else:
+            state.index.add(key, values)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_search_changes(session, previous_transaction):
+    session.info.pop(_CHANGES_KEY, None)
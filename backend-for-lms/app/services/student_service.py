@@ -3,6 +3,9 @@ from sqlalchemy.exc import IntegrityError
 from flask import current_app
 from app.config import db
 from app.models.student_model import Student
+from app.utils.cursor import keyset_page
+from app.utils.id_allocator import ids
+from app.services.search_service import SearchService
 from datetime import datetime, date
 from werkzeug.security import generate_password_hash
 from werkzeug.exceptions import NotFound, BadRequest, Conflict
@@ -14,18 +17,27 @@ class StudentService:
     def __init__(self, database=None):
         self.db = database or db
 
-    def get_all_students(self, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    def get_all_students(
+        self, page: int = 1, per_page: int = 10,
+        cursor: Optional[str] = None, include_total: bool = False
+    ) -> Dict[str, Any]:
         """
         Retrieve all students with pagination
 
         Args:
             page: Page number
             per_page: Number of students per page
+            cursor: Use keyset pagination instead of page ("" for the first page,
+                    then the next_cursor of the previous page)
+            include_total: With cursor, also count all matching rows
 
         Returns:
             Dict with students data and pagination info
         """
         try:
+            if cursor is not None:
+                return self._cursor_page(Student.query, "user_id", "asc", cursor, per_page, include_total)
+
             pagination = Student.query.paginate(
                 page=page, per_page=per_page, error_out=False
             )
@@ -97,13 +109,7 @@ class StudentService:
                 return {"success": False, "error": "Email already exists"}
 
             # Generate student ID
-            last_student = Student.query.order_by(Student.user_id.desc()).first()
-            if last_student:
-                # Extract number from last ID and increment
-                last_id = int(last_student.user_id[1:])
-                new_id = f"S{(last_id + 1):08d}"
-            else:
-                new_id = "S00000001"
+            new_id = ids.next_id("student")
 
             # Process birthday if provided
             if "user_birthday" in data and data["user_birthday"]:
@@ -295,42 +301,94 @@ class StudentService:
             current_app.logger.error(f"Error deleting student {student_id}: {str(e)}")
             return {"success": False, "error": f"Error deleting student: {str(e)}"}
 
+    def _cursor_page(
+        self, query, sort_by: str, sort_order: str, cursor: str,
+        per_page: int, include_total: bool
+    ) -> Dict[str, Any]:
+        """
+        Return one keyset page of students in the same shape as the paginated listings
+
+        Args:
+            query: Filtered student query
+            sort_by: Student column to sort on (user_id is the tiebreaker)
+            sort_order: "asc" or "desc"
+            cursor: Continuation token ("" for the first page)
+            per_page: Number of students per page
+            include_total: Also count all matching rows
+
+        Returns:
+            Dict with students data and cursor pagination info
+        """
+        if sort_by not in Student.__table__.columns:
+            return {"success": False, "error": f"Invalid sort field: {sort_by}"}
+
+        try:
+            students, page_info = keyset_page(
+                query, getattr(Student, sort_by), Student.user_id,
+                cursor, per_page, descending=sort_order == "desc"
+            )
+        except ValueError as e:
+            return {"success": False, "error": str(e)}
+
+        if include_total:
+            page_info["total"] = query.order_by(None).count()
+
+        return {
+            "success": True,
+            "data": {
+                "students": [student.to_dict() for student in students],
+                "pagination": page_info,
+            },
+        }
+
     def search_students(
-        self, search_query: str, page: int = 1, per_page: int = 10
+        self, search_query: str, page: int = 1, per_page: int = 10,
+        cursor: Optional[str] = None, include_total: bool = False
     ) -> Dict[str, Any]:
         """
-        Search students by name, email or ID
+        Search students by name, email, phone or ID
+
+        Matching ignores case and Vietnamese diacritics; results are ranked by relevance.
 
         Args:
             search_query: Search query string
             page: Page number
             per_page: Number of students per page
+            cursor: Use keyset pagination instead of page
+            include_total: With cursor, also count all matching rows
 
         Returns:
             Dict with search results
         """
         try:
-            search = f"%{search_query}%"
-            query = Student.query.filter(
-                (Student.user_name.ilike(search))
-                | (Student.user_email.ilike(search))
-                | (Student.user_id.ilike(search))
-            )
+            # Ranked IDs from the accent-insensitive search index
+            search_service = SearchService(self.db)
 
-            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-            students = pagination.items
+            if cursor is not None:
+                # Bounded IN (...) for narrow terms, LIKE for terms matching most of the table
+                query = Student.query.filter(search_service.id_filter("students", search_query))
+                return self._cursor_page(query, "user_id", "asc", cursor, per_page, include_total)
+
+            matched_ids = search_service.search_ids("students", search_query)
+
+            total = len(matched_ids)
+            pages = (total + per_page - 1) // per_page if per_page > 0 else 0
+            offset = (page - 1) * per_page
+            students = search_service.fetch_ranked(
+                "students", matched_ids[offset:offset + per_page]
+            )
 
             return {
                 "success": True,
                 "data": {
                     "students": [student.to_dict() for student in students],
                     "pagination": {
-                        "total": pagination.total,
-                        "pages": pagination.pages,
+                        "total": total,
+                        "pages": pages,
                         "page": page,
                         "per_page": per_page,
-                        "has_next": pagination.has_next,
-                        "has_prev": pagination.has_prev,
+                        "has_next": page < pages,
+                        "has_prev": page > 1,
                     },
                 },
             }
@@ -339,7 +397,8 @@ class StudentService:
             return {"success": False, "error": f"Error searching students: {str(e)}"}
 
     def filter_students(
-        self, filters: Dict[str, Any], page: int = 1, per_page: int = 10
+        self, filters: Dict[str, Any], page: int = 1, per_page: int = 10,
+        cursor: Optional[str] = None, include_total: bool = False
     ) -> Dict[str, Any]:
         """
         Filter students by various criteria
@@ -348,6 +407,8 @@ class StudentService:
             filters: Dictionary containing filter criteria
             page: Page number
             per_page: Number of students per page
+            cursor: Use keyset pagination instead of page
+            include_total: With cursor, also count all matching rows
 
         Returns:
             Dict with filtered results
@@ -393,6 +454,9 @@ class StudentService:
             sort_by = filters.get("sort_by", "user_name")
             sort_order = filters.get("sort_order", "asc")
 
+            if cursor is not None:
+                return self._cursor_page(query, sort_by, sort_order, cursor, per_page, include_total)
+
             if hasattr(Student, sort_by):
                 if sort_order == "desc":
                     query = query.order_by(getattr(Student, sort_by).desc())
@@ -1,9 +1,11 @@
 from app.config import db
 from app.models.teacher_model import Teacher
+from app.services.search_service import SearchService
+from app.services.teacher_statistics_service import TeacherStatisticsService
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
-import uuid
+from app.utils.id_allocator import ids
 
 
 class TeacherService:
@@ -47,14 +49,10 @@ class TeacherService:
             return {"data": [], "total": 0}
 
     def search(self, keyword: str) -> List[Teacher]:
-        """Tìm kiếm teachers theo từ khóa"""
+        """Tìm kiếm teachers theo từ khóa (không phân biệt dấu, xếp theo độ liên quan)"""
         try:
-            keyword = f"%{keyword}%"
-            return self.db.session.query(Teacher).filter(
-                Teacher.user_name.ilike(keyword) |
-                Teacher.user_email.ilike(keyword) |
-                Teacher.tch_specialization.ilike(keyword)
-            ).all()
+            search_service = SearchService(self.db)
+            return search_service.fetch_ranked("teachers", search_service.search_ids("teachers", keyword))
         except Exception as e:
             print(f"Lỗi khi tìm kiếm teachers: {str(e)}")
             return []
@@ -62,41 +60,26 @@ class TeacherService:
     def get_senior_teachers(self) -> List[Teacher]:
         """Lấy danh sách giáo viên thâm niên (> 5 năm)"""
         try:
-            teachers = self.db.session.query(Teacher).all()
-            senior_teachers = [teacher for teacher in teachers if teacher.is_senior_teacher()]
-            return senior_teachers
+            return self.db.session.query(Teacher).filter(
+                Teacher.tch_hire_date <= Teacher.senior_hire_cutoff()
+            ).all()
         except Exception as e:
             print(f"Lỗi khi lấy giáo viên thâm niên: {str(e)}")
             return []
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Lấy thống kê giáo viên"""
+        """Lấy thống kê giáo viên (đọc từ bộ đếm teacher_statistics)"""
         try:
-            total_teachers = self.db.session.query(Teacher).count()
-            senior_teachers = len(self.get_senior_teachers())
-            
-            # Thống kê theo giới tính
-            gender_stats = self.db.session.query(
-                Teacher.user_gender,
-                self.db.func.count(Teacher.user_id)
-            ).group_by(Teacher.user_gender).all()
-            
-            gender_data = {gender: count for gender, count in gender_stats if gender}
-            
-            # Thống kê theo chuyên môn
-            specialization_stats = self.db.session.query(
-                Teacher.tch_specialization,
-                self.db.func.count(Teacher.user_id)
-            ).group_by(Teacher.tch_specialization).all()
-            
-            specialization_data = {spec: count for spec, count in specialization_stats if spec}
+            snapshot = TeacherStatisticsService(self.db).get_snapshot()
+            total_teachers = snapshot["total"]
+            senior_teachers = TeacherStatisticsService.senior_count(snapshot)
             
             return {
                 "total_teachers": total_teachers,
                 "senior_teachers": senior_teachers,
                 "junior_teachers": total_teachers - senior_teachers,
-                "gender_distribution": gender_data,
-                "specialization_distribution": specialization_data
+                "gender_distribution": snapshot["gender"],
+                "specialization_distribution": snapshot["specialization"]
             }
         except Exception as e:
             print(f"Lỗi khi lấy thống kê: {str(e)}")
@@ -197,20 +180,8 @@ class TeacherService:
 
     # --------- HELPER METHODS ----------
     def _generate_user_id(self) -> str:
-        """Tạo user_id tự động"""
-        # Tìm user_id lớn nhất hiện tại
-        max_id = self.db.session.query(self.db.func.max(Teacher.user_id)).scalar()
-        
-        if max_id:
-            # Tăng số cuối cùng
-            try:
-                number = int(max_id[2:])  # Bỏ "TC" ở đầu
-                return f"TC{number + 1:06d}"
-            except ValueError:
-                pass
-        
-        # Nếu không có hoặc lỗi, bắt đầu từ TC000001
-        return "TC000001"
+        """Tạo user_id tự động (TC000001, TC000002...)"""
+        return ids.next_id("staff_teacher")
 
     def create_test_teachers(self) -> List[Teacher]:
         """Tạo dữ liệu test cho teachers"""
@@ -0,0 +1,182 @@
+from typing import Dict, Any, Iterable, Tuple
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from app.config import db
+from app.models.teacher_model import Teacher, SENIOR_BUCKETS
+from app.models.teacher_statistics_model import TeacherStatistic
+
+# Các chiều thống kê: dimension -> thuộc tính của Teacher tạo ra bucket
+DIMENSIONS = ("gender", "specialization", "seniority")
+
+
+def _buckets(gender, specialization, hire_date, today: date) -> Iterable[Tuple[str, str]]:
+    """Các nhóm (dimension, bucket) mà một giáo viên được đếm vào"""
+    yield "total", ""
+    yield "gender", gender or ""
+    yield "specialization", specialization or ""
+    yield "seniority", Teacher.seniority_bucket(hire_date, today)
+
+
+class TeacherStatisticsService:
+    """
+    Service đọc/đối soát bảng teacher_statistics
+
+    Bộ đếm được cập nhật tăng dần trong cùng transaction với mỗi lần thêm/sửa/xóa
+    giáo viên qua ORM. Nhóm thâm niên thay đổi theo thời gian (không cần ghi gì),
+    nên bảng được đối soát lại toàn bộ mỗi ngày: tự động ở lần đọc đầu tiên trong
+    ngày, hoặc bằng lệnh `flask teachers reconcile-stats` chạy định kỳ.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        Đọc toàn bộ bộ đếm (số dòng bằng số nhóm, không phụ thuộc số giáo viên)
+
+        Returns:
+            {"total", "gender": {...}, "specialization": {...}, "seniority": {...}, "reconciled_at"}
+        """
+        rows = self.db.session.query(TeacherStatistic).all()
+        total_row = next((row for row in rows if row.dimension == "total"), None)
+        if total_row is None or total_row.reconciled_at is None or total_row.reconciled_at.date() < date.today():
+            self.reconcile()
+            rows = self.db.session.query(TeacherStatistic).all()
+            total_row = next((row for row in rows if row.dimension == "total"), None)
+
+        snapshot = {dimension: {} for dimension in DIMENSIONS}
+        for row in rows:
+            if row.dimension in snapshot and row.bucket and row.teacher_count:
+                snapshot[row.dimension][row.bucket] = row.teacher_count
+        snapshot["total"] = total_row.teacher_count if total_row else 0
+        snapshot["reconciled_at"] = (
+            total_row.reconciled_at.isoformat() if total_row and total_row.reconciled_at else None
+        )
+        return snapshot
+
+    def reconcile(self) -> Dict[str, Any]:
+        """
+        Tính lại bộ đếm từ bảng teachers và ghi đè bảng teacher_statistics
+
+        Các dòng thống kê hiện có bị khóa trong lúc đếm: giáo viên được ghi đồng
+        thời sẽ chờ và cộng dồn lên kết quả mới sau khi đối soát commit.
+
+        Returns:
+            {"rows": số nhóm, "changes": [{"dimension", "bucket", "before", "after"}]}
+        """
+        try:
+            today = date.today()
+            stored = {
+                (row.dimension, row.bucket): row.teacher_count
+                for row in self.db.session.query(TeacherStatistic).with_for_update()
+            }
+
+            fresh: Dict[Tuple[str, str], int] = {}
+            grouped = self.db.session.query(
+                Teacher.user_gender, Teacher.tch_specialization, Teacher.tch_hire_date, func.count()
+            ).group_by(Teacher.user_gender, Teacher.tch_specialization, Teacher.tch_hire_date)
+            for gender, specialization, hire_date, count in grouped:
+                for key in _buckets(gender, specialization, hire_date, today):
+                    fresh[key] = fresh.get(key, 0) + count
+            fresh.setdefault(("total", ""), 0)
+
+            changes = [
+                {"dimension": key[0], "bucket": key[1], "before": stored.get(key, 0), "after": fresh.get(key, 0)}
+                for key in sorted(set(stored) | set(fresh))
+                if stored.get(key, 0) != fresh.get(key, 0)
+            ]
+
+            now = datetime.now()
+            self.db.session.query(TeacherStatistic).delete(synchronize_session=False)
+            self.db.session.execute(TeacherStatistic.__table__.insert(), [
+                {"dimension": dimension, "bucket": bucket, "teacher_count": count, "reconciled_at": now}
+                for (dimension, bucket), count in fresh.items()
+            ])
+            self.db.session.commit()
+
+            if changes:
+                current_app.logger.info(f"Teacher statistics reconciled with {len(changes)} corrections")
+            return {"rows": len(fresh), "changes": changes}
+
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in reconcile: {str(e)}")
+            raise
+
+    @staticmethod
+    def senior_count(snapshot: Dict[str, Any]) -> int:
+        return sum(snapshot["seniority"].get(bucket, 0) for bucket in SENIOR_BUCKETS)
+
+
+# ---------------------------------------------------------------------------
+# Cập nhật bộ đếm trong cùng transaction với thay đổi của bảng teachers
+# ---------------------------------------------------------------------------
+
+_TRACKED = ("user_gender", "tch_specialization", "tch_hire_date")
+
+
+def _old_value(obj, attribute: str):
+    history = inspect(obj).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attribute)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_teacher_statistics(session, flush_context):
+    today = date.today()
+    deltas: Dict[Tuple[str, str], int] = {}
+
+    def count(values, sign):
+        for key in _buckets(*values, today):
+            deltas[key] = deltas.get(key, 0) + sign
+
+    for obj in session.new:
+        if isinstance(obj, Teacher):
+            count([getattr(obj, name) for name in _TRACKED], 1)
+    for obj in session.dirty:
+        if isinstance(obj, Teacher) and any(inspect(obj).attrs[name].history.has_changes() for name in _TRACKED):
+            count([_old_value(obj, name) for name in _TRACKED], -1)
+            count([getattr(obj, name) for name in _TRACKED], 1)
+    for obj in session.deleted:
+        if isinstance(obj, Teacher):
+            count([_old_value(obj, name) for name in _TRACKED], -1)
+
+    changed = {key: delta for key, delta in deltas.items() if delta}
+    if changed:
+        _apply_deltas(session.connection(), changed)
+
+
+def _apply_deltas(connection, deltas: Dict[Tuple[str, str], int]) -> None:
+    """Cộng delta vào từng dòng thống kê (upsert nguyên tử theo dialect)"""
+    table = TeacherStatistic.__table__
+    dialect = connection.dialect.name
+
+    for (dimension, bucket), delta in deltas.items():
+        values = {"dimension": dimension, "bucket": bucket, "teacher_count": delta}
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+
+            statement = insert(table).values(**values).on_duplicate_key_update(
+                teacher_count=table.c.teacher_count + delta
+            )
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+
+            statement = insert(table).values(**values).on_conflict_do_update(
+                index_elements=[table.c.dimension, table.c.bucket],
+                set_={"teacher_count": table.c.teacher_count + delta},
+            )
+        else:
+            updated = connection.execute(
+                table.update()
+                .where(table.c.dimension == dimension, table.c.bucket == bucket)
+                .values(teacher_count=table.c.teacher_count + delta)
+            ).rowcount
+            if updated:
+                continue
+            statement = table.insert().values(**values)
+        connection.execute(statement)
@@ -0,0 +1,260 @@
+import calendar
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+import jwt
+from flask import current_app
+
+from app.config import db
+from app.models.revoked_token_model import RevokedToken
+from app.models.student_model import Student
+from app.models.teacher_model import Teacher
+from app.utils.bloom_filter import BloomFilter
+from app.utils.ttl_cache import TTLCache
+
+# Thời hạn token do AuthService._create_token phát hành
+TOKEN_LIFETIME = timedelta(hours=24)
+
+DEFAULT_CACHE_TTL = 60
+MAX_CACHE_TTL = 300
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_SYNC_SECONDS = 5
+# Đọc lại các dòng thu hồi trong khoảng này trước lần đồng bộ trước
+# (transaction commit chậm hơn thời điểm ghi revoked_at)
+SYNC_OVERLAP = timedelta(seconds=30)
+# Dựng lại bloom filter định kỳ để bỏ các dòng đã hết hạn
+REBUILD_SECONDS = 3600
+
+ROLE_MODELS = {"teacher": Teacher, "student": Student}
+
+
+def epoch_ms(value: datetime) -> int:
+    """Thời điểm UTC (naive) dưới dạng mili giây từ epoch"""
+    return calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class RevocationList:
+    """
+    Danh sách thu hồi trong bộ nhớ, đồng bộ từ bảng revoked_tokens
+
+    - Token bị thu hồi (đăng xuất): bloom filter; "có thể có" mới hỏi lại DB
+    - Người dùng bị thu hồi (đổi mật khẩu): dict user -> thời điểm (mili giây),
+      vì chỉ gồm các lần đổi mật khẩu trong TOKEN_LIFETIME gần nhất
+    Mỗi tiến trình đọc thêm các dòng mới sau mỗi REVOCATION_SYNC_SECONDS, nên
+    thu hồi ở tiến trình khác có hiệu lực chậm tối đa chừng đó giây.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Optional[BloomFilter] = None
+        self._users: Dict[str, int] = {}
+        self._synced_until: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._rebuilt_at = 0.0
+        self.db_checks = 0
+
+    def is_token_revoked(self, key: str) -> bool:
+        self._ensure_fresh()
+        if key not in self._tokens:
+            return False
+        self.db_checks += 1
+        return db.session.get(RevokedToken, key) is not None
+
+    def user_revoked_at(self, key: str) -> Optional[int]:
+        self._ensure_fresh()
+        return self._users.get(key)
+
+    def add_local(self, key: str, revoked_at: datetime) -> None:
+        """Áp dụng ngay trong tiến trình hiện tại (không chờ lần đồng bộ tới)"""
+        self._ensure_fresh()
+        with self._lock:
+            self._remember(key, revoked_at)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens = None
+            self._users = {}
+            self._synced_until = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "revoked_tokens": self._tokens.count if self._tokens else 0,
+                "bloom_bytes": self._tokens.nbytes if self._tokens else 0,
+                "revoked_users": len(self._users),
+                "db_checks": self.db_checks,
+                "synced_until": self._synced_until.isoformat() if self._synced_until else None,
+            }
+
+    def _remember(self, key: str, revoked_at: datetime) -> None:
+        if key.startswith("user:"):
+            self._users[key] = max(self._users.get(key, 0), epoch_ms(revoked_at))
+        else:
+            self._tokens.add(key)
+
+    def _ensure_fresh(self) -> None:
+        interval = current_app.config.get("REVOCATION_SYNC_SECONDS", DEFAULT_SYNC_SECONDS)
+        if self._tokens is not None and time.monotonic() - self._last_sync < interval:
+            return
+        with self._lock:
+            if self._tokens is not None and time.monotonic() - self._last_sync < interval:
+                return
+            now = datetime.utcnow()
+            rebuild = (
+                self._tokens is None
+                or self._tokens.saturated
+                or time.monotonic() - self._rebuilt_at > REBUILD_SECONDS
+            )
+            query = db.session.query(RevokedToken.token_key, RevokedToken.revoked_at)
+            if rebuild:
+                rows = query.filter(RevokedToken.expires_at > now).all()
+                self._tokens = BloomFilter(capacity=max(10000, 2 * len(rows)))
+                self._users = {}
+                self._rebuilt_at = time.monotonic()
+            else:
+                rows = query.filter(RevokedToken.revoked_at >= self._synced_until - SYNC_OVERLAP).all()
+            for key, revoked_at in rows:
+                self._remember(key, revoked_at)
+            self._synced_until = now
+            self._last_sync = time.monotonic()
+
+
+# Cache dùng chung của tiến trình: token hash -> {"payload", "user"}
+token_cache = TTLCache(max_entries=DEFAULT_CACHE_SIZE, ttl=MAX_CACHE_TTL)
+revocations = RevocationList()
+
+
+class TokenSessionService:
+    """
+    Xác thực JWT có cache và danh sách thu hồi
+
+    Lần đầu gặp một token: kiểm tra chữ ký HS256 rồi cache claims (và hồ sơ
+    người dùng khi được hỏi tới) trong TOKEN_CACHE_TTL giây (tối đa MAX_CACHE_TTL).
+    Các lần sau chỉ còn tra cache và kiểm tra thu hồi trong bộ nhớ, không giải mã
+    và không truy vấn DB.
+    Hồ sơ trong cache có thể cũ tối đa TOKEN_CACHE_TTL giây sau khi cập nhật.
+    """
+
+    def __init__(self, database=None):
+        self.db = database or db
+
+    def verify(self, token: str) -> Tuple[bool, Dict[str, Any]]:
+        """(is_valid, payload) giống AuthService.verify_token"""
+        ok, entry = self._entry(token)
+        return (True, entry["payload"]) if ok else (False, entry)
+
+    def get_user(self, token: str) -> Optional[Dict[str, Any]]:
+        """{"user": ..., "role": ...} của token, hồ sơ được cache cùng claims"""
+        ok, entry = self._entry(token)
+        if not ok:
+            return None
+        if entry["user"] is None:
+            payload = entry["payload"]
+            model = ROLE_MODELS.get(payload.get("role"))
+            user = self.db.session.get(model, payload.get("sub")) if model else None
+            if user is None:
+                return None
+            entry["user"] = {"user": user.to_dict(), "role": payload["role"]}
+        return entry["user"]
+
+    def is_revoked(self, payload: Dict[str, Any], hashed: Optional[str] = None) -> bool:
+        """Token bị thu hồi riêng lẻ hoặc phát hành trước lần thu hồi của người dùng"""
+        revoked_at = revocations.user_revoked_at(f"user:{payload.get('role')}:{payload.get('sub')}")
+        # So theo mili giây: iat chỉ có độ chính xác giây nên token phát hành cùng
+        # giây với lần thu hồi sẽ bị chấp nhận hoặc từ chối nhầm. Token cũ chưa có
+        # iat_ms thì dùng iat
+        issued_at = payload.get("iat_ms", payload.get("iat", 0) * 1000)
+        if revoked_at is not None and issued_at < revoked_at:
+            return True
+        token_id = payload.get("jti") or hashed
+        return bool(token_id) and revocations.is_token_revoked(f"jti:{token_id}")
+
+    def revoke_token(self, token: str) -> bool:
+        """Thu hồi một token (đăng xuất); False nếu token đã không hợp lệ"""
+        hashed = token_hash(token)
+        ok, payload = self.verify(token)
+        if not ok:
+            return False
+
+        key = f"jti:{payload.get('jti') or hashed}"
+        now = datetime.utcnow()
+        expires_at = datetime.utcfromtimestamp(payload["exp"]) if payload.get("exp") else now + TOKEN_LIFETIME
+        self._store(key, now, expires_at)
+        token_cache.pop(hashed)
+        return True
+
+    def revoke_user(self, role: str, user_id: str) -> None:
+        """Thu hồi mọi token của người dùng đã phát hành tới thời điểm này"""
+        key, now = self.stage_user_revocation(role, user_id)
+        self._store(key, now, now + TOKEN_LIFETIME)
+
+    def stage_user_revocation(self, role: str, user_id: str) -> Tuple[str, datetime]:
+        """
+        Ghi dòng thu hồi người dùng vào session hiện tại, không commit
+
+        Dùng khi thu hồi phải nằm cùng transaction với thay đổi khác (vd. đổi mật
+        khẩu). Sau khi commit thành công, gọi apply_revocation với giá trị trả về.
+
+        Returns:
+            (token_key, revoked_at)
+        """
+        key = f"user:{role}:{user_id}"
+        now = datetime.utcnow()
+        self.db.session.merge(RevokedToken(token_key=key, revoked_at=now, expires_at=now + TOKEN_LIFETIME))
+        return key, now
+
+    @staticmethod
+    def apply_revocation(revocation: Tuple[str, datetime]) -> None:
+        """Áp dụng ngay trong tiến trình hiện tại một thu hồi đã commit"""
+        revocations.add_local(*revocation)
+
+    def _store(self, key: str, revoked_at: datetime, expires_at: datetime) -> None:
+        try:
+            self.db.session.merge(RevokedToken(token_key=key, revoked_at=revoked_at, expires_at=expires_at))
+            self.db.session.commit()
+        except Exception as e:
+            self.db.session.rollback()
+            current_app.logger.error(f"Error in _store: {str(e)}")
+            raise
+        self.apply_revocation((key, revoked_at))
+
+    def _entry(self, token: str) -> Tuple[bool, Dict[str, Any]]:
+        hashed = token_hash(token)
+        entry = token_cache.get(hashed)
+        if entry is None:
+            try:
+                payload = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
+            except jwt.ExpiredSignatureError:
+                return False, {"error": "Token expired"}
+            except jwt.InvalidTokenError:
+                return False, {"error": "Invalid token"}
+
+            entry = {"payload": payload, "user": None}
+            ttl = current_app.config.get("TOKEN_CACHE_TTL", DEFAULT_CACHE_TTL)
+            if payload.get("exp"):
+                ttl = min(ttl, payload["exp"] - time.time())
+            token_cache.set(hashed, entry, ttl)
+
+        if self.is_revoked(entry["payload"], hashed):
+            token_cache.pop(hashed)
+            return False, {"error": "Token revoked"}
+        return True, entry
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {"cache": token_cache.stats(), "revocations": revocations.stats()}
+
+
+def register_jwt_callbacks(jwt_manager) -> None:
+    """Cho các route @jwt_required dùng chung danh sách thu hồi"""
+
+    @jwt_manager.token_in_blocklist_loader
+    def _token_revoked(jwt_header, jwt_payload):
+        return TokenSessionService().is_revoked(jwt_payload)
@@ -0,0 +1,301 @@
+"""
+Đáp án đã biên dịch của một bài kiểm tra và chấm bài trong bộ nhớ
+
+Đáp án được dựng một lần từ has_question + answers (một truy vấn) thành dạng
+mảng gọn: câu thứ i trong bài -> bitmask các phương án đúng, mỗi phương án
+(as_index) ứng với một bit trong câu của nó. Chấm một câu chỉ là OR các bit đã
+chọn rồi so với mask đúng, không truy vấn database.
+
+AnswerKeyCache giữ các đáp án theo test_id (LRU, có bộ đếm hit/miss). Mỗi đáp
+án mang version của bài (bảng answer_key_versions) lúc nạp; get() nạp lại khi
+version trong DB khác (thay đổi từ tiến trình khác) hoặc khi quá TTL. Thay đổi
+qua ORM trong cùng tiến trình còn làm mất hiệu lực ngay khi commit
+(xem app/services/grading_service.py).
+
+Bài nộp (answer sheet) nhận một trong hai dạng:
+    {"12": 48, "13": [51, 52]}                     # qs_index -> as_index hoặc danh sách
+    [{"qs_index": 12, "as_index": 48}, ...]         # danh sách, as_index có thể là danh sách
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, NamedTuple, Optional, Set, Tuple
+
+# Mỗi câu tối đa 64 phương án (một phần tử 'Q' của mask)
+MAX_OPTIONS_PER_QUESTION = 64
+# Thời gian tối đa giữ một đáp án, kể cả khi không ai báo thay đổi (giây)
+DEFAULT_TTL = 300
+
+
+class AnswerKey(NamedTuple):
+    test_id: int
+    # qs_index theo thứ tự câu hỏi trong bài
+    question_ids: Tuple[int, ...]
+    # Bitmask phương án đúng của từng câu, cùng thứ tự với question_ids (0 = chưa có đáp án)
+    correct_masks: array
+    # qs_index -> vị trí trong question_ids
+    positions: Dict[int, int]
+    # as_index -> (vị trí câu chứa phương án, bit của phương án)
+    option_bits: Dict[int, Tuple[int, int]]
+    # Số câu có đáp án đúng (câu chưa có đáp án không tính điểm)
+    gradable_count: int
+    total_score: Optional[float]
+    passing_score: Optional[float]
+
+
+def compile_answer_key(test_id: int, rows: Iterable[tuple]) -> Optional[AnswerKey]:
+    """
+    Dựng đáp án từ các dòng (total_score, passing_score, qs_index, question_order, as_index, as_true)
+
+    Dòng có qs_index/as_index là None đến từ outer join (bài chưa có câu hỏi,
+    câu chưa có phương án). Trả về None nếu không có dòng nào (bài không tồn tại).
+
+    Raises:
+        ValueError: Một câu có nhiều hơn MAX_OPTIONS_PER_QUESTION phương án
+    """
+    rows = list(rows)
+    if not rows:
+        return None
+
+    total_score, passing_score = rows[0][0], rows[0][1]
+    orders: Dict[int, Any] = {}
+    options: Dict[int, Dict[int, bool]] = {}
+    for _, _, qs_index, question_order, as_index, as_true in rows:
+        if qs_index is None:
+            continue
+        orders[qs_index] = question_order
+        choices = options.setdefault(qs_index, {})
+        if as_index is not None:
+            choices[as_index] = bool(as_true)
+
+    # Câu chưa đánh số thứ tự xếp sau cùng, theo qs_index
+    question_ids = tuple(sorted(orders, key=lambda q: (orders[q] is None, orders[q] or 0, q)))
+    correct_masks = array("Q", bytes(8 * len(question_ids)))
+    option_bits = {}
+    for position, qs_index in enumerate(question_ids):
+        choices = options[qs_index]
+        if len(choices) > MAX_OPTIONS_PER_QUESTION:
+            raise ValueError(f"Question {qs_index} has more than {MAX_OPTIONS_PER_QUESTION} options")
+        for slot, as_index in enumerate(sorted(choices)):
+            bit = 1 << slot
+            option_bits[as_index] = (position, bit)
+            if choices[as_index]:
+                correct_masks[position] |= bit
+
+    return AnswerKey(
+        test_id=test_id,
+        question_ids=question_ids,
+        correct_masks=correct_masks,
+        positions={q: i for i, q in enumerate(question_ids)},
+        option_bits=option_bits,
+        gradable_count=sum(1 for mask in correct_masks if mask),
+        total_score=_as_float(total_score),
+        passing_score=_as_float(passing_score),
+    )
+
+
+def normalize_sheet(sheet: Any) -> Dict[int, FrozenSet[int]]:
+    """
+    Chuẩn hóa bài nộp thành {qs_index: frozenset(as_index)}
+
+    Raises:
+        ValueError: Bài nộp sai định dạng
+    """
+    if isinstance(sheet, dict):
+        items = sheet.items()
+    elif isinstance(sheet, list):
+        items = []
+        for entry in sheet:
+            if not isinstance(entry, dict) or "qs_index" not in entry:
+                raise ValueError("Each answer must be an object with qs_index")
+            items.append((entry["qs_index"], entry.get("as_index")))
+    else:
+        raise ValueError("answers must be an object or a list")
+
+    normalized = {}
+    for qs_index, chosen in items:
+        qs_index = _as_int(qs_index, "qs_index")
+        if chosen is None:
+            options = frozenset()
+        elif isinstance(chosen, list):
+            options = frozenset(_as_int(value, "as_index") for value in chosen)
+        else:
+            options = frozenset((_as_int(chosen, "as_index"),))
+        if qs_index in normalized:
+            raise ValueError(f"Question {qs_index} answered more than once")
+        normalized[qs_index] = options
+    return normalized
+
+
+def grade_sheet(key: AnswerKey, sheet: Dict[int, FrozenSet[int]]) -> Dict[str, Any]:
+    """
+    Chấm một bài nộp đã chuẩn hóa
+
+    Một câu đúng khi tập phương án đã chọn trùng khớp tập phương án đúng (chọn
+    phương án không thuộc câu đó thì tính sai). Điểm quy đổi theo
+    test_total_score (làm tròn), nếu bài không có thang điểm thì điểm là số câu đúng.
+    """
+    positions, option_bits, correct_masks = key.positions, key.option_bits, key.correct_masks
+    correct_count = 0
+    unknown = []
+    for qs_index, chosen in sheet.items():
+        position = positions.get(qs_index)
+        if position is None:
+            unknown.append(qs_index)
+            continue
+        mask = 0
+        for as_index in chosen:
+            slot = option_bits.get(as_index)
+            if slot is None or slot[0] != position:
+                break
+            mask |= slot[1]
+        else:
+            if mask and mask == correct_masks[position]:
+                correct_count += 1
+
+    gradable = key.gradable_count
+    if key.total_score is not None and gradable:
+        score = int(round(correct_count * key.total_score / gradable))
+    else:
+        score = correct_count
+
+    return {
+        "score": score,
+        "correct_count": correct_count,
+        "question_count": gradable,
+        "answered_count": len(sheet) - len(unknown),
+        "unknown_questions": unknown,
+        "passed": None if key.passing_score is None else score >= key.passing_score,
+    }
+
+
+def _as_int(value: Any, name: str) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _as_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class AnswerKeyCache:
+    """
+    Cache LRU các AnswerKey theo test_id
+
+    Mọi thao tác được bảo vệ bởi một lock. Cache nhớ các câu hỏi thuộc từng bài
+    để khi một câu hỏi/phương án thay đổi chỉ cần bỏ đúng các bài chứa câu đó.
+    Kết quả nạp bị bỏ qua nếu có invalidate xen giữa lúc nạp (tránh lưu bản cũ).
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # test_id -> (đáp án, version lúc nạp, thời điểm nạp)
+        self._keys: "OrderedDict[int, Tuple[AnswerKey, Optional[int], float]]" = OrderedDict()
+        self._tests_by_question: Dict[int, Set[int]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, test_id: int, loader: Callable[[int], Optional[AnswerKey]],
+            version: Optional[int] = None, ttl: Optional[float] = None) -> Optional[AnswerKey]:
+        """
+        Lấy đáp án từ cache, nếu chưa có (hoặc đã cũ) thì gọi loader(test_id) và lưu lại
+
+        Args:
+            version: Version hiện tại của bài trong DB; khác version lúc nạp thì nạp lại
+            ttl: Ghi đè TTL của cache (giây)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._keys.get(test_id)
+            if entry is not None:
+                key, cached_version, loaded_at = entry
+                if (version is None or version == cached_version) and now - loaded_at < ttl:
+                    self._keys.move_to_end(test_id)
+                    self.hits += 1
+                    return key
+                self._drop(test_id)
+                self.stale += 1
+            self.misses += 1
+            generation = self._generation
+
+        key = loader(test_id)
+        if key is None:
+            return None
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, version, now)
+        return key
+
+    def invalidate(self, test_ids: Iterable[int] = (), question_ids: Iterable[int] = ()) -> None:
+        """Bỏ đáp án của các bài và của mọi bài chứa các câu hỏi đã cho"""
+        with self._lock:
+            self._generation += 1
+            targets = set(test_ids)
+            for qs_index in question_ids:
+                targets.update(self._tests_by_question.get(qs_index, ()))
+            for test_id in targets:
+                if test_id in self._keys:
+                    self._drop(test_id)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._keys.clear()
+            self._tests_by_question.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._keys),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "ttl": self.ttl,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _store(self, key: AnswerKey, version: Optional[int], loaded_at: float) -> None:
+        if key.test_id in self._keys:
+            self._drop(key.test_id)
+        self._keys[key.test_id] = (key, version, loaded_at)
+        for qs_index in key.question_ids:
+            self._tests_by_question.setdefault(qs_index, set()).add(key.test_id)
+        while len(self._keys) > self.max_entries:
+            oldest = next(iter(self._keys))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, test_id: int) -> None:
+        key = self._keys.pop(test_id)[0]
+        for qs_index in key.question_ids:
+            tests = self._tests_by_question.get(qs_index)
+            if tests is not None:
+                tests.discard(test_id)
+                if not tests:
+                    del self._tests_by_question[qs_index]
+
+
+# Cache dùng chung cho toàn tiến trình
+answer_keys = AnswerKeyCache()
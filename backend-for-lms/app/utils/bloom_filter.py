@@ -0,0 +1,53 @@
+"""
+Bloom filter nhỏ gọn cho tập khóa chuỗi
+
+Trả lời "chắc chắn không có" hoặc "có thể có" (dương tính giả với xác suất
+~error_rate khi chưa vượt capacity). Dùng để loại nhanh các token chưa bị thu
+hồi mà không cần truy vấn DB; kết quả "có thể có" phải được xác nhận lại.
+"""
+
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """Bloom filter với k hàm băm sinh từ một lần blake2b (double hashing)"""
+
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def saturated(self) -> bool:
+        """Đã thêm nhiều hơn capacity khóa (tỉ lệ dương tính giả vượt error_rate)"""
+        return self.count > self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
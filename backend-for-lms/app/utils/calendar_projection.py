@@ -0,0 +1,238 @@
+"""
+Projection lịch theo lớp (calendar) được duy trì tăng dần trong bộ nhớ
+
+Mỗi lớp giữ danh sách buổi học dạng thô (ngày, giờ, room_id, user_id) cùng với
+bản JSON đã serialize sẵn và ETag. Khi lịch thay đổi chỉ cần cập nhật đúng buổi học
+đó rồi đánh dấu cần serialize lại; lần đọc tiếp theo không chạm tới database.
+Tên phòng/giáo viên được lưu trong bảng tra cứu dùng chung nên đổi tên chỉ cần
+cập nhật một chỗ.
+
+Mỗi calendar nhớ version của lớp trong bảng calendar_versions lúc nạp (hoặc lúc
+tự cập nhật sau commit); get() bỏ calendar khi version trong DB đã khác, tức là
+lịch của lớp vừa bị sửa ở tiến trình khác.
+"""
+
+import hashlib
+import json
+import threading
+import time as _time
+from datetime import date, time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class ClassCalendar:
+    """Dữ liệu calendar của một lớp"""
+
+    __slots__ = ("class_id", "class_name", "events", "body", "etag", "built_at", "db_version")
+
+    def __init__(self, class_id: Any, class_name: Optional[str], built_at: float, db_version: int = 0):
+        self.class_id = class_id
+        self.class_name = class_name
+        # schedule_id -> (schedule_date, start, end, room_id, user_id)
+        self.events: Dict[Any, Tuple] = {}
+        self.body: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.built_at = built_at
+        # Version của lớp trong bảng calendar_versions mà calendar đang phản ánh
+        self.db_version = db_version
+
+
+class CalendarProjection:
+    """
+    Kho calendar đã serialize theo class_id
+
+    Tất cả thao tác được bảo vệ bởi một lock. Lớp chưa có trong kho thì các
+    thay đổi liên quan được bỏ qua (lần đọc sau sẽ nạp đầy đủ từ database).
+    Mỗi lớp có số phiên bản để tránh lưu kết quả nạp đã cũ khi có ghi xen giữa.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._classes: Dict[Any, ClassCalendar] = {}
+        self._room_names: Dict[Hashable, Optional[str]] = {}
+        self._teacher_names: Dict[Hashable, Optional[str]] = {}
+        self._versions: Dict[Any, int] = {}
+        self._global_version = 0
+
+    # ------------------------------------------------------------------ đọc
+
+    def get(self, class_id: Any, ttl: Optional[float] = None,
+            db_version: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        Lấy (body JSON, etag) của lớp, None nếu chưa có, đã quá TTL hoặc khác db_version
+        """
+        with self._lock:
+            calendar = self._classes.get(class_id)
+            if calendar is None:
+                return None
+            expired = ttl is not None and _time.monotonic() - calendar.built_at > ttl
+            if expired or (db_version is not None and db_version != calendar.db_version):
+                del self._classes[class_id]
+                return None
+            if calendar.body is None:
+                self._render(calendar)
+            return calendar.body, calendar.etag
+
+    def version(self, class_id: Any) -> Tuple[int, int]:
+        """Phiên bản hiện tại của lớp, truyền lại cho put() sau khi nạp xong"""
+        with self._lock:
+            return self._versions.get(class_id, 0), self._global_version
+
+    def put(self, class_id: Any, class_name: Optional[str], rows: Iterable[Tuple],
+            version: Tuple[int, int], db_version: int = 0) -> Tuple[str, str]:
+        """
+        Lưu calendar vừa nạp từ database
+
+        Args:
+            rows: Các tuple (schedule_id, schedule_date, start, end, room_id,
+                  room_label, user_id, teacher_name); room_label là chuỗi hiển thị
+                  của phòng ("Room <id>" nếu phòng không tồn tại)
+            version: Giá trị version() lấy trước khi truy vấn
+            db_version: Version của lớp trong bảng calendar_versions, đọc trước khi truy vấn
+
+        Returns:
+            (body JSON, etag)
+        """
+        calendar = ClassCalendar(class_id, class_name, _time.monotonic(), db_version)
+        room_names = {}
+        teacher_names = {}
+        for schedule_id, schedule_date, start, end, room_id, room_label, user_id, teacher_name in rows:
+            if schedule_date is None:
+                continue
+            calendar.events[schedule_id] = (schedule_date, start, end, room_id, user_id)
+            room_names[room_id] = room_label
+            teacher_names[user_id] = teacher_name
+
+        with self._lock:
+            for room_id, name in room_names.items():
+                self._room_names[room_id] = name
+            for user_id, name in teacher_names.items():
+                self._teacher_names[user_id] = name
+            self._render(calendar)
+            if version == (self._versions.get(class_id, 0), self._global_version):
+                self._classes[class_id] = calendar
+            return calendar.body, calendar.etag
+
+    # ------------------------------------------------------------- cập nhật
+
+    def upsert(self, schedule_id: Any, class_id: Any, schedule_date: Optional[date],
+               start: Optional[time], end: Optional[time], room_id: Any, user_id: Any) -> None:
+        """Thêm hoặc cập nhật một buổi học của lớp"""
+        with self._lock:
+            self._bump(class_id)
+            calendar = self._classes.get(class_id)
+            if calendar is None:
+                return
+            if (schedule_date is None or room_id not in self._room_names
+                    or user_id not in self._teacher_names):
+                # Thiếu thông tin để dựng lại tại chỗ: bỏ lớp khỏi kho, lần đọc sau nạp lại
+                del self._classes[class_id]
+                return
+            calendar.events[schedule_id] = (schedule_date, start, end, room_id, user_id)
+            calendar.body = None
+
+    def remove(self, schedule_id: Any, class_id: Any) -> None:
+        """Xóa một buổi học khỏi calendar của lớp"""
+        with self._lock:
+            self._bump(class_id)
+            calendar = self._classes.get(class_id)
+            if calendar is not None and calendar.events.pop(schedule_id, None) is not None:
+                calendar.body = None
+
+    def rename_class(self, class_id: Any, class_name: Optional[str]) -> None:
+        with self._lock:
+            self._bump(class_id)
+            calendar = self._classes.get(class_id)
+            if calendar is not None:
+                calendar.class_name = class_name
+                calendar.body = None
+
+    def rename_room(self, room_id: Any, room_name: Optional[str]) -> None:
+        self._rename(self._room_names, 3, room_id, room_name)
+
+    def rename_teacher(self, user_id: Any, user_name: Optional[str]) -> None:
+        self._rename(self._teacher_names, 4, user_id, user_name)
+
+    def stamp(self, class_id: Any, previous: int, db_version: int) -> None:
+        """
+        Ghi nhận calendar đã tự cập nhật thay đổi của một transaction vừa commit
+
+        previous là version của lớp ngay trước các lần tăng của transaction đó.
+        Calendar đang ở version khác previous thì còn thiếu thay đổi của tiến
+        trình khác, nên bị bỏ để lần đọc sau nạp lại.
+        """
+        with self._lock:
+            calendar = self._classes.get(class_id)
+            if calendar is None:
+                return
+            if calendar.db_version == previous:
+                calendar.db_version = db_version
+            else:
+                self._bump(class_id)
+                del self._classes[class_id]
+
+    def invalidate(self, class_id: Any) -> None:
+        """Bỏ calendar của lớp khỏi kho"""
+        with self._lock:
+            self._bump(class_id)
+            self._classes.pop(class_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._global_version += 1
+            self._classes.clear()
+            self._room_names.clear()
+            self._teacher_names.clear()
+
+    # ------------------------------------------------------------- nội bộ
+
+    def _bump(self, class_id: Any) -> None:
+        self._versions[class_id] = self._versions.get(class_id, 0) + 1
+
+    def _rename(self, names: Dict, field: int, key: Any, name: Optional[str]) -> None:
+        with self._lock:
+            self._global_version += 1
+            if key not in names:
+                return
+            names[key] = name
+            for calendar in self._classes.values():
+                if calendar.body is not None and any(e[field] == key for e in calendar.events.values()):
+                    calendar.body = None
+
+    def _render(self, calendar: ClassCalendar) -> None:
+        """Serialize calendar giống hệt định dạng của get_class_schedule(format_type="calendar")"""
+        ordered = sorted(
+            calendar.events.items(),
+            key=lambda item: (
+                item[1][0],
+                item[1][1] is not None,
+                item[1][1] or time.min,
+                item[0],
+            ),
+        )
+        calendar_data: Dict[str, list] = {}
+        for schedule_id, (schedule_date, start, end, room_id, user_id) in ordered:
+            date_str = schedule_date.strftime("%Y-%m-%d")
+            calendar_data.setdefault(date_str, []).append({
+                "id": schedule_id,
+                "title": calendar.class_name,
+                "start": f"{date_str}T{start}",
+                "end": f"{date_str}T{end}",
+                "room": self._room_names.get(room_id),
+                "teacher": self._teacher_names.get(user_id),
+            })
+
+        payload = {
+            "class": {
+                "class_id": calendar.class_id,
+                "class_name": calendar.class_name,
+            },
+            "calendar": calendar_data,
+            "total_sessions": len(ordered),
+        }
+        calendar.body = json.dumps(payload, separators=(",", ":"))
+        calendar.etag = hashlib.sha1(calendar.body.encode("utf-8")).hexdigest()
+
+
+# Kho dùng chung trong tiến trình
+class_calendars = CalendarProjection()
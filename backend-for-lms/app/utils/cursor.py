@@ -0,0 +1,139 @@
+"""
+Cursor cho phân trang kiểu keyset (tiếp tục từ dòng cuối cùng đã trả về)
+
+Cursor là chuỗi base64 (URL-safe) của JSON chứa giá trị các cột sắp xếp của
+dòng cuối. Client chỉ cần gửi lại nguyên chuỗi, server dựng điều kiện
+"sau dòng này" thay vì OFFSET nên chi phí mỗi trang không tăng theo số trang.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+
+_TYPE_KEY = "__t"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_TYPE_KEY: "dt", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {_TYPE_KEY: "d", "v": value.isoformat()}
+    if isinstance(value, time):
+        return {_TYPE_KEY: "t", "v": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and _TYPE_KEY in value:
+        kind, raw = value[_TYPE_KEY], value["v"]
+        if kind == "dt":
+            return datetime.fromisoformat(raw)
+        if kind == "d":
+            return date.fromisoformat(raw)
+        if kind == "t":
+            return time.fromisoformat(raw)
+        raise ValueError(f"Unknown cursor value type: {kind}")
+    return value
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Mã hóa dict giá trị (hỗ trợ date/time/datetime) thành chuỗi cursor"""
+    payload = json.dumps({k: _encode_value(v) for k, v in values.items()}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """
+    Giải mã chuỗi cursor
+
+    Raises:
+        ValueError: Cursor không hợp lệ
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return {k: _decode_value(v) for k, v in payload.items()}
+
+
+def keyset_after(columns: Sequence, values: Sequence[Any], descending: bool = False):
+    """
+    Điều kiện SQL chọn các dòng đứng sau (values) theo thứ tự của columns
+
+    NULL được coi là nhỏ nhất (giống MySQL và SQLite): đứng đầu khi sắp tăng dần,
+    đứng cuối khi sắp giảm dần. Mọi cột dùng cùng một chiều sắp xếp; cột cuối cùng
+    nên là khóa chính để thứ tự là duy nhất.
+    """
+    column, value = columns[0], values[0]
+    rest_columns, rest_values = columns[1:], values[1:]
+
+    if value is None:
+        greater = false() if descending else column.isnot(None)
+        equal = column.is_(None)
+    elif descending:
+        greater = or_(column < value, column.is_(None))
+        equal = column == value
+    else:
+        greater = column > value
+        equal = column == value
+
+    if not rest_columns:
+        return greater
+    return or_(greater, and_(equal, keyset_after(rest_columns, rest_values, descending)))
+
+
+def keyset_page(query, sort_column, key_column, cursor: Optional[str] = None,
+                per_page: int = 10, descending: bool = False) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Lấy một trang theo keyset (sort_column, key_column)
+
+    Cursor gắn với cột và chiều sắp xếp đã tạo ra nó; dùng cursor với cách sắp
+    xếp khác sẽ bị từ chối. Không chạy COUNT(*) và không dùng OFFSET.
+
+    Args:
+        query: Query đã áp dụng các bộ lọc (thứ tự sẵn có sẽ bị thay thế)
+        sort_column: Cột sắp xếp chính
+        key_column: Khóa chính dùng để phân định các dòng trùng giá trị sắp xếp
+        cursor: next_cursor của trang trước (None hoặc rỗng = trang đầu)
+        per_page: Số dòng mỗi trang
+        descending: Sắp xếp giảm dần
+
+    Returns:
+        (danh sách dòng, {"per_page", "has_next", "next_cursor"})
+
+    Raises:
+        ValueError: Cursor không hợp lệ hoặc không khớp cách sắp xếp
+    """
+    scope = {"k": sort_column.key, "o": "desc" if descending else "asc"}
+    same_column = sort_column.key == key_column.key
+    columns = (key_column,) if same_column else (sort_column, key_column)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("k") != scope["k"] or position.get("o") != scope["o"]:
+            raise ValueError("Cursor does not match the requested sort order")
+        if "id" not in position:
+            raise ValueError("Invalid cursor")
+        values = (position["id"],) if same_column else (position.get("v"), position["id"])
+        query = query.filter(keyset_after(columns, values, descending))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(None).order_by(*order).limit(per_page + 1).all()
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        position = dict(scope, id=getattr(last, key_column.key))
+        if not same_column:
+            position["v"] = getattr(last, sort_column.key)
+        next_cursor = encode_cursor(position)
+
+    return rows, {"per_page": per_page, "has_next": has_next, "next_cursor": next_cursor}
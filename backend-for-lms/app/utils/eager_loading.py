@@ -0,0 +1,51 @@
+"""
+Tiện ích eager loading cho các endpoint trả về danh sách
+
+Mỗi endpoint khai báo các quan hệ mà to_dict() cần (ví dụ "room", "class_obj.course"),
+hàm relation_options() chuyển chúng thành joinedload/selectinload để cả danh sách
+được serialize với số truy vấn cố định thay vì 1 + N truy vấn lazy.
+"""
+
+from typing import Iterable, List
+
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def relation_options(model, relations: Iterable[str]) -> List:
+    """
+    Tạo loader options cho các quan hệ cần thiết
+
+    Quan hệ many-to-one dùng joinedload (JOIN trong cùng câu truy vấn),
+    quan hệ collection dùng selectinload (một truy vấn IN cho cả danh sách).
+
+    Args:
+        model: Model gốc của truy vấn
+        relations: Danh sách tên quan hệ, hỗ trợ đường dẫn có dấu chấm
+
+    Returns:
+        List các option để truyền vào query.options(*...)
+    """
+    options = []
+    for path in relations:
+        loader = None
+        current = model
+        for name in path.split("."):
+            attribute = getattr(current, name)
+            prop = attribute.property
+            if prop.lazy == "dynamic":
+                # Quan hệ dynamic trả về query, không thể eager load
+                break
+            if prop.uselist:
+                loader = selectinload(attribute) if loader is None else loader.selectinload(attribute)
+            else:
+                loader = joinedload(attribute) if loader is None else loader.joinedload(attribute)
+            current = prop.mapper.class_
+        if loader is not None:
+            options.append(loader)
+    return options
+
+
+def with_relations(query, model, relations: Iterable[str]):
+    """Áp dụng relation_options cho một query"""
+    options = relation_options(model, relations)
+    return query.options(*options) if options else query
@@ -1,8 +1,6 @@
 import jwt
 from datetime import datetime, timedelta
 from flask import current_app, render_template
-from flask_mail import Message
-from app.config import mail
 
 
 def generate_email_verification_token(user_id):
@@ -56,25 +54,28 @@ def verify_email_token(token):
         return None
 
 
-def send_email(to, subject, template, **kwargs):
+def send_email(to, subject, template, commit=True, **kwargs):
     """
-    Gửi email sử dụng template
+    Đưa email dùng template vào hàng đợi gửi (mail_outbox)
 
     Args:
         to: Email người nhận
         subject: Tiêu đề email
         template: Tên file template html
+        commit: False để commit cùng transaction của người gọi
         kwargs: Các biến truyền vào template
     """
-    msg = Message(subject=subject, recipients=[to])
-    msg.html = render_template(template, **kwargs)
-    mail.send(msg)
+    from app.services.mail_queue_service import MailQueueService
 
+    html = render_template(template, **kwargs)
+    return MailQueueService().enqueue(to, subject, html, commit=commit)
 
-def send_verification_email(to_email, token):
-    """Gửi email xác minh cho người dùng mới"""
-    from flask import current_app
 
+def send_verification_email(to_email, user_id, commit=True):
+    """Đưa email xác minh cho người dùng mới vào hàng đợi gửi"""
+    from app.services.mail_queue_service import MailQueueService
+
+    token = generate_email_verification_token(user_id)
     verification_url = f"{current_app.config.get('BASE_URL', 'http://localhost:5000')}/api/auth/verify-email/{token}"
 
     subject = "Xác minh tài khoản LMS của bạn"
@@ -82,17 +83,12 @@ def send_verification_email(to_email, token):
     # Nếu bạn có template
     # return send_email(to_email, subject, 'emails/verify_email.html', verification_url=verification_url)
 
-    # Hoặc gửi trực tiếp
-    msg = Message(
-        subject=subject,
-        recipients=[to_email],
-        html=f"""
+    html = f"""
         <h2>Xác minh tài khoản của bạn</h2>
         <p>Cảm ơn bạn đã đăng ký tài khoản trên hệ thống LMS.</p>
         <p>Vui lòng nhấn vào <a href="{verification_url}">liên kết này</a> để xác minh tài khoản.</p>
         <p>Liên kết này sẽ hết hạn sau 24 giờ.</p>
         <p>Nếu bạn không yêu cầu đăng ký này, vui lòng bỏ qua email này.</p>
-        """,
-    )
+        """
 
-    mail.send(msg)
+    return MailQueueService().enqueue(to_email, subject, html, commit=commit)
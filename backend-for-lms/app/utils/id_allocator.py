@@ -0,0 +1,157 @@
+"""
+Cấp mã có tiền tố (S00000001, T00000001, TC000001, C0000001) từ bảng id_sequences
+
+Mỗi tiến trình đặt trước một khối `block_size` số bằng một câu UPDATE nguyên tử
+trên một kết nối riêng (commit ngay, không dính vào transaction của request),
+sau đó cấp dần trong bộ nhớ. Nhờ vậy:
+- Không còn ORDER BY user_id DESC / MAX() trên khóa chuỗi ở mỗi lần tạo mới
+- Hai request/tiến trình đồng thời không bao giờ nhận cùng một mã
+- Số round trip tới DB chỉ còn 1 trên mỗi `block_size` mã
+
+Đổi lại, các số còn thừa trong khối khi tiến trình dừng sẽ bị bỏ qua (mã không
+liên tục). Đặt ID_BLOCK_SIZE = 1 nếu cần mã liên tục nhất có thể.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import column, func, table
+from sqlalchemy.exc import IntegrityError
+
+from app.config import db
+
+DEFAULT_BLOCK_SIZE = 20
+# Số mã lớn nhất được đọc khi khởi tạo sequence từ dữ liệu cũ
+SEED_SCAN_LIMIT = 100
+
+
+@dataclass(frozen=True)
+class SequenceSpec:
+    """Định dạng mã của một sequence và cột chứa mã đó (dùng để khởi tạo)"""
+    prefix: str
+    width: int
+    table: str
+    column: str
+
+    def format(self, value: int) -> str:
+        return f"{self.prefix}{value:0{self.width}d}"
+
+    def parse(self, code: str) -> Optional[int]:
+        digits = code[len(self.prefix):]
+        if code.startswith(self.prefix) and len(digits) == self.width and digits.isdigit():
+            return int(digits)
+        return None
+
+
+SEQUENCES: Dict[str, SequenceSpec] = {
+    "student": SequenceSpec("S", 8, "students", "user_id"),
+    "teacher": SequenceSpec("T", 8, "teachers", "user_id"),
+    # Giáo viên do quản trị viên tạo (TeacherService) dùng định dạng riêng
+    "staff_teacher": SequenceSpec("TC", 6, "teachers", "user_id"),
+    "course": SequenceSpec("C", 7, "courses", "course_id"),
+}
+
+
+class IdAllocator:
+    """Cấp mã theo khối, an toàn giữa các thread và tiến trình"""
+
+    def __init__(self, block_size: Optional[int] = None):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        # (database url, seq_name) -> [giá trị tiếp theo, giới hạn (không gồm)]
+        self._blocks: Dict[Tuple[str, str], list] = {}
+        self._pid = os.getpid()
+        self.reservations = 0
+
+    def next_id(self, seq_name: str) -> str:
+        """Cấp mã tiếp theo của sequence (vd. next_id("student") -> "S00001234")"""
+        spec = SEQUENCES[seq_name]
+        engine = db.engine
+        key = (str(engine.url), seq_name)
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Tiến trình con sau fork không được dùng lại khối của tiến trình cha
+                self._blocks.clear()
+                self._pid = os.getpid()
+
+            block = self._blocks.get(key)
+            if block is None or block[0] >= block[1]:
+                size = self._block_size()
+                start = self._reserve(engine, seq_name, spec, size)
+                block = self._blocks[key] = [start, start + size]
+
+            value = block[0]
+            block[0] += 1
+
+        if value >= 10 ** spec.width:
+            raise OverflowError(f"Sequence '{seq_name}' exhausted ({spec.prefix} + {spec.width} digits)")
+        return spec.format(value)
+
+    def reset(self) -> None:
+        """Bỏ các khối đang giữ (số còn thừa sẽ không được cấp lại)"""
+        with self._lock:
+            self._blocks.clear()
+
+    def _block_size(self) -> int:
+        size = self.block_size or current_app.config.get("ID_BLOCK_SIZE", DEFAULT_BLOCK_SIZE)
+        return max(1, int(size))
+
+    def _reserve(self, engine, seq_name: str, spec: SequenceSpec, size: int) -> int:
+        """Đặt trước `size` số, trả về số đầu tiên của khối"""
+        from app.models.id_sequence_model import IdSequence
+
+        sequences = IdSequence.__table__
+        for _ in range(3):
+            with engine.begin() as connection:
+                # UPDATE trước rồi mới đọc: khóa dòng (MySQL) / khóa ghi (SQLite)
+                # được giữ tới khi commit nên không tiến trình nào đọc trùng khối
+                updated = connection.execute(
+                    sequences.update()
+                    .where(sequences.c.seq_name == seq_name)
+                    .values(next_value=sequences.c.next_value + size)
+                ).rowcount
+                if updated:
+                    next_value = connection.execute(
+                        db.select(sequences.c.next_value).where(sequences.c.seq_name == seq_name)
+                    ).scalar_one()
+                    self.reservations += 1
+                    return next_value - size
+
+            # Sequence chưa có: khởi tạo từ mã lớn nhất đang tồn tại
+            start = self._seed_value(engine, spec)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(sequences.insert().values(seq_name=seq_name, next_value=start + size))
+                self.reservations += 1
+                return start
+            except IntegrityError:
+                # Tiến trình khác vừa khởi tạo; quay lại nhánh UPDATE
+                continue
+
+        raise RuntimeError(f"Could not reserve ids for sequence '{seq_name}'")
+
+    @staticmethod
+    def _seed_value(engine, spec: SequenceSpec) -> int:
+        """Số tiếp theo sau mã lớn nhất đúng định dạng đang có trong bảng"""
+        code_column = column(spec.column)
+        query = (
+            db.select(code_column)
+            .select_from(table(spec.table, code_column))
+            .where(code_column.like(f"{spec.prefix}%"), func.length(code_column) == len(spec.prefix) + spec.width)
+            .order_by(code_column.desc())
+            .limit(SEED_SCAN_LIMIT)
+        )
+        with engine.connect() as connection:
+            for code in connection.execute(query).scalars():
+                value = spec.parse(code)
+                if value is not None:
+                    return value + 1
+        return 1
+
+
+# Bộ cấp mã dùng chung của tiến trình
+ids = IdAllocator()
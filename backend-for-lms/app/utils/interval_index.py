@@ -0,0 +1,193 @@
+"""
+Chỉ mục khoảng thời gian (interval index) dùng để kiểm tra xung đột lịch trong bộ nhớ
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def time_to_seconds(value: time) -> int:
+    """Đổi datetime.time thành số giây tính từ 00:00"""
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class IntervalList:
+    """
+    Danh sách khoảng [start, end) đã sắp xếp theo start, kèm mảng max(end) tích lũy.
+
+    Tìm các khoảng giao với [start, end) bằng bisect trên start (O(log n)),
+    sau đó duyệt ngược và dừng ngay khi max(end) tích lũy <= start,
+    tức O(log n + k) với k là số khoảng giao nhau.
+    """
+
+    __slots__ = ("_starts", "_items", "_max_ends")
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._items: List[Tuple[int, int, Any]] = []
+        self._max_ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, start: int, end: int, key: Any) -> None:
+        """Thêm khoảng [start, end) gắn với key"""
+        position = bisect_right(self._starts, start)
+        self._items.insert(position, (start, end, key))
+        self._starts.insert(position, start)
+
+        # Cập nhật lại max(end) từ vị trí vừa chèn
+        running = self._max_ends[position - 1] if position > 0 else end
+        del self._max_ends[position:]
+        for s, e, _ in self._items[position:]:
+            running = max(running, e)
+            self._max_ends.append(running)
+
+    def remove(self, key: Any) -> bool:
+        """Xóa khoảng theo key, trả về True nếu có xóa"""
+        for position, (_, _, item_key) in enumerate(self._items):
+            if item_key == key:
+                del self._items[position]
+                del self._starts[position]
+                del self._max_ends[position:]
+                running = self._max_ends[-1] if self._max_ends else None
+                for _, e, _ in self._items[position:]:
+                    running = e if running is None else max(running, e)
+                    self._max_ends.append(running)
+                return True
+        return False
+
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Trả về key của mọi khoảng giao với [start, end)"""
+        result = []
+        position = bisect_left(self._starts, end)
+        for i in range(position - 1, -1, -1):
+            if self._max_ends[i] <= start:
+                break
+            s, e, key = self._items[i]
+            if e > start:
+                result.append(key)
+        result.reverse()
+        return result
+
+
+class ScheduleIntervalIndex:
+    """
+    Chỉ mục lịch chiếm dụng theo ngày cho phòng học và giáo viên
+
+    Mỗi cặp (ngày, "room"/"teacher", id) có một IntervalList riêng.
+    Dữ liệu được nạp một lần cho cả khoảng ngày cần kiểm tra,
+    sau đó mọi truy vấn xung đột đều chạy trong bộ nhớ.
+    """
+
+    def __init__(self):
+        self._lists: Dict[Tuple[Any, str, Hashable], IntervalList] = {}
+        self._entries: Dict[Any, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, schedule_id: Any, room_id: Any, user_id: Any, schedule_date,
+            start_time: Optional[time], end_time: Optional[time]) -> None:
+        """Thêm một lịch đã tồn tại (hoặc vừa được chấp nhận) vào chỉ mục"""
+        if schedule_date is None or start_time is None or end_time is None:
+            # Lịch không có giờ thì không thể xung đột (giống điều kiện SQL cũ)
+            return
+
+        start = time_to_seconds(start_time)
+        end = time_to_seconds(end_time)
+        self._entries[schedule_id] = {
+            "schedule_id": schedule_id,
+            "room_id": room_id,
+            "user_id": user_id,
+            "schedule_date": schedule_date,
+            "schedule_startime": start_time,
+            "schedule_endtime": end_time,
+        }
+        self._list_for(schedule_date, "room", room_id).add(start, end, schedule_id)
+        self._list_for(schedule_date, "teacher", user_id).add(start, end, schedule_id)
+
+    def remove(self, schedule_id: Any) -> None:
+        """Xóa một lịch khỏi chỉ mục (ví dụ khi đang cập nhật chính lịch đó)"""
+        entry = self._entries.pop(schedule_id, None)
+        if not entry:
+            return
+        for kind, owner in (("room", entry["room_id"]), ("teacher", entry["user_id"])):
+            interval_list = self._lists.get((entry["schedule_date"], kind, owner))
+            if interval_list is not None:
+                interval_list.remove(schedule_id)
+
+    def get(self, schedule_id: Any) -> Optional[Dict[str, Any]]:
+        """Lấy thông tin lịch đã được nạp vào chỉ mục"""
+        return self._entries.get(schedule_id)
+
+    def find_conflicts(self, room_id: Any, user_id: Any, schedule_date,
+                       start_time: Optional[time], end_time: Optional[time],
+                       exclude_id: Any = None) -> Dict[str, List[Any]]:
+        """
+        Tìm lịch xung đột với một khung giờ
+
+        Returns:
+            Dict {"room": [schedule_id...], "teacher": [schedule_id...]}
+        """
+        conflicts = {"room": [], "teacher": []}
+        if schedule_date is None or start_time is None or end_time is None:
+            return conflicts
+
+        start = time_to_seconds(start_time)
+        end = time_to_seconds(end_time)
+        for kind, owner in (("room", room_id), ("teacher", user_id)):
+            interval_list = self._lists.get((schedule_date, kind, owner))
+            if interval_list is None:
+                continue
+            conflicts[kind] = [
+                schedule_id
+                for schedule_id in interval_list.overlapping(start, end)
+                if schedule_id != exclude_id
+            ]
+        return conflicts
+
+    def find_conflicts_batch(self, candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, List[Any]]]:
+        """
+        Kiểm tra xung đột cho nhiều khung giờ cùng lúc
+
+        Args:
+            candidates: Danh sách dict có room_id, user_id, schedule_date,
+                        schedule_startime, schedule_endtime (và schedule_id nếu là cập nhật)
+
+        Returns:
+            Danh sách kết quả theo đúng thứ tự candidates
+        """
+        return [
+            self.find_conflicts(
+                candidate.get("room_id"),
+                candidate.get("user_id"),
+                candidate.get("schedule_date"),
+                candidate.get("schedule_startime"),
+                candidate.get("schedule_endtime"),
+                candidate.get("schedule_id"),
+            )
+            for candidate in candidates
+        ]
+
+    def _list_for(self, schedule_date, kind: str, owner: Hashable) -> IntervalList:
+        key = (schedule_date, kind, owner)
+        interval_list = self._lists.get(key)
+        if interval_list is None:
+            interval_list = IntervalList()
+            self._lists[key] = interval_list
+        return interval_list
+
+
+def slot_mask(start: int, end: int, slot_starts: List[int], slot_ends: List[int]) -> int:
+    """
+    Tạo bitmask các slot bị khoảng [start, end) chiếm (bit i = slot i)
+
+    slot_starts phải được sắp xếp tăng dần.
+    """
+    mask = 0
+    for i in range(bisect_left(slot_starts, end) - 1, -1, -1):
+        if slot_ends[i] > start:
+            mask |= 1 << i
+    return mask
@@ -0,0 +1,139 @@
+"""
+Băm và kiểm tra mật khẩu với thuật toán/chi phí cấu hình được
+
+- PASSWORD_HASH_METHOD: phương thức của werkzeug, vd. "pbkdf2:sha256:1000000"
+  hoặc "scrypt:32768:8:1" (chọn bằng `flask auth calibrate-hashing`); để trống
+  thì dùng mặc định của phiên bản werkzeug đang cài (scrypt từ werkzeug 3.0)
+- PASSWORD_HASH_WORKERS: số phép băm chạy đồng thời tối đa (mặc định số CPU)
+- PASSWORD_HASH_TIMEOUT: số giây tối đa chờ tới lượt; quá hạn -> HashingBusyError
+
+Phép băm chạy trong một thread pool giới hạn: lúc cao điểm (ngày thi) đăng nhập
+xếp hàng chờ CPU thay vì chiếm hết worker của server. hashlib nhả GIL khi tính
+pbkdf2/scrypt nên thread pool dùng được đủ các nhân CPU.
+Hash cũ (phương thức/chi phí khác cấu hình hiện tại) vẫn kiểm tra được; xem
+needs_rehash() để nâng cấp khi người dùng đăng nhập thành công.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import Dict, Optional
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# None: theo mặc định của werkzeug, để nâng cấp werkzeug không biến mọi hash cũ thành "lỗi thời"
+DEFAULT_METHOD = None
+DEFAULT_TIMEOUT = 10.0
+
+
+class HashingBusyError(RuntimeError):
+    """Hàng đợi băm mật khẩu quá tải (chờ quá PASSWORD_HASH_TIMEOUT)"""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _config(key: str, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            workers = _config("PASSWORD_HASH_WORKERS", None) or os.cpu_count() or 1
+            _executor = ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="password-hash")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run(fn, *args):
+    future = _get_executor().submit(fn, *args)
+    try:
+        return future.result(timeout=_config("PASSWORD_HASH_TIMEOUT", DEFAULT_TIMEOUT))
+    except FutureTimeoutError:
+        # Chưa bắt đầu thì bỏ khỏi hàng đợi để không tốn CPU cho request đã bỏ cuộc
+        future.cancel()
+        raise HashingBusyError("Password hashing queue is saturated")
+
+
+def current_method() -> Optional[str]:
+    """PASSWORD_HASH_METHOD đang cấu hình, None nếu dùng mặc định của werkzeug"""
+    return _config("PASSWORD_HASH_METHOD", DEFAULT_METHOD) or None
+
+
+def _generate(password: str, method: Optional[str], **kwargs) -> str:
+    if method is None:
+        return generate_password_hash(password, **kwargs)
+    return generate_password_hash(password, method=method, **kwargs)
+
+
+def hash_password(password: str) -> str:
+    """Băm mật khẩu bằng phương thức đang cấu hình"""
+    return _run(_generate, password, current_method())
+
+
+def verify_password(password_hash: Optional[str], password: str) -> bool:
+    """Kiểm tra mật khẩu với hash (mọi phương thức werkzeug hỗ trợ)"""
+    if not password_hash or password is None:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+@lru_cache(maxsize=16)
+def _canonical_prefix(method: Optional[str]) -> str:
+    """Tiền tố hash mà werkzeug sinh ra cho method (đã điền tham số mặc định)"""
+    return _generate("", method, salt_length=1).split("$", 1)[0]
+
+
+def needs_rehash(password_hash: Optional[str]) -> bool:
+    """Hash được tạo bằng phương thức/chi phí khác với cấu hình hiện tại"""
+    if not password_hash or "$" not in password_hash:
+        return True
+    return password_hash.split("$", 1)[0] != _canonical_prefix(current_method())
+
+
+def time_method(method: Optional[str], samples: int = 3) -> float:
+    """Thời gian (ms, trung vị) để kiểm tra một mật khẩu với method (None: mặc định của werkzeug)"""
+    password_hash = _generate("benchmark-password", method)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        check_password_hash(password_hash, "benchmark-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate(target_ms: float, algorithm: str = "pbkdf2", samples: int = 3) -> Dict[str, object]:
+    """
+    Chọn tham số để một lần kiểm tra mật khẩu mất xấp xỉ target_ms trên máy này
+
+    - pbkdf2: số vòng lặp tỉ lệ tuyến tính với thời gian, làm tròn tới 10.000
+    - scrypt: tăng gấp đôi N (r=8, p=1) tới khi đạt target_ms
+
+    Returns:
+        {"method", "measured_ms", "target_ms"}
+    """
+    if algorithm == "pbkdf2":
+        probe = 100_000
+        probe_ms = time_method(f"pbkdf2:sha256:{probe}", samples)
+        iterations = max(10_000, round(probe * target_ms / probe_ms / 10_000) * 10_000)
+        method = f"pbkdf2:sha256:{iterations}"
+    elif algorithm == "scrypt":
+        n = 2 ** 14
+        method = f"scrypt:{n}:8:1"
+        # Giới hạn N = 2^20 (~1 GiB bộ nhớ với r=8) để không làm cạn RAM server
+        while time_method(method, samples) < target_ms and n < 2 ** 20:
+            n *= 2
+            method = f"scrypt:{n}:8:1"
+    else:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+    return {"method": method, "measured_ms": time_method(method, samples), "target_ms": target_ms}
@@ -0,0 +1,41 @@
+"""
+Đếm số câu SQL được thực thi, dùng để kiểm tra N+1 query
+"""
+
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Kết quả đếm truy vấn"""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Context manager đếm số câu SQL chạy trên engine
+
+    Ví dụ:
+        with count_queries(db.engine) as counter:
+            service.get_schedules_by_date("2025-01-01")
+        assert counter.count <= 2
+    """
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
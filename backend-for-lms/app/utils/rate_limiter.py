@@ -0,0 +1,285 @@
+"""
+Giới hạn tần suất request bằng token bucket theo IP và theo email
+
+Mỗi (scope, chiều, khóa) có một bucket: đầy `capacity` lượt, hồi lại đều
+`capacity` lượt mỗi `per_seconds` giây. Decorator @rate_limited(scope) kiểm tra
+trước khi vào view, nên request bị từ chối không tốn truy vấn DB, phép băm mật
+khẩu hay lượt gửi email nào.
+
+Các chiều: "ip", "email" và "ip_email" (cặp IP + email). Bucket có
+on_failure=True chỉ bị trừ lượt khi view trả về 401 (vd. sai mật khẩu), trước
+khi vào view chỉ kiểm tra còn lượt hay không. Đăng nhập dùng "ip_email" theo
+cách này: người khác biết email của nạn nhân cũng không khóa được tài khoản từ
+IP của họ, còn người đăng nhập đúng không bao giờ bị trừ lượt. Bucket "email"
+của đăng nhập cũng chỉ trừ khi sai mật khẩu nhưng ngưỡng cao hơn nhiều, để làm
+chậm việc dò mật khẩu một tài khoản từ nhiều IP.
+
+Sau proxy (RATE_LIMIT_TRUST_PROXY bật), IP lấy từ X-Forwarded-For ở vị trí
+RATE_LIMIT_PROXY_HOPS (mặc định 1) tính từ bên phải, giống ProxyFix(x_for=N):
+các giá trị bên trái do client tự gửi nên không dùng làm khóa.
+
+Lưu trữ (RATE_LIMIT_STORAGE):
+- "memory" (mặc định): OrderedDict trong tiến trình, giới hạn RATE_LIMIT_MAX_KEYS
+  khóa (LRU), mỗi khóa chỉ giữ (số lượt còn lại, thời điểm cập nhật)
+- "sqlite:///đường/dẫn.sqlite3": dùng chung giữa các worker trên cùng máy; đặt
+  file trong /dev/shm để bảng nằm trên bộ nhớ chia sẻ
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, request
+
+from app.utils.response_utils import error_response
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    capacity: int
+    per_seconds: float
+    # True: chỉ trừ lượt khi request thất bại (401)
+    on_failure: bool = False
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+
+DEFAULT_POLICIES: Dict[str, Dict[str, BucketPolicy]] = {
+    "login": {
+        "ip": BucketPolicy(30, 60),
+        "ip_email": BucketPolicy(10, 300, on_failure=True),
+        "email": BucketPolicy(100, 3600, on_failure=True),
+    },
+    "forgot_password": {"ip": BucketPolicy(10, 600), "email": BucketPolicy(3, 3600)},
+    "resend_verification": {"ip": BucketPolicy(10, 600), "email": BucketPolicy(3, 3600)},
+    "register": {"ip": BucketPolicy(20, 3600)},
+}
+DEFAULT_MAX_KEYS = 100_000
+
+
+def _refill(tokens: float, updated: float, now: float, policy: BucketPolicy) -> float:
+    return min(policy.capacity, tokens + max(0.0, now - updated) * policy.rate)
+
+
+def _take(tokens: float, updated: float, now: float, policy: BucketPolicy) -> Tuple[float, Optional[float]]:
+    """Hồi lượt theo thời gian rồi lấy một lượt; trả về (số lượt mới, retry_after nếu bị từ chối)"""
+    tokens = _refill(tokens, updated, now, policy)
+    if tokens >= 1:
+        return tokens - 1, None
+    return tokens, (1 - tokens) / policy.rate
+
+
+def _peek(tokens: float, updated: float, now: float, policy: BucketPolicy) -> Optional[float]:
+    """retry_after nếu bucket đã hết lượt, không lấy lượt nào"""
+    tokens = _refill(tokens, updated, now, policy)
+    return None if tokens >= 1 else (1 - tokens) / policy.rate
+
+
+class MemoryBuckets:
+    """Bucket trong bộ nhớ tiến trình, LRU theo số khóa"""
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, policy: BucketPolicy) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (policy.capacity, now))
+            tokens, retry_after = _take(tokens, updated, now, policy)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def peek(self, key: str, policy: BucketPolicy) -> Optional[float]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._buckets.get(key)
+        return None if entry is None else _peek(entry[0], entry[1], now, policy)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBuckets:
+    """Bucket trong một file SQLite dùng chung giữa các tiến trình trên cùng máy"""
+
+    PURGE_EVERY = 10_000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    def take(self, key: str, policy: BucketPolicy) -> Optional[float]:
+        now = time.time()
+        connection = self._connection()
+        # BEGIN IMMEDIATE giữ khóa ghi từ lúc đọc: hai tiến trình không lấy trùng lượt
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (policy.capacity, now)
+            tokens, retry_after = _take(tokens, updated, now, policy)
+            connection.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                               (key, tokens, now))
+            self._takes += 1
+            if self._takes % self.PURGE_EVERY == 0:
+                # Bucket không dùng quá một ngày đã đầy lại với mọi policy hiện có
+                connection.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - 86400,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return retry_after
+
+    def peek(self, key: str, policy: BucketPolicy) -> Optional[float]:
+        row = self._connection().execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+        return None if row is None else _peek(row[0], row[1], time.time(), policy)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+
+class RateLimiter:
+    """Áp policy theo scope lên backend lưu bucket, đếm số request cho qua/bị chặn"""
+
+    def __init__(self, backend=None, policies: Optional[Dict[str, Dict[str, BucketPolicy]]] = None):
+        self.backend = backend
+        self.policies = policies
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def configure(self, config) -> None:
+        """Khởi tạo backend/policy từ config Flask (gọi một lần, lần kiểm tra đầu tiên)"""
+        policies = {scope: dict(dimensions) for scope, dimensions in DEFAULT_POLICIES.items()}
+        for scope, dimensions in (config.get("RATE_LIMITS") or {}).items():
+            for dimension, values in dimensions.items():
+                policies.setdefault(scope, {})[dimension] = BucketPolicy(*values)
+        self.policies = policies
+
+        storage = config.get("RATE_LIMIT_STORAGE", "memory")
+        if storage.startswith("sqlite:///"):
+            self.backend = SQLiteBuckets(storage[len("sqlite:///"):])
+        else:
+            self.backend = MemoryBuckets(config.get("RATE_LIMIT_MAX_KEYS", DEFAULT_MAX_KEYS))
+
+    @staticmethod
+    def _keys(ip: Optional[str], email: Optional[str]) -> Dict[str, Optional[str]]:
+        return {"ip": ip, "email": email, "ip_email": f"{ip}|{email}" if ip and email else None}
+
+    def check(self, scope: str, ip: Optional[str], email: Optional[str]) -> Optional[float]:
+        """None nếu cho qua, ngược lại số giây nên chờ trước khi thử lại"""
+        keys = self._keys(ip, email)
+        for dimension, policy in self.policies.get(scope, {}).items():
+            value = keys.get(dimension)
+            if not value:
+                continue
+            key = f"{scope}:{dimension}:{value}"
+            retry_after = self.backend.peek(key, policy) if policy.on_failure else self.backend.take(key, policy)
+            if retry_after is not None:
+                self._count(scope, f"rejected_{dimension}")
+                return retry_after
+        self._count(scope, "allowed")
+        return None
+
+    def record_failure(self, scope: str, ip: Optional[str], email: Optional[str]) -> None:
+        """Trừ lượt của các bucket on_failure sau một request thất bại"""
+        keys = self._keys(ip, email)
+        for dimension, policy in self.policies.get(scope, {}).items():
+            value = keys.get(dimension)
+            if policy.on_failure and value:
+                self.backend.take(f"{scope}:{dimension}:{value}", policy)
+        self._count(scope, "failed")
+
+    def _count(self, scope: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(scope, {"allowed": 0, "failed": 0})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = {scope: dict(values) for scope, values in self._counters.items()}
+        return {
+            "storage": type(self.backend).__name__ if self.backend else None,
+            "tracked_keys": len(self.backend) if self.backend else 0,
+            "scopes": counters,
+        }
+
+
+limiter = RateLimiter()
+_configure_lock = threading.Lock()
+
+
+def client_ip() -> Optional[str]:
+    """
+    IP của client; chỉ tin X-Forwarded-For khi RATE_LIMIT_TRUST_PROXY bật (chạy sau proxy)
+
+    Mỗi proxy nối địa chỉ nó nhận được vào bên phải header, nên lấy giá trị thứ
+    RATE_LIMIT_PROXY_HOPS từ phải sang. Header ngắn hơn số proxy đã cấu hình
+    (request không đi qua đủ proxy) thì dùng remote_addr.
+    """
+    if current_app.config.get("RATE_LIMIT_TRUST_PROXY"):
+        hops = current_app.config.get("RATE_LIMIT_PROXY_HOPS", 1)
+        forwarded = [value.strip() for value in request.headers.get("X-Forwarded-For", "").split(",")]
+        forwarded = [value for value in forwarded if value]
+        if hops > 0 and len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.remote_addr
+
+
+def rate_limited(scope: str):
+    """Decorator giới hạn tần suất theo IP và theo trường "email" trong body JSON"""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RATE_LIMIT_ENABLED", True):
+                return fn(*args, **kwargs)
+            if limiter.backend is None:
+                with _configure_lock:
+                    if limiter.backend is None:
+                        limiter.configure(current_app.config)
+
+            body = request.get_json(silent=True)
+            email = body.get("email") if isinstance(body, dict) else None
+            email = email.strip().lower() if isinstance(email, str) else None
+            ip = client_ip()
+            retry_after = limiter.check(scope, ip, email)
+            if retry_after is not None:
+                response, status_code = error_response(
+                    message="Too many requests, please try again later", status_code=429
+                )
+                response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                return response, status_code
+
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 401:
+                limiter.record_failure(scope, ip, email)
+            return response
+
+        return wrapper
+
+    return decorator
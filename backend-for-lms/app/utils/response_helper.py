@@ -1,5 +1,5 @@
-from flask import jsonify
-from typing import Any, Dict, Optional, Union
+from flask import Response, jsonify, json, request, stream_with_context
+from typing import Any, Dict, Iterable, Optional, Union
 from datetime import datetime
 
 
@@ -89,6 +89,46 @@ class ResponseHelper:
 
         return jsonify(response), 201
 
+    @staticmethod
+    def success_raw(
+        data_json: str,
+        message: str = "Success",
+        etag: Optional[str] = None,
+    ) -> Response:
+        """
+        Tạo success response từ phần data đã được serialize sẵn thành JSON
+
+        Nếu có etag, response được gắn ETag và trả về 304 khi client gửi
+        If-None-Match trùng khớp.
+        """
+        body = (
+            '{"success":true,"message":%s,"data":%s,"timestamp":%s}'
+            % (json.dumps(message), data_json, json.dumps(datetime.utcnow().isoformat()))
+        )
+        response = Response(body, status=200, mimetype="application/json")
+
+        if etag:
+            response.set_etag(etag)
+            response.make_conditional(request)
+
+        return response
+
+    @staticmethod
+    def success_stream(data_chunks: Iterable[str], message: str = "Success") -> Response:
+        """
+        Tạo success response dạng stream (chunked) từ các đoạn JSON của data
+
+        data_chunks được ghi thẳng ra socket theo từng đoạn, request context
+        được giữ trong suốt quá trình stream.
+        """
+        def generate():
+            yield '{"success":true,"message":%s,"data":' % json.dumps(message)
+            for chunk in data_chunks:
+                yield chunk
+            yield ',"timestamp":%s}' % json.dumps(datetime.utcnow().isoformat())
+
+        return Response(stream_with_context(generate()), status=200, mimetype="application/json")
+
     @staticmethod
     def not_found(
         message: str = "Resource not found",
@@ -187,6 +227,16 @@ def success_response(data=None, message="Success", status_code=200, meta=None):
     return ResponseHelper.success(data, message, status_code, meta)
 
 
+def success_raw_response(data_json, message="Success", etag=None):
+    """Shorthand cho success response với data JSON đã serialize sẵn"""
+    return ResponseHelper.success_raw(data_json, message, etag)
+
+
+def success_stream_response(data_chunks, message="Success"):
+    """Shorthand cho success response dạng stream"""
+    return ResponseHelper.success_stream(data_chunks, message)
+
+
 def error_response(
     message="An error occurred", status_code=500, error_code=None, details=None
 ):
@@ -0,0 +1,110 @@
+"""
+Thống kê điểm từ bảng tần suất (điểm -> số bài)
+
+Database trả về số bài theo từng mức điểm (GROUP BY test_id, sc_score) nên dữ
+liệu gửi về Python chỉ bằng số mức điểm khác nhau, không phụ thuộc số bài.
+Mọi chỉ số (trung bình, độ lệch chuẩn, phân vị, tỉ lệ đạt, histogram) tính
+chính xác trên bảng tần suất này. Phân vị dùng nội suy tuyến tính giữa hai
+hạng liền kề (cùng cách tính mặc định của numpy.percentile).
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+DEFAULT_BINS = 10
+
+
+def percentiles(frequencies: Sequence[Tuple[float, int]], points: Iterable[float]) -> Dict[str, float]:
+    """
+    Phân vị từ danh sách (giá trị, số lần) đã sắp tăng dần theo giá trị
+
+    Returns:
+        {"p25": ..., "p50": ...}
+    """
+    total = sum(count for _, count in frequencies)
+    result = {}
+    if not total:
+        return result
+
+    wanted = sorted((point * (total - 1) / 100.0, point) for point in points)
+    cumulative = 0
+    position = 0
+    # Giá trị tại các hạng (0-based) cần dùng, tìm trong một lượt duyệt bảng tần suất
+    lookups: Dict[int, float] = {}
+    ranks = sorted({int(math.floor(rank)) for rank, _ in wanted} | {int(math.ceil(rank)) for rank, _ in wanted})
+    for value, count in frequencies:
+        cumulative += count
+        while position < len(ranks) and ranks[position] < cumulative:
+            lookups[ranks[position]] = value
+            position += 1
+        if position == len(ranks):
+            break
+
+    for rank, point in wanted:
+        low, high = int(math.floor(rank)), int(math.ceil(rank))
+        value = lookups[low] + (lookups[high] - lookups[low]) * (rank - low)
+        result[f"p{point:g}"] = round(value, 4)
+    return result
+
+
+def histogram(frequencies: Sequence[Tuple[float, int]], low: float, high: float,
+              bins: int = DEFAULT_BINS) -> List[Dict[str, float]]:
+    """
+    Histogram bins khoảng đều trên [low, high]; khoảng cuối gồm cả high
+
+    Giá trị ngoài [low, high] được dồn vào khoảng đầu/cuối.
+    """
+    if bins <= 0:
+        return []
+    width = (high - low) / bins if high > low else 1.0
+    counts = [0] * bins
+    for value, count in frequencies:
+        index = int((value - low) // width) if width else 0
+        counts[min(max(index, 0), bins - 1)] += count
+    return [
+        {"from": round(low + i * width, 4), "to": round(low + (i + 1) * width, 4), "count": counts[i]}
+        for i in range(bins)
+    ]
+
+
+def summarize(frequencies: Dict[float, int], passing_score: Optional[float] = None,
+              total_score: Optional[float] = None, bins: int = DEFAULT_BINS,
+              points: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, object]:
+    """
+    Tổng hợp thống kê cho một bài kiểm tra
+
+    Args:
+        frequencies: {điểm: số bài}
+        passing_score: Điểm đạt (None = không tính tỉ lệ đạt)
+        total_score: Thang điểm, dùng làm cận trên của histogram (mặc định điểm cao nhất)
+        bins: Số khoảng của histogram
+        points: Các phân vị cần tính
+    """
+    ordered = sorted((float(value), count) for value, count in frequencies.items() if count)
+    count = sum(c for _, c in ordered)
+    if not count:
+        return {"count": 0}
+
+    mean = sum(value * c for value, c in ordered) / count
+    variance = sum(c * (value - mean) ** 2 for value, c in ordered) / count
+    low, high = ordered[0][0], ordered[-1][0]
+
+    stats = {
+        "count": count,
+        "mean": round(mean, 4),
+        "std": round(math.sqrt(variance), 4),
+        "min": low,
+        "max": high,
+        "percentiles": percentiles(ordered, points),
+    }
+    stats["median"] = stats["percentiles"].get("p50", percentiles(ordered, (50,))["p50"])
+
+    if passing_score is not None:
+        passed = sum(c for value, c in ordered if value >= passing_score)
+        stats["passed_count"] = passed
+        stats["pass_rate"] = round(passed / count, 4)
+
+    upper = total_score if total_score is not None and total_score > 0 else high
+    stats["histogram"] = histogram(ordered, min(0.0, low), max(upper, high), bins)
+    return stats
@@ -0,0 +1,76 @@
+"""
+Lịch ôn tập từ vựng theo thuật toán SM-2 (SuperMemo 2)
+
+Mỗi lần ôn, học viên tự chấm mức nhớ (quality) từ 0 đến 5:
+- quality >= 3 (nhớ được): khoảng cách ôn tăng dần 1 ngày -> 6 ngày -> interval * ease
+- quality < 3 (quên): bắt đầu lại chuỗi, ôn lại sau LAPSE_DELAY
+Hệ số dễ (ease factor) điều chỉnh theo quality và không nhỏ hơn MIN_EASE.
+"""
+
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+MAX_INTERVAL_DAYS = 3650
+PASSING_QUALITY = 3
+MAX_QUALITY = 5
+# Từ bị quên được đưa lại vào hàng đợi trong cùng buổi học
+LAPSE_DELAY = timedelta(minutes=10)
+
+
+class ReviewState(NamedTuple):
+    ease_factor: float = DEFAULT_EASE
+    interval_days: int = 0
+    repetitions: int = 0
+
+
+def quality_from_answer(correct: bool) -> int:
+    """Quy đổi câu trả lời đúng/sai (không tự chấm) sang quality"""
+    return 4 if correct else 1
+
+
+def next_review(state: ReviewState, quality: int,
+                now: Optional[datetime] = None) -> Tuple[ReviewState, datetime]:
+    """
+    Tính trạng thái mới và thời điểm ôn tiếp theo
+
+    Args:
+        state: Trạng thái hiện tại của từ
+        quality: Mức nhớ 0-5
+        now: Thời điểm trả lời (mặc định datetime.now())
+
+    Returns:
+        (trạng thái mới, due_at)
+
+    Raises:
+        ValueError: quality ngoài khoảng 0-5
+    """
+    if isinstance(quality, bool) or not isinstance(quality, int) or not 0 <= quality <= MAX_QUALITY:
+        raise ValueError(f"quality must be an integer between 0 and {MAX_QUALITY}")
+    now = now or datetime.now()
+
+    penalty = MAX_QUALITY - quality
+    ease = max(MIN_EASE, (state.ease_factor or DEFAULT_EASE) + 0.1 - penalty * (0.08 + penalty * 0.02))
+
+    if quality < PASSING_QUALITY:
+        return ReviewState(round(ease, 4), 0, 0), now + LAPSE_DELAY
+
+    repetitions = state.repetitions or 0
+    if repetitions == 0:
+        interval = 1
+    elif repetitions == 1:
+        interval = 6
+    else:
+        interval = round(max(state.interval_days or 1, 1) * ease)
+    interval = min(interval, MAX_INTERVAL_DAYS)
+
+    return ReviewState(round(ease, 4), interval, repetitions + 1), now + timedelta(days=interval)
+
+
+def proficiency_after(proficiency_level: Optional[int], quality: int) -> int:
+    """Mức thành thạo 0-5 (giữ tương thích với proficiency_level cũ)"""
+    level = proficiency_level or 0
+    if quality >= PASSING_QUALITY:
+        return min(5, level + 1)
+    return max(0, level - 1)
@@ -0,0 +1,160 @@
+"""
+Khởi động ứng dụng: tạo database lần đầu và đo thời gian từng bước của create_app
+
+Trước đây create_app tạo một engine tới database `mysql` của server và chạy
+CREATE DATABASE IF NOT EXISTS ở mọi lần khởi tạo (mỗi worker, mỗi lần test).
+Giờ việc này do lệnh `flask database ensure` đảm nhận; kết quả được ghi vào
+một file đánh dấu (DATABASE_VERIFIED_MARKER, mặc định trong instance/) nên
+các lần khởi động sau chỉ cần đọc file.
+
+- DATABASE_AUTO_CREATE (mặc định True): create_app tự chạy bước trên khi chưa
+  có file đánh dấu, để `python run.py` trên máy mới vẫn chạy được. Đặt False
+  ở production để worker không bao giờ kết nối tới database `mysql`.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.url import make_url
+
+MARKER_FILENAME = "database_verified.json"
+
+
+def ensure_database_exists(database_uri: str) -> bool:
+    """
+    Tạo database đích nếu chưa có (MySQL), dùng cùng thông tin đăng nhập
+
+    Returns:
+        True nếu đã chạy CREATE DATABASE, False nếu URI không cần (vd. SQLite)
+
+    Raises:
+        Exception: lỗi kết nối/quyền từ server database
+    """
+    url = make_url(database_uri)
+    database_name = url.database
+    if not database_name or not url.drivername.startswith("mysql"):
+        return False
+
+    engine = create_engine(url.set(database="mysql"))
+    try:
+        with engine.connect() as conn:
+            conn.execute(
+                text(
+                    f"CREATE DATABASE IF NOT EXISTS `{database_name}` "
+                    "DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+                )
+            )
+    finally:
+        engine.dispose()
+    return True
+
+
+def _database_key(database_uri: str) -> str:
+    """Khóa của database trong file đánh dấu (không chứa mật khẩu)"""
+    rendered = make_url(database_uri).render_as_string(hide_password=True)
+    return hashlib.sha256(rendered.encode("utf-8")).hexdigest()
+
+
+def marker_path(app) -> str:
+    return app.config.get("DATABASE_VERIFIED_MARKER") or os.path.join(app.instance_path, MARKER_FILENAME)
+
+
+def _read_marker(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_marker(path: str, verified: Dict[str, str]) -> None:
+    # Ghi file tạm rồi thay thế để worker khác không đọc phải file ghi dở
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(verified, handle)
+    os.replace(temporary, path)
+
+
+def is_database_verified(app, database_uri: str) -> bool:
+    """Database đã được `flask database ensure` (hoặc lần khởi động trước) kiểm tra"""
+    return _database_key(database_uri) in _read_marker(marker_path(app))
+
+
+def mark_database_verified(app, database_uri: str) -> str:
+    """Ghi nhận database đã tồn tại; trả về đường dẫn file đánh dấu"""
+    path = marker_path(app)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    verified = _read_marker(path)
+    verified[_database_key(database_uri)] = datetime.utcnow().isoformat()
+    _write_marker(path, verified)
+    return path
+
+
+def forget_database_verified(app, database_uri: str) -> bool:
+    """Xóa dấu đã kiểm tra của database; True nếu trước đó có dấu"""
+    path = marker_path(app)
+    verified = _read_marker(path)
+    if verified.pop(_database_key(database_uri), None) is None:
+        return False
+    _write_marker(path, verified)
+    return True
+
+
+def bootstrap_database(app, database_uri: str) -> str:
+    """
+    Bước database của create_app
+
+    Returns:
+        "verified" (đã có dấu, bỏ qua), "created" (vừa kiểm tra/tạo và ghi dấu),
+        "skipped" (DATABASE_AUTO_CREATE tắt) hoặc "failed"
+    """
+    if is_database_verified(app, database_uri):
+        return "verified"
+    if not app.config.get("DATABASE_AUTO_CREATE", True):
+        return "skipped"
+    try:
+        ensure_database_exists(database_uri)
+        mark_database_verified(app, database_uri)
+        return "created"
+    except Exception as e:
+        # Để các bước khởi tạo sau báo lỗi kết nối như trước; chưa ghi dấu nên lần sau thử lại
+        app.logger.warning(f"Could not ensure database exists: {str(e)}")
+        return "failed"
+
+
+class StartupTimer:
+    """Đo thời gian các bước của create_app (config, engine, extensions, blueprints, ...)"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self.notes: Dict[str, object] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def record(self, name: str, ms: float) -> None:
+        self.phases.append((name, ms))
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "total_ms": round(sum(ms for _, ms in self.phases), 2),
+            "phases": [{"name": name, "ms": round(ms, 2)} for name, ms in self.phases],
+            "notes": dict(self.notes),
+        }
+
+
+def startup_report(app) -> Optional[Dict[str, object]]:
+    """Báo cáo thời gian khởi động của app (None nếu app không tạo bằng create_app)"""
+    timer = app.extensions.get("startup_timer")
+    return timer.report() if timer else None
@@ -0,0 +1,325 @@
+"""
+Chỉ mục tìm kiếm văn bản trong bộ nhớ (trigram + tiền tố token)
+
+- Chuẩn hóa tiếng Việt không dấu: "Nguyễn Đức" -> "nguyen duc", nên tìm
+  "nguyen", "Nguyễn" hay "NGUYEN" đều cho cùng kết quả.
+- Từ khóa >= 3 ký tự: giao các tập trigram rồi kiểm tra lại chuỗi con thật sự.
+- Từ khóa 1-2 ký tự: tra chỉ mục các chuỗi con 1-2 ký tự, nên vẫn là khớp
+  chuỗi con ở bất kỳ vị trí nào như LIKE '%x%' trước đây ("09" khớp
+  "0912345678" lẫn "0309...", "an" khớp "tuan").
+- Nhiều từ khóa: kết quả phải khớp tất cả (AND), xếp hạng theo mức khớp
+  (trùng token > tiền tố > chuỗi con) nhân trọng số của từng trường.
+- Trường chính (primary_fields, ví dụ từ gốc của từ điển): khi trọng số đủ lớn
+  để mọi kết quả khớp trường chính luôn xếp trên kết quả chỉ khớp trường phụ,
+  truy vấn một từ khóa có limit chỉ cần chấm điểm ứng viên của trường chính.
+- Bộ đệm LRU (cache_size) giữ kết quả các truy vấn lặp lại đến lần ghi kế tiếp.
+- rebuild() nhận version() lấy trước khi đọc dữ liệu: các add/remove xen giữa
+  lúc đọc và lúc thay chỉ mục được áp lại lên bản mới, không bị mất.
+"""
+
+import heapq
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SPACE_RE = re.compile(r"\s+")
+_SHORT_GRAM = 2
+
+
+def fold_text(value: Optional[str]) -> str:
+    """Bỏ dấu tiếng Việt, chuyển chữ thường và gom khoảng trắng"""
+    if not value:
+        return ""
+    text = unicodedata.normalize("NFD", str(value))
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    text = text.replace("đ", "d").replace("Đ", "d").lower()
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def tokenize(folded: str) -> List[str]:
+    """Tách chuỗi đã chuẩn hóa thành các token chữ/số"""
+    return _TOKEN_RE.findall(folded)
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TextIndex:
+    """
+    Chỉ mục đảo ngược trên nhiều trường văn bản của một loại tài liệu
+
+    Ví dụ:
+        index = TextIndex(weights=(3.0, 2.0, 1.0))
+        index.add("S00000001", ("Nguyễn Văn An", "an@example.com", "0912345678"))
+        index.search("nguyen an", limit=20)  # -> ["S00000001"]
+
+    Args:
+        weights: Trọng số của từng trường
+        primary_fields: Số trường đầu được đánh chỉ mục riêng. Trọng số nhỏ nhất
+            của chúng phải lớn hơn 3 lần trọng số lớn nhất của các trường còn lại
+            (khớp chuỗi con ở trường chính > trùng token ở trường phụ).
+        cache_size: Số kết quả truy vấn gần nhất được giữ lại (0 = tắt); bộ đệm
+            bị xóa mỗi khi chỉ mục thay đổi.
+    """
+
+    def __init__(self, weights: Sequence[float], primary_fields: int = 0, cache_size: int = 0):
+        self.weights = tuple(weights)
+        self.primary_fields = primary_fields
+        self.cache_size = cache_size
+        if primary_fields:
+            primary, rest = self.weights[:primary_fields], self.weights[primary_fields:]
+            if not primary or (rest and min(primary) <= 3.0 * max(rest)):
+                raise ValueError("Primary field weights must exceed 3x the other field weights")
+        self._lock = threading.RLock()
+        # doc_id -> tuple((văn bản đã chuẩn hóa, " token1 token2 ... "), ...) theo từng trường;
+        # chuỗi token có khoảng trắng bao quanh để kiểm tra trùng/tiền tố token bằng `in`
+        self._docs: Dict[Hashable, Tuple[Tuple[str, str], ...]] = {}
+        self._grams: Dict[str, Set[Hashable]] = {}
+        # Chuỗi con 1-2 ký tự (không chứa khoảng trắng) cho từ khóa ngắn
+        self._short_grams: Dict[str, Set[Hashable]] = {}
+        # Cùng cấu trúc nhưng chỉ trên các trường chính
+        self._primary_grams: Dict[str, Set[Hashable]] = {}
+        self._primary_short_grams: Dict[str, Set[Hashable]] = {}
+        self._cache: "OrderedDict[tuple, Tuple[Hashable, ...]]" = OrderedDict()
+        # Tăng sau mỗi add/remove; trong lúc có rebuild đang chờ, các thay đổi
+        # được ghi lại (doc_id, values hoặc None) để áp lên chỉ mục mới
+        self._version = 0
+        self._journal: Optional[List[Tuple[int, Hashable, Optional[Sequence[Optional[str]]]]]] = None
+        self._pending_rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    def version(self) -> int:
+        """
+        Phiên bản hiện tại; gọi trước khi đọc dữ liệu cho rebuild() và truyền lại
+
+        Từ lúc này các thay đổi được ghi lại để rebuild() áp lên bản mới.
+        """
+        with self._lock:
+            if self._journal is None:
+                self._journal = []
+            self._pending_rebuilds += 1
+            return self._version
+
+    # ------------------------------------------------------------------ ghi
+
+    def add(self, doc_id: Hashable, values: Sequence[Optional[str]]) -> None:
+        """Thêm hoặc cập nhật một tài liệu"""
+        fields = []
+        for value in values:
+            folded = fold_text(value)
+            fields.append((folded, " " + " ".join(tokenize(folded)) + " "))
+        fields = tuple(fields)
+
+        with self._lock:
+            self._record(doc_id, values)
+            if doc_id in self._docs:
+                if self._docs[doc_id] == fields:
+                    return
+                self._unindex(doc_id)
+            self._docs[doc_id] = fields
+            self._cache.clear()
+            for bucket, keys in self._buckets(fields):
+                for key in keys:
+                    bucket.setdefault(key, set()).add(doc_id)
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            self._record(doc_id, None)
+            if doc_id in self._docs:
+                self._unindex(doc_id)
+                del self._docs[doc_id]
+                self._cache.clear()
+
+    def rebuild(self, documents: Iterable[Tuple[Hashable, Sequence[Optional[str]]]],
+                version: Optional[int] = None) -> None:
+        """
+        Xây lại toàn bộ chỉ mục
+
+        Args:
+            documents: Ảnh chụp dữ liệu
+            version: Giá trị version() lấy trước khi đọc documents; các add/remove
+                từ đó tới lúc thay chỉ mục được áp lại lên bản mới
+        """
+        fresh = TextIndex(self.weights, self.primary_fields)
+        for doc_id, values in documents:
+            fresh.add(doc_id, values)
+        with self._lock:
+            if version is not None:
+                for changed_at, doc_id, values in self._journal or ():
+                    if changed_at <= version:
+                        continue
+                    if values is None:
+                        fresh.remove(doc_id)
+                    else:
+                        fresh.add(doc_id, values)
+                self._pending_rebuilds -= 1
+                if self._pending_rebuilds <= 0:
+                    self._pending_rebuilds = 0
+                    self._journal = None
+            self._docs, self._grams, self._short_grams = fresh._docs, fresh._grams, fresh._short_grams
+            self._primary_grams, self._primary_short_grams = fresh._primary_grams, fresh._primary_short_grams
+            self._version += 1
+            self._cache.clear()
+
+    def abort_rebuild(self) -> None:
+        """Bỏ một rebuild đã gọi version() nhưng không hoàn tất (lỗi khi đọc dữ liệu)"""
+        with self._lock:
+            self._pending_rebuilds = max(0, self._pending_rebuilds - 1)
+            if not self._pending_rebuilds:
+                self._journal = None
+
+    # ------------------------------------------------------------------ đọc
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """Trả về doc_id khớp với mọi từ khóa, xếp theo độ liên quan giảm dần"""
+        folded = fold_text(query)
+        terms = tokenize(folded)
+        if not terms:
+            return []
+        # Từ khóa dài trước: tập ứng viên nhỏ hơn
+        terms = sorted(set(terms), key=len, reverse=True)
+
+        with self._lock:
+            cache_key = (folded, limit)
+            if self.cache_size:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    return list(cached)
+
+            result = self._search(terms, folded, limit)
+
+            if self.cache_size:
+                self._cache[cache_key] = tuple(result)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    # ------------------------------------------------------------------ nội bộ
+
+    def _record(self, doc_id: Hashable, values: Optional[Sequence[Optional[str]]]) -> None:
+        self._version += 1
+        if self._journal is not None:
+            self._journal.append((self._version, doc_id, None if values is None else tuple(values)))
+
+    @staticmethod
+    def _keys(fields) -> Tuple[Set[str], Set[str]]:
+        """Trigram và các chuỗi con 1-2 ký tự của các trường"""
+        grams, shorts = set(), set()
+        for folded, bounded in fields:
+            grams.update(trigrams(folded))
+            for token in bounded.split():
+                for size in range(1, _SHORT_GRAM + 1):
+                    shorts.update(token[i:i + size] for i in range(len(token) - size + 1))
+        return grams, shorts
+
+    def _buckets(self, fields):
+        """Các cặp (chỉ mục, khóa) cần ghi cho một tài liệu"""
+        grams, shorts = self._keys(fields)
+        buckets = [(self._grams, grams), (self._short_grams, shorts)]
+        if self.primary_fields:
+            grams, shorts = self._keys(fields[:self.primary_fields])
+            buckets += [(self._primary_grams, grams), (self._primary_short_grams, shorts)]
+        return buckets
+
+    def _unindex(self, doc_id: Hashable) -> None:
+        for bucket, keys in self._buckets(self._docs[doc_id]):
+            for key in keys:
+                ids = bucket.get(key)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del bucket[key]
+
+    @staticmethod
+    def _term_candidates(term: str, within: Optional[Set[Hashable]],
+                         grams: Dict[str, Set[Hashable]],
+                         shorts: Dict[str, Set[Hashable]]) -> Set[Hashable]:
+        if len(term) <= _SHORT_GRAM:
+            return set(shorts.get(term, ()))
+
+        sets = []
+        for gram in trigrams(term):
+            ids = grams.get(gram)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        result = set(within & sets[0]) if within is not None else set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def _search(self, terms: List[str], folded: str, limit: Optional[int]) -> List[Hashable]:
+        if limit is not None and self.primary_fields and len(terms) == 1:
+            # Đủ kết quả ở trường chính thì các tài liệu chỉ khớp trường phụ
+            # (điểm luôn thấp hơn) không thể lọt vào top
+            primary = self._term_candidates(terms[0], None, self._primary_grams, self._primary_short_grams)
+            scored = self._rank(primary, terms, folded)
+            if len(scored) >= limit:
+                return [item[3] for item in heapq.nsmallest(limit, scored)]
+
+        candidates: Optional[Set[Hashable]] = None
+        for term in terms:
+            matched = self._term_candidates(term, candidates, self._grams, self._short_grams)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+        scored = self._rank(candidates, terms, folded)
+
+        if limit is not None:
+            scored = heapq.nsmallest(limit, scored)
+        else:
+            scored.sort()
+        return [item[3] for item in scored]
+
+    def _rank(self, candidates: Set[Hashable], terms: List[str], folded_query: str) -> List[tuple]:
+        """Khóa sắp xếp (tăng dần = liên quan hơn) của các ứng viên khớp thật"""
+        scored = []
+        for doc_id in candidates:
+            fields = self._docs[doc_id]
+            score = self._score(fields, terms, folded_query)
+            if score:
+                scored.append((-score, len(fields[0][0]), str(doc_id), doc_id))
+        return scored
+
+    def _score(self, fields, terms: List[str], folded_query: str) -> float:
+        total = 0.0
+        for term in terms:
+            best = 0.0
+            whole, prefix = f" {term} ", f" {term}"
+            for weight, (text, bounded) in zip(self.weights, fields):
+                if whole in bounded:
+                    quality = 3.0
+                elif prefix in bounded:
+                    quality = 2.0
+                elif term in text:
+                    quality = 1.0
+                else:
+                    continue
+                best = max(best, quality * weight)
+            if not best:
+                # Trigram trùng nhưng không liền nhau: không phải kết quả thật
+                return 0.0
+            total += best
+
+        # Cả cụm từ khóa xuất hiện liền nhau / ở đầu trường
+        if len(terms) > 1 or " " in folded_query:
+            for weight, (text, _) in zip(self.weights, fields):
+                if folded_query in text:
+                    total += weight * (2.0 if text.startswith(folded_query) else 1.0)
+                    break
+        elif fields and fields[0][0].startswith(folded_query):
+            total += self.weights[0]
+        return total
@@ -0,0 +1,259 @@
+"""
+Bộ giải xếp thời khóa biểu theo tuần (không phụ thuộc database)
+
+Tuần được chia thành lưới ô (ngày x ca). Mỗi phòng và mỗi giáo viên có một
+bitmask ô đã bị chiếm, nên kiểm tra "phòng/giáo viên rảnh ở ô nào" chỉ là
+vài phép AND/OR trên số nguyên.
+
+Thuật toán: tham lam có quay lui (backtracking)
+- Chọn lớp khó xếp nhất trước (ít ô khả dụng nhất so với số buổi còn thiếu).
+- Với mỗi buổi, thử các ô theo thứ tự: giãn cách ngày học, ô còn nhiều phòng
+  trống nhất; phòng được chọn là phòng nhỏ nhất đủ sức chứa (best fit).
+- Gặp ngõ cụt thì quay lui trong giới hạn max_backtracks; hết giới hạn thì
+  bỏ lớp đó (ghi lý do) và tiếp tục với các lớp còn lại.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+
+class _ClassState:
+    __slots__ = ("key", "teacher", "size", "sessions", "room_index", "placed", "day_mask")
+
+    def __init__(self, key: Hashable, teacher: Hashable, size: int, sessions: int, room_index: int):
+        self.key = key
+        self.teacher = teacher
+        self.size = size
+        self.sessions = sessions
+        self.room_index = room_index
+        self.placed: List[Tuple[int, Any]] = []
+        self.day_mask = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.sessions - len(self.placed)
+
+
+class TimetableSolver:
+    """
+    Xếp các lớp vào lưới tuần sao cho không trùng phòng, không trùng giáo viên,
+    phòng đủ sức chứa và mỗi lớp học tối đa một buổi mỗi ngày.
+
+    Ví dụ:
+        solver = TimetableSolver(days=6, slots_per_day=5, rooms={1: 30, 2: 20})
+        solver.block_teacher("T01", busy_mask)
+        result = solver.solve([{"key": 7, "teacher": "T01", "size": 25, "sessions": 3}])
+    """
+
+    def __init__(self, days: int, slots_per_day: int, rooms: Dict[Hashable, Optional[int]],
+                 max_backtracks: int = 2000, beam: int = 8):
+        if days < 1 or slots_per_day < 1:
+            raise ValueError("Grid must have at least one day and one slot")
+
+        self.days = days
+        self.slots_per_day = slots_per_day
+        self.cells = days * slots_per_day
+        self.full_mask = (1 << self.cells) - 1
+        self.day_cells = [((1 << slots_per_day) - 1) << (d * slots_per_day) for d in range(days)]
+        self.max_backtracks = max_backtracks
+        self.beam = beam
+
+        # Phòng sắp theo sức chứa tăng dần, phòng không rõ sức chứa coi như 0
+        ordered = sorted(rooms.items(), key=lambda item: (item[1] or 0, str(item[0])))
+        self.room_ids = [room_id for room_id, _ in ordered]
+        self.room_capacities = [capacity or 0 for _, capacity in ordered]
+        self.room_busy = [0] * len(ordered)
+        self._room_position = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        self.teacher_busy: Dict[Hashable, int] = {}
+
+        self.backtracks = 0
+        self.steps = 0
+
+    # ------------------------------------------------------------ chiếm dụng sẵn có
+
+    def block_room(self, room_id: Hashable, mask: int) -> None:
+        """Đánh dấu các ô phòng đã bị chiếm (bởi lịch đã tồn tại)"""
+        position = self._room_position.get(room_id)
+        if position is not None:
+            self.room_busy[position] |= mask & self.full_mask
+
+    def block_teacher(self, teacher: Hashable, mask: int) -> None:
+        """Đánh dấu các ô giáo viên đã bận"""
+        self.teacher_busy[teacher] = self.teacher_busy.get(teacher, 0) | (mask & self.full_mask)
+
+    def cell(self, day: int, slot: int) -> int:
+        return day * self.slots_per_day + slot
+
+    # ------------------------------------------------------------------- giải
+
+    def solve(self, requests: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Args:
+            requests: Danh sách dict có key (định danh lớp), teacher, size (sĩ số tối đa),
+                      sessions (số buổi mỗi tuần)
+
+        Returns:
+            Dict gồm:
+                - assignments: {key: [(day, slot, room_id), ...]} theo thứ tự ô
+                - unassigned: {key: lý do}
+                - backtracks, steps: thống kê quá trình giải
+        """
+        states: Dict[Hashable, _ClassState] = {}
+        unassigned: Dict[Hashable, str] = {}
+
+        for request in requests:
+            key = request["key"]
+            sessions = int(request.get("sessions") or 0)
+            size = int(request.get("size") or 0)
+            if sessions < 1:
+                continue
+            if sessions > self.days:
+                unassigned[key] = f"Cannot fit {sessions} sessions in {self.days} days (one per day)"
+                continue
+            room_index = bisect_left(self.room_capacities, size)
+            if room_index == len(self.room_ids):
+                unassigned[key] = f"No room with capacity >= {size}"
+                continue
+            states[key] = _ClassState(key, request["teacher"], size, sessions, room_index)
+
+        pending = set(states)
+        # Mỗi frame: [key, các lựa chọn, vị trí lựa chọn kế tiếp, lựa chọn đang áp dụng]
+        frames: List[list] = []
+
+        while pending:
+            key = self._select(states, pending)
+            frames.append([key, self._candidates(states[key]), 0, None])
+            self.steps += 1
+
+            while frames:
+                frame = frames[-1]
+                state = states[frame[0]]
+                if frame[3] is not None:
+                    self._unassign(state, frame[3], pending)
+                    frame[3] = None
+
+                if frame[2] < len(frame[1]):
+                    value = frame[1][frame[2]]
+                    frame[2] += 1
+                    self._assign(state, value, pending)
+                    frame[3] = value
+                    break
+
+                # Ngõ cụt: quay lui nếu còn ngân sách, ngược lại bỏ lớp này
+                if self.backtracks >= self.max_backtracks or len(frames) == 1:
+                    frames = self._drop(state, frames, pending)
+                    unassigned[state.key] = "No conflict-free slot found"
+                    break
+
+                frames.pop()
+                self.backtracks += 1
+
+        assignments = {}
+        for key, state in states.items():
+            if key in unassigned:
+                continue
+            assignments[key] = sorted(
+                (cell // self.slots_per_day, cell % self.slots_per_day, self.room_ids[room])
+                for cell, room in state.placed
+            )
+
+        return {
+            "assignments": assignments,
+            "unassigned": unassigned,
+            "backtracks": self.backtracks,
+            "steps": self.steps,
+        }
+
+    # ------------------------------------------------------------------ nội bộ
+
+    def _free_cells(self, state: _ClassState) -> int:
+        """Các ô giáo viên còn rảnh và lớp chưa học trong ngày đó"""
+        used = 0
+        day_mask = state.day_mask
+        day = 0
+        while day_mask:
+            if day_mask & 1:
+                used |= self.day_cells[day]
+            day_mask >>= 1
+            day += 1
+        return self.full_mask & ~self.teacher_busy.get(state.teacher, 0) & ~used
+
+    def _select(self, states: Dict[Hashable, _ClassState], pending: set) -> Hashable:
+        """Chọn lớp có ít ô khả dụng nhất trên mỗi buổi còn thiếu"""
+        # room_free_from[i] = các ô còn ít nhất một phòng trống trong các phòng i..cuối
+        room_free_from = [0] * (len(self.room_ids) + 1)
+        for i in range(len(self.room_ids) - 1, -1, -1):
+            room_free_from[i] = room_free_from[i + 1] | (self.full_mask & ~self.room_busy[i])
+
+        best_key = None
+        best_score = None
+        for key in pending:
+            state = states[key]
+            domain = _popcount(self._free_cells(state) & room_free_from[state.room_index])
+            if domain < state.remaining:
+                return key
+            score = (domain / state.remaining, -state.size, -state.remaining, str(key))
+            if best_score is None or score < best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _candidates(self, state: _ClassState) -> List[Tuple[int, int]]:
+        """Danh sách (ô, phòng) đã sắp thứ tự ưu tiên, tối đa `beam` lựa chọn"""
+        free = self._free_cells(state)
+        used_days = [d for d in range(self.days) if state.day_mask >> d & 1]
+        scored = []
+        cell = 0
+        while free:
+            if free & 1:
+                bit = 1 << cell
+                best_room = None
+                free_rooms = 0
+                for room in range(state.room_index, len(self.room_ids)):
+                    if not self.room_busy[room] & bit:
+                        free_rooms += 1
+                        if best_room is None:
+                            best_room = room
+                if best_room is not None:
+                    day = cell // self.slots_per_day
+                    gap = min((abs(day - d) for d in used_days), default=self.days)
+                    scored.append(((0 if gap >= 2 else 1, -free_rooms, cell), (cell, best_room)))
+            free >>= 1
+            cell += 1
+
+        scored.sort()
+        return [value for _, value in scored[:self.beam]]
+
+    def _assign(self, state: _ClassState, value: Tuple[int, int], pending: set) -> None:
+        cell, room = value
+        bit = 1 << cell
+        self.room_busy[room] |= bit
+        self.teacher_busy[state.teacher] = self.teacher_busy.get(state.teacher, 0) | bit
+        state.day_mask |= 1 << (cell // self.slots_per_day)
+        state.placed.append(value)
+        if state.remaining == 0:
+            pending.discard(state.key)
+
+    def _unassign(self, state: _ClassState, value: Tuple[int, int], pending: set) -> None:
+        cell, room = value
+        bit = 1 << cell
+        self.room_busy[room] &= ~bit
+        self.teacher_busy[state.teacher] &= ~bit
+        state.day_mask &= ~(1 << (cell // self.slots_per_day))
+        state.placed.remove(value)
+        pending.add(state.key)
+
+    def _drop(self, state: _ClassState, frames: List[list], pending: set) -> List[list]:
+        """Bỏ hẳn một lớp: gỡ mọi buổi đã xếp của lớp và xóa các frame của nó"""
+        kept = []
+        for frame in frames:
+            if frame[0] == state.key:
+                if frame[3] is not None:
+                    self._unassign(state, frame[3], pending)
+            else:
+                kept.append(frame)
+        pending.discard(state.key)
+        return kept
@@ -0,0 +1,74 @@
+"""
+Cache LRU có thời hạn (TTL) cho từng phần tử, an toàn giữa các thread
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU giới hạn max_entries, mỗi phần tử hết hạn sau ttl giây (hoặc sớm
+    hơn nếu set() truyền expires_at). Phần tử hết hạn bị bỏ khi được đọc tới.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Lưu value; ttl (giây) nhỏ hơn self.ttl sẽ được ưu tiên"""
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self._clock() + lifetime)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
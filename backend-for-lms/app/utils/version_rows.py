@@ -0,0 +1,54 @@
+"""
+Bảng version theo khóa dùng để báo cache trong bộ nhớ của các tiến trình đã cũ
+
+Mỗi bảng có một cột khóa chính (vd. test_id, class_id), cột version và
+updated_at. Bên ghi tăng version trong cùng transaction với thay đổi dữ liệu;
+bên đọc so version trong DB (truy vấn theo khóa chính) với version lúc nạp.
+Khóa chưa có dòng nào được coi là version 0.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+
+def bump_versions(connection, table, keys: Iterable[Any]) -> None:
+    """Tăng version của các khóa (upsert nguyên tử theo dialect)"""
+    key_column = table.primary_key.columns[0]
+    dialect = connection.dialect.name
+    now = datetime.utcnow()
+
+    for key in sorted(keys):
+        values = {key_column.name: key, "version": 1, "updated_at": now}
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+
+            statement = insert(table).values(**values).on_duplicate_key_update(
+                version=table.c.version + 1, updated_at=now
+            )
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+
+            statement = insert(table).values(**values).on_conflict_do_update(
+                index_elements=[key_column],
+                set_={"version": table.c.version + 1, "updated_at": now},
+            )
+        else:
+            updated = connection.execute(
+                table.update().where(key_column == key).values(version=table.c.version + 1, updated_at=now)
+            ).rowcount
+            if updated:
+                continue
+            statement = table.insert().values(**values)
+        connection.execute(statement)
+
+
+def read_versions(connection, table, keys: Iterable[Any]) -> Dict[Any, int]:
+    """Version hiện tại của các khóa (khóa chưa có dòng là 0)"""
+    keys = set(keys)
+    if not keys:
+        return {}
+    key_column = table.primary_key.columns[0]
+    rows = connection.execute(table.select().with_only_columns(key_column, table.c.version).where(key_column.in_(keys)))
+    versions = dict.fromkeys(keys, 0)
+    versions.update((key, version) for key, version in rows)
+    return versions
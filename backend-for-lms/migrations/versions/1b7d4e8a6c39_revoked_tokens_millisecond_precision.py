@@ -0,0 +1,34 @@
+"""Store revoked_tokens.revoked_at with sub-second precision
+
+Revision ID: 1b7d4e8a6c39
+Revises: 8e5a1f3c7d24
+Create Date: 2025-10-16 14:05:18.226741
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7d4e8a6c39'
+down_revision = '8e5a1f3c7d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite đã lưu cả phần micro giây, chỉ MySQL cần đổi kiểu cột
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('revoked_tokens', 'revoked_at',
+                        existing_type=sa.DateTime(),
+                        type_=mysql.DATETIME(fsp=6),
+                        existing_nullable=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('revoked_tokens', 'revoked_at',
+                        existing_type=mysql.DATETIME(fsp=6),
+                        type_=sa.DateTime(),
+                        existing_nullable=False)
@@ -0,0 +1,54 @@
+"""Add user_credentials login index
+
+Revision ID: 2a7c5e9d13b6
+Revises: 9e3b6d4f20a7
+Create Date: 2025-10-13 08:47:10.552183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a7c5e9d13b6'
+down_revision = '9e3b6d4f20a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    user_credentials = op.create_table('user_credentials',
+    sa.Column('email_normalized', sa.String(length=100), nullable=False),
+    sa.Column('role', sa.String(length=10), nullable=False),
+    sa.Column('user_id', sa.String(length=10), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=True),
+    sa.Column('is_email_verified', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('email_normalized'),
+    sa.UniqueConstraint('role', 'user_id', name='uq_user_credentials_role_user')
+    )
+
+    # Backfill: giáo viên trước (giống thứ tự đăng nhập cũ), email trùng giữ tài khoản đầu tiên
+    bind = op.get_bind()
+    rows = {}
+    sources = (
+        ('teacher', "SELECT user_id, user_email, user_password, 1 FROM teachers"),
+        ('student', "SELECT user_id, user_email, user_password, is_email_verified FROM students"),
+    )
+    for role, query in sources:
+        for user_id, email, password_hash, verified in bind.execute(sa.text(f"{query} ORDER BY user_id")):
+            email_normalized = (email or '').strip().lower()
+            if email_normalized and email_normalized not in rows:
+                rows[email_normalized] = {
+                    'email_normalized': email_normalized,
+                    'role': role,
+                    'user_id': user_id,
+                    'password_hash': password_hash,
+                    'is_email_verified': bool(verified),
+                }
+    if rows:
+        op.bulk_insert(user_credentials, list(rows.values()))
+
+
+def downgrade():
+    op.drop_table('user_credentials')
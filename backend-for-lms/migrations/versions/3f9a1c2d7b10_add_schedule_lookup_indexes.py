@@ -0,0 +1,53 @@
+"""Add composite indexes for schedule lookups
+
+Revision ID: 3f9a1c2d7b10
+Revises: e5b356931161
+Create Date: 2025-10-06 10:12:41.218904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b10'
+down_revision = 'e5b356931161'
+branch_labels = None
+depends_on = None
+
+
+# Cột khóa ngoại đứng đầu index mới -> MySQL có thể bỏ index FK tự sinh
+FOREIGN_KEY_COLUMNS = {
+    'ix_schedules_room_date_time': 'room_id',
+    'ix_schedules_user_date_time': 'user_id',
+    'ix_schedules_class_date_start': 'class_id',
+}
+
+
+def upgrade():
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        batch_op.create_index('ix_schedules_room_date_time', ['room_id', 'schedule_date', 'schedule_startime', 'schedule_endtime'], unique=False)
+        batch_op.create_index('ix_schedules_user_date_time', ['user_id', 'schedule_date', 'schedule_startime', 'schedule_endtime'], unique=False)
+        batch_op.create_index('ix_schedules_class_date_start', ['class_id', 'schedule_date', 'schedule_startime'], unique=False)
+        batch_op.create_index('ix_schedules_date_start', ['schedule_date', 'schedule_startime'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'mysql':
+        # Tạo lại index một cột cho khóa ngoại nếu MySQL đã bỏ index FK tự sinh,
+        # nếu không DROP INDEX sẽ lỗi "needed in a foreign key constraint"
+        existing = sa.inspect(bind).get_indexes('schedules')
+        for index_name, column in FOREIGN_KEY_COLUMNS.items():
+            covered = any(
+                index['name'] != index_name and index['column_names'][:1] == [column]
+                for index in existing
+            )
+            if not covered:
+                op.create_index(f'ix_schedules_{column}', 'schedules', [column], unique=False)
+
+    with op.batch_alter_table('schedules', schema=None) as batch_op:
+        batch_op.drop_index('ix_schedules_date_start')
+        batch_op.drop_index('ix_schedules_class_date_start')
+        batch_op.drop_index('ix_schedules_user_date_time')
+        batch_op.drop_index('ix_schedules_room_date_time')
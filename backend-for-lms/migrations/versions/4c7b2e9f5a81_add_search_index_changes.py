@@ -0,0 +1,35 @@
+"""Add search_index_changes for cross-process search index sync
+
+Revision ID: 4c7b2e9f5a81
+Revises: d3f8a61c0b42
+Create Date: 2025-10-15 11:27:36.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7b2e9f5a81'
+down_revision = 'd3f8a61c0b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('search_index_changes',
+    sa.Column('change_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('index_name', sa.String(length=20), nullable=False),
+    sa.Column('doc_key', sa.String(length=50), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('change_id')
+    )
+    with op.batch_alter_table('search_index_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_search_index_changes_name_changed_at', ['index_name', 'changed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('search_index_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_search_index_changes_name_changed_at')
+
+    op.drop_table('search_index_changes')
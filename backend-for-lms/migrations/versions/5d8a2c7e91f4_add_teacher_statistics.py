@@ -0,0 +1,39 @@
+"""Add teacher_statistics counters and hire date index
+
+Revision ID: 5d8a2c7e91f4
+Revises: c41d7e0b5a28
+Create Date: 2025-10-12 10:15:27.481930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8a2c7e91f4'
+down_revision = 'c41d7e0b5a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('teacher_statistics',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('bucket', sa.String(length=100), nullable=False),
+    sa.Column('teacher_count', sa.Integer(), nullable=False),
+    sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('dimension', 'bucket')
+    )
+    with op.batch_alter_table('teachers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_teachers_tch_hire_date'), ['tch_hire_date'], unique=False)
+
+    # Nhóm thâm niên phụ thuộc ngày hiện tại nên không backfill ở đây:
+    # bảng rỗng sẽ được đối soát ở lần đọc đầu tiên (hoặc `flask teachers reconcile-stats`).
+
+
+def downgrade():
+    with op.batch_alter_table('teachers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_teachers_tch_hire_date'))
+
+    op.drop_table('teacher_statistics')
@@ -0,0 +1,45 @@
+"""Add mail_outbox queue
+
+Revision ID: 7f1e4b8c2d59
+Revises: 2a7c5e9d13b6
+Create Date: 2025-10-13 14:22:05.630417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f1e4b8c2d59'
+down_revision = '2a7c5e9d13b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mail_outbox',
+    sa.Column('mail_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('html', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('claim_token', sa.String(length=32), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('mail_id')
+    )
+    with op.batch_alter_table('mail_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_mail_outbox_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+        batch_op.create_index('ix_mail_outbox_claim_token', ['claim_token'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('mail_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_mail_outbox_claim_token')
+        batch_op.drop_index('ix_mail_outbox_status_next_attempt')
+
+    op.drop_table('mail_outbox')
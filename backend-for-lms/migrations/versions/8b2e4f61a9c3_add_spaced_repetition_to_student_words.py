@@ -0,0 +1,47 @@
+"""Add spaced repetition scheduling to student_words
+
+Revision ID: 8b2e4f61a9c3
+Revises: 3f9a1c2d7b10
+Create Date: 2025-10-09 14:27:05.661372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f61a9c3'
+down_revision = '3f9a1c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('student_words', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('due_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('ease_factor', sa.Float(), nullable=False, server_default='2.5'))
+        batch_op.add_column(sa.Column('interval_days', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('repetitions', sa.Integer(), nullable=False, server_default='0'))
+
+    # Từ đã có: đến hạn ngay, từ ôn lâu nhất trước (giống thứ tự ôn cũ);
+    # số lần nhớ liên tiếp lấy từ mức thành thạo để khoảng cách tăng nhanh
+    op.execute(
+        "UPDATE student_words SET "
+        "due_at = COALESCE(last_reviewed, learned_date, CURRENT_TIMESTAMP), "
+        "repetitions = COALESCE(proficiency_level, 0), "
+        "interval_days = CASE WHEN COALESCE(proficiency_level, 0) > 0 THEN 1 ELSE 0 END"
+    )
+
+    with op.batch_alter_table('student_words', schema=None) as batch_op:
+        batch_op.alter_column('due_at', existing_type=sa.DateTime(timezone=True), nullable=False,
+                              server_default=sa.text('CURRENT_TIMESTAMP'))
+        batch_op.create_index('ix_student_words_user_due', ['user_id', 'due_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('student_words', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_words_user_due')
+        batch_op.drop_column('repetitions')
+        batch_op.drop_column('interval_days')
+        batch_op.drop_column('ease_factor')
+        batch_op.drop_column('due_at')
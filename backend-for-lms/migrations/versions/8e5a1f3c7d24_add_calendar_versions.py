@@ -0,0 +1,29 @@
+"""Add calendar_versions for cross-process calendar invalidation
+
+Revision ID: 8e5a1f3c7d24
+Revises: 4c7b2e9f5a81
+Create Date: 2025-10-16 09:12:44.581937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e5a1f3c7d24'
+down_revision = '4c7b2e9f5a81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('calendar_versions',
+    sa.Column('class_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('class_id')
+    )
+
+
+def downgrade():
+    op.drop_table('calendar_versions')
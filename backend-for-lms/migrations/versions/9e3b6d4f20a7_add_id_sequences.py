@@ -0,0 +1,31 @@
+"""Add id_sequences for prefixed id allocation
+
+Revision ID: 9e3b6d4f20a7
+Revises: 5d8a2c7e91f4
+Create Date: 2025-10-12 15:03:44.918262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3b6d4f20a7'
+down_revision = '5d8a2c7e91f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Các sequence được khởi tạo từ mã lớn nhất hiện có ở lần cấp mã đầu tiên
+    # (app/utils/id_allocator.py), nên không cần backfill tại đây.
+    op.create_table('id_sequences',
+    sa.Column('seq_name', sa.String(length=30), nullable=False),
+    sa.Column('next_value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('seq_name')
+    )
+
+
+def downgrade():
+    op.drop_table('id_sequences')
@@ -0,0 +1,36 @@
+"""Add revoked_tokens for JWT revocation
+
+Revision ID: b6d09a3e5c17
+Revises: 7f1e4b8c2d59
+Create Date: 2025-10-14 09:12:38.204771
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d09a3e5c17'
+down_revision = '7f1e4b8c2d59'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revoked_tokens',
+    sa.Column('token_key', sa.String(length=80), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('token_key')
+    )
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_revoked_tokens_revoked_at'), ['revoked_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_revoked_tokens_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_revoked_at'))
+
+    op.drop_table('revoked_tokens')
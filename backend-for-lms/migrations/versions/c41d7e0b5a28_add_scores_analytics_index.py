@@ -0,0 +1,25 @@
+"""Add covering index for score analytics
+
+Revision ID: c41d7e0b5a28
+Revises: 8b2e4f61a9c3
+Create Date: 2025-10-11 09:41:52.307114
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e0b5a28'
+down_revision = '8b2e4f61a9c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('scores', schema=None) as batch_op:
+        batch_op.create_index('ix_scores_class_test_score', ['class_id', 'test_id', 'sc_score'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_scores_class_test_score')
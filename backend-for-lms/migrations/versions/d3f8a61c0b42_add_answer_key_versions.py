@@ -0,0 +1,29 @@
+"""Add answer_key_versions for cross-process answer key invalidation
+
+Revision ID: d3f8a61c0b42
+Revises: b6d09a3e5c17
+Create Date: 2025-10-15 10:04:51.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8a61c0b42'
+down_revision = 'b6d09a3e5c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('answer_key_versions',
+    sa.Column('test_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('test_id')
+    )
+
+
+def downgrade():
+    op.drop_table('answer_key_versions')
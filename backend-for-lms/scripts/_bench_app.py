@@ -0,0 +1,59 @@
+"""
+Tiện ích dùng chung cho các script benchmark và kiểm tra hiệu năng
+
+Các script trong thư mục này tạo một Flask app tối giản trỏ tới database
+được chỉ định (mặc định SQLite), không đụng tới database thật của hệ thống.
+"""
+
+import importlib
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from sqlalchemy.dialects.mysql import TINYINT  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+from app.config import db  # noqa: E402
+
+DEFAULT_DATABASE_URI = "sqlite:///bench.sqlite3"
+
+
+@compiles(TINYINT, "sqlite")
+def _compile_tinyint_sqlite(type_, compiler, **kw):
+    # Model dùng kiểu riêng của MySQL (vd. courses.is_deleted); SQLite lưu số nguyên như nhau
+    return "SMALLINT"
+
+
+def make_app(database_uri: str = DEFAULT_DATABASE_URI, **config) -> Flask:
+    """Tạo Flask app tối giản cho benchmark"""
+    bench_app = Flask("bench")
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    bench_app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    bench_app.config["JWT_SECRET_KEY"] = "bench-secret"
+    bench_app.config.update(config)
+    db.init_app(bench_app)
+
+    # Đăng ký toàn bộ model với metadata
+    importlib.import_module("app.models")
+    return bench_app
+
+
+def reset_database(bench_app: Flask) -> None:
+    """Xóa và tạo lại toàn bộ bảng"""
+    with bench_app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def measure(fn, repeat: int = 5) -> float:
+    """Chạy fn nhiều lần, trả về thời gian trung vị (ms)"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
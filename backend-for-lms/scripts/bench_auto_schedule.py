@@ -0,0 +1,143 @@
+"""
+Benchmark bộ tự động xếp thời khóa biểu
+
+1. Chỉ bộ giải: 200 lớp / 40 phòng / 60 giáo viên trên lưới tuần, kiểm tra lại
+   phương án không trùng phòng, không trùng giáo viên, đủ sức chứa.
+2. Toàn bộ luồng (seed SQLite, AutoScheduleService.generate_timetable ghi lịch
+   qua bulk_create_schedules cho cả học kỳ).
+
+Chạy:
+    python scripts/bench_auto_schedule.py
+    python scripts/bench_auto_schedule.py --classes 200 --rooms 40 --teachers 60 --weeks 16
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from _bench_app import make_app, reset_database
+
+from app.config import db
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.room_model import Room
+from app.models.schedule_model import Schedule
+from app.models.teacher_model import Teacher
+from app.services.auto_schedule_service import AutoScheduleService
+from app.utils.timetable_solver import TimetableSolver
+
+START_DATE = date(2025, 9, 1)
+CAPACITIES = [15, 20, 25, 30, 40]
+CLASS_SIZES = [10, 15, 20, 25, 30, 35]
+
+
+def make_problem(classes: int, rooms: int, teachers: int, max_sessions: int, seed: int):
+    rng = random.Random(seed)
+    room_capacities = {i: rng.choice(CAPACITIES) for i in range(1, rooms + 1)}
+    requests = [
+        {
+            "key": c,
+            "teacher": f"T{rng.randint(1, teachers):08d}",
+            "size": rng.choice(CLASS_SIZES),
+            "sessions": rng.randint(2, max_sessions),
+        }
+        for c in range(1, classes + 1)
+    ]
+    return room_capacities, requests
+
+
+def verify(solution, room_capacities, requests) -> None:
+    by_key = {request["key"]: request for request in requests}
+    rooms_used, teachers_used = set(), set()
+    for key, cells in solution["assignments"].items():
+        request = by_key[key]
+        days = [day for day, _, _ in cells]
+        assert len(cells) == request["sessions"], f"class {key}: wrong session count"
+        assert len(set(days)) == len(days), f"class {key}: two sessions on one day"
+        for day, slot, room_id in cells:
+            assert (day, slot, room_id) not in rooms_used, f"room {room_id} double booked"
+            assert (day, slot, request["teacher"]) not in teachers_used, f"teacher {request['teacher']} double booked"
+            assert room_capacities[room_id] >= request["size"], f"room {room_id} too small for class {key}"
+            rooms_used.add((day, slot, room_id))
+            teachers_used.add((day, slot, request["teacher"]))
+
+
+def bench_solver(args) -> None:
+    print(f"Solver: {args.classes} classes / {args.rooms} rooms / {args.teachers} teachers, "
+          f"{args.days} days x {args.slots} slots")
+    for seed in range(args.runs):
+        room_capacities, requests = make_problem(
+            args.classes, args.rooms, args.teachers, args.max_sessions, seed
+        )
+        solver = TimetableSolver(args.days, args.slots, room_capacities)
+        started = time.perf_counter()
+        solution = solver.solve(requests)
+        elapsed = (time.perf_counter() - started) * 1000
+        verify(solution, room_capacities, requests)
+        sessions = sum(request["sessions"] for request in requests)
+        print(f"  seed {seed}: {sessions} sessions, {len(solution['assignments'])} classes placed, "
+              f"{len(solution['unassigned'])} unassigned, {solution['backtracks']} backtracks, {elapsed:.1f} ms")
+
+
+def bench_end_to_end(args) -> None:
+    room_capacities, requests = make_problem(args.classes, args.rooms, args.teachers, args.max_sessions, 0)
+
+    bench_app = make_app(args.database)
+    reset_database(bench_app)
+
+    with bench_app.app_context():
+        db.session.add(Course(course_id="C0000001", course_name="TOEIC", is_deleted=0))
+        db.session.add_all(Room(room_id=room_id, room_name=f"P{room_id:03d}", room_capacity=capacity,
+                                room_status="AVAILABLE") for room_id, capacity in room_capacities.items())
+        db.session.add_all(Teacher(user_id=f"T{i:08d}", user_name=f"Teacher {i}")
+                           for i in range(1, args.teachers + 1))
+        db.session.add_all(Class(class_id=request["key"], course_id="C0000001",
+                                 class_name=f"Class {request['key']}", class_maxstudents=request["size"])
+                           for request in requests)
+        db.session.commit()
+
+        end_date = START_DATE + timedelta(weeks=args.weeks) - timedelta(days=1)
+        payload = {
+            "start_date": START_DATE.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "classes": [
+                {"class_id": request["key"], "user_id": request["teacher"],
+                 "sessions_per_week": request["sessions"]}
+                for request in requests
+            ],
+        }
+
+        started = time.perf_counter()
+        result = AutoScheduleService().generate_timetable(payload)
+        elapsed = (time.perf_counter() - started) * 1000
+        assert result["success"], result.get("error")
+
+        data = result["data"]
+        stored = db.session.query(Schedule).count()
+        print(f"End to end ({args.weeks} weeks): planned {data['planned_count']} schedules, "
+              f"created {data['result']['created_count']}, failed {data['result']['failed_count']}, "
+              f"stored {stored}, solver {data['stats']['solve_ms']} ms, total {elapsed:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--rooms", type=int, default=40)
+    parser.add_argument("--teachers", type=int, default=60)
+    parser.add_argument("--max-sessions", type=int, default=3)
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--slots", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--database", default="sqlite:///bench_auto_schedule.sqlite3")
+    parser.add_argument("--solver-only", action="store_true")
+    args = parser.parse_args()
+
+    bench_solver(args)
+    if not args.solver_only:
+        bench_end_to_end(args)
+
+
+if __name__ == "__main__":
+    main()
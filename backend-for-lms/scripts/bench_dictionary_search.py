@@ -0,0 +1,121 @@
+"""
+Benchmark tìm kiếm từ điển (Word.search)
+
+Seed N từ song ngữ (mặc định 50k) vào SQLite rồi so sánh:
+- Cách cũ: 4 điều kiện ILIKE '%kw%' nối bằng OR, trả về toàn bộ kết quả
+- Chỉ mục SearchService: lần tra cứu đầu (không bộ đệm), lần lặp lại
+  (bộ đệm LRU) và toàn bộ Word.search (tra chỉ mục + lấy bản ghi bằng IN)
+Cuối cùng sửa một từ qua ORM và kiểm tra chỉ mục được cập nhật sau commit.
+
+Chạy:
+    python scripts/bench_dictionary_search.py
+    python scripts/bench_dictionary_search.py --words 50000 --limit 20
+"""
+
+import argparse
+import random
+import string
+import time
+
+from _bench_app import make_app, measure, reset_database
+
+from app.config import db
+from app.models.words_model import Word
+from app.services.search_service import SearchService
+
+SYLLABLES = [
+    "an", "anh", "bàn", "bạn", "cá", "cây", "con", "chó", "chạy", "đi", "đường", "đẹp", "ghế",
+    "giáo", "học", "hoa", "lớp", "lớn", "máy", "mèo", "mưa", "người", "nhà", "nước", "ngủ",
+    "sách", "sinh", "tính", "tốt", "trường", "uống", "viên", "xe", "ăn", "ổn", "điện", "thoại",
+]
+QUERIES = ["hoc", "học sinh", "truong", "tr", "a", "water", "xyzq"]
+
+
+def english_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+
+def seed(count: int, rng: random.Random) -> list:
+    vocabulary = [english_word(rng) for _ in range(count // 5)] + ["water"]
+    words = []
+    for index in range(1, count + 1):
+        words.append(Word(
+            w_index=index,
+            w_english=rng.choice(vocabulary),
+            w_vietnamese=" ".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))),
+            w_englishmean=" ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 10))),
+            w_vietnamesemean=" ".join(rng.choice(SYLLABLES) for _ in range(rng.randint(4, 10))),
+        ))
+    db.session.bulk_save_objects(words)
+    db.session.commit()
+    return [word.w_english for word in words[:: max(1, count // 50)]]
+
+
+def ilike_search(keyword: str) -> list:
+    """Cách làm cũ"""
+    return Word.query.filter(
+        (Word.w_english.ilike(f"%{keyword}%")) |
+        (Word.w_vietnamese.ilike(f"%{keyword}%")) |
+        (Word.w_englishmean.ilike(f"%{keyword}%")) |
+        (Word.w_vietnamesemean.ilike(f"%{keyword}%"))
+    ).all()
+
+
+def cold_lookup_ms(index, query: str, limit: int, repeat: int) -> float:
+    """Tra chỉ mục với bộ đệm bị xóa trước mỗi lần"""
+    samples = []
+    for _ in range(repeat):
+        index._cache.clear()
+        started = time.perf_counter()
+        index.search(query, limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", default="sqlite:///bench_dictionary.sqlite3")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database)
+    reset_database(bench_app)
+    rng = random.Random(42)
+
+    with bench_app.app_context():
+        headwords = seed(args.words, rng)
+        service = SearchService()
+
+        started = time.perf_counter()
+        service.rebuild("words")
+        print(f"Seeded {args.words} words, index built in {(time.perf_counter() - started) * 1000:.0f} ms")
+        index = SearchService._states["words"].index
+
+        queries = QUERIES + headwords[:5]
+        print(f"{'query':<14}{'ILIKE ms':>10}{'rows':>8}{'cold ms':>10}{'cached ms':>11}{'Word.search ms':>16}")
+        for query in queries:
+            rows = len(ilike_search(query))
+            ilike_ms = measure(lambda: ilike_search(query), 3)
+            cold_ms = cold_lookup_ms(index, query, args.limit, args.repeat)
+            index.search(query, args.limit)
+            cached_ms = measure(lambda: index.search(query, args.limit), args.repeat)
+            model_ms = measure(lambda: Word.search(query, args.limit), args.repeat)
+            print(f"{query:<14}{ilike_ms:>10.2f}{rows:>8}{cold_ms:>10.3f}{cached_ms:>11.4f}{model_ms:>16.2f}")
+
+        cold = [cold_lookup_ms(index, word, args.limit, 5) for word in headwords]
+        cold.sort()
+        print(f"Headword lookups ({len(cold)}): median {cold[len(cold) // 2]:.3f} ms, max {cold[-1]:.3f} ms")
+
+        # Cập nhật tăng dần qua ORM
+        word = db.session.get(Word, 1)
+        word.w_english = "zzyzxbench"
+        db.session.commit()
+        found = [w.w_index for w in Word.search("zzyzxbench", args.limit)]
+        print(f"Incremental update visible after commit: {'OK' if found == [1] else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark hàng đợi email (mail_outbox) với một SMTP giả lập cục bộ
+
+SmtpSink là server SMTP tối giản chạy trong tiến trình, nhận thư và bỏ đi, có
+thể giả lập độ trễ khi kết nối và khi nhận mỗi thư. So sánh:
+- Gửi đồng bộ trong request (cách cũ): mỗi thư một kết nối SMTP mới
+- Enqueue: thời gian request chỉ còn một lần ghi DB
+- Worker pool: W thread, mỗi lô dùng chung một kết nối SMTP
+
+Chạy:
+    python scripts/bench_mail_queue.py
+    python scripts/bench_mail_queue.py --messages 2000 --workers 8 --connect-delay 0.2 --message-delay 0.01
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+from _bench_app import make_app, reset_database
+
+from flask_mail import Message
+
+from app.config import db, mail
+from app.models.mail_outbox_model import MailOutbox
+from app.services.mail_queue_service import MailQueueService, MailWorkerPool
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        time.sleep(sink.connect_delay)
+        sink.record("connections")
+        self.reply("220 smtp-sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 smtp-sink")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                time.sleep(sink.message_delay)
+                sink.record("messages")
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                break
+            else:
+                self.reply("502 command not implemented")
+
+
+class SmtpSink:
+    """SMTP giả lập: đếm số kết nối và số thư nhận được"""
+
+    def __init__(self, connect_delay: float = 0.0, message_delay: float = 0.0):
+        self.connect_delay = connect_delay
+        self.message_delay = message_delay
+        self.counts = {"connections": 0, "messages": 0}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+        self._server.daemon_threads = True
+        self._server.sink = self
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def record(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = {"connections": 0, "messages": 0}
+
+    def __enter__(self) -> "SmtpSink":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--sync-messages", type=int, default=50, help="Số thư gửi theo cách cũ (chậm)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--connect-delay", type=float, default=0.1, help="Độ trễ bắt tay SMTP (giây)")
+    parser.add_argument("--message-delay", type=float, default=0.005, help="Độ trễ nhận mỗi thư (giây)")
+    parser.add_argument("--database", default="sqlite:///bench_mail_queue.sqlite3")
+    args = parser.parse_args()
+
+    with SmtpSink(args.connect_delay, args.message_delay) as sink:
+        bench_app = make_app(
+            args.database,
+            MAIL_SERVER="127.0.0.1",
+            MAIL_PORT=sink.port,
+            MAIL_USE_TLS=False,
+            MAIL_USE_SSL=False,
+            MAIL_DEFAULT_SENDER="lms@example.com",
+            SQLALCHEMY_ENGINE_OPTIONS={"connect_args": {"timeout": 30}},
+        )
+        mail.init_app(bench_app)
+        reset_database(bench_app)
+
+        with bench_app.app_context():
+            started = time.perf_counter()
+            for index in range(args.sync_messages):
+                mail.send(Message(subject="Sync", recipients=[f"user{index}@example.com"], html="<p>sync</p>"))
+            sync_ms = (time.perf_counter() - started) * 1000 / args.sync_messages
+            print(f"Synchronous send in request: {sync_ms:.1f} ms per message "
+                  f"({sink.counts['connections']} SMTP connections)")
+
+            service = MailQueueService()
+            started = time.perf_counter()
+            for index in range(args.messages):
+                service.enqueue(f"user{index}@example.com", "Queued", "<p>queued</p>")
+            enqueue_ms = (time.perf_counter() - started) * 1000 / args.messages
+            print(f"Enqueue in request: {enqueue_ms:.2f} ms per message")
+
+        sink.reset()
+        pool = MailWorkerPool(bench_app, workers=args.workers, batch_size=args.batch_size, poll_interval=0.1)
+        started = time.perf_counter()
+        pool.start(drain=True).join()
+        elapsed = time.perf_counter() - started
+
+        with bench_app.app_context():
+            sent = db.session.query(MailOutbox).filter(MailOutbox.status == "SENT").count()
+        assert sent == args.messages, (sent, args.messages)
+        assert sink.counts["messages"] == args.messages, sink.counts
+        print(f"Worker pool ({args.workers} workers, batch {args.batch_size}): {args.messages} messages in "
+              f"{elapsed:.2f}s = {args.messages / elapsed:.0f} msg/s over {sink.counts['connections']} SMTP connections")
+
+
+if __name__ == "__main__":
+    main()
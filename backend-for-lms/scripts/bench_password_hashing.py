@@ -0,0 +1,101 @@
+"""
+Benchmark băm mật khẩu: chi phí theo phương thức và tác động lên request khác
+
+1. Thời gian kiểm tra một mật khẩu với một số phương thức werkzeug, và tham số
+   do calibrate() đề xuất cho --target-ms
+2. Mô phỏng cao điểm đăng nhập: --logins request kiểm tra mật khẩu cùng lúc
+   (mỗi request một thread như server WSGI) trong khi một thread khác đo độ trễ
+   của một request nhẹ. So sánh băm trực tiếp trên thread request với băm qua
+   pool giới hạn PASSWORD_HASH_WORKERS (app/utils/password_hashing.py).
+
+Chạy:
+    python scripts/bench_password_hashing.py
+    python scripts/bench_password_hashing.py --target-ms 100 --logins 64 --workers 2
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from _bench_app import make_app
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.utils.password_hashing import calibrate, needs_rehash, time_method, verify_password
+
+METHODS = ("pbkdf2:sha256:260000", "pbkdf2:sha256:600000", "scrypt:32768:8:1")
+PASSWORD = "benchmark-password"
+
+
+def light_request_latency(stop: threading.Event, samples: list) -> None:
+    """Request nhẹ (~0.1 ms CPU) chạy liên tục, ghi lại độ trễ"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        sum(range(2000))
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.005)
+
+
+def login_storm(verify, logins: int) -> dict:
+    light_samples = []
+    stop = threading.Event()
+    observer = threading.Thread(target=light_request_latency, args=(stop, light_samples))
+    observer.start()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=verify) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    observer.join()
+    light_samples.sort()
+    return {
+        "elapsed_s": elapsed,
+        "light_p50_ms": statistics.median(light_samples),
+        "light_p99_ms": light_samples[int(len(light_samples) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--method", default="pbkdf2:sha256:600000", help="Phương thức dùng cho mô phỏng cao điểm")
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    for method in METHODS:
+        print(f"{method:>24}: {time_method(method):7.1f} ms per verification")
+    for algorithm in ("pbkdf2", "scrypt"):
+        result = calibrate(args.target_ms, algorithm)
+        print(f"calibrate({args.target_ms:.0f} ms, {algorithm}) -> {result['method']} ({result['measured_ms']:.0f} ms)")
+
+    bench_app = make_app(PASSWORD_HASH_METHOD=args.method, PASSWORD_HASH_WORKERS=args.workers,
+                         PASSWORD_HASH_TIMEOUT=600)
+    password_hash = generate_password_hash(PASSWORD, method=args.method)
+
+    direct = login_storm(lambda: check_password_hash(password_hash, PASSWORD), args.logins)
+
+    def pooled():
+        with bench_app.app_context():
+            assert verify_password(password_hash, PASSWORD)
+
+    bounded = login_storm(pooled, args.logins)
+
+    for name, result in (("on request threads", direct), (f"pool of {args.workers}", bounded)):
+        print(f"{args.logins} concurrent logins {name}: {result['elapsed_s']:.2f}s total, "
+              f"light request p50 {result['light_p50_ms']:.2f} ms / p99 {result['light_p99_ms']:.2f} ms")
+
+    with bench_app.app_context():
+        legacy = generate_password_hash(PASSWORD, method="pbkdf2:sha256:260000")
+        assert needs_rehash(legacy) and not needs_rehash(password_hash)
+        print("needs_rehash flags legacy hashes and accepts the configured method")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark bộ giới hạn tần suất đăng nhập (app/utils/rate_limiter.py)
+
+1. Chi phí một lần kiểm tra bucket: bộ nhớ tiến trình và SQLite dùng chung
+2. Mô phỏng credential stuffing qua test client: --attempts lần đăng nhập sai
+   từ một IP với email ngẫu nhiên. So sánh thời gian request bị chặn (429) với
+   request được xử lý (truy vấn DB + kiểm tra mật khẩu) và in bộ đếm của limiter.
+
+Chạy:
+    python scripts/bench_rate_limiter.py
+    python scripts/bench_rate_limiter.py --attempts 5000 --storage sqlite:////dev/shm/lms_rate_limit.sqlite3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from _bench_app import make_app, reset_database
+
+from flask_jwt_extended import JWTManager
+
+from app.config import db
+from app.models.student_model import Student
+from app.routes.auth_route import auth_bp
+from app.utils.rate_limiter import BucketPolicy, MemoryBuckets, SQLiteBuckets, limiter
+
+
+def bucket_cost(backend, operations: int) -> float:
+    policy = BucketPolicy(1_000_000, 1)
+    started = time.perf_counter()
+    for index in range(operations):
+        backend.take(f"login:ip:10.0.{index % 256}.{index % 100}", policy)
+    return (time.perf_counter() - started) * 1e6 / operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--storage", default="memory")
+    parser.add_argument("--database", default="sqlite:///bench_rate_limiter.sqlite3")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        memory_us = bucket_cost(MemoryBuckets(), args.operations)
+        sqlite_us = bucket_cost(SQLiteBuckets(os.path.join(directory, "buckets.sqlite3")), args.operations // 10)
+    print(f"Bucket check: memory {memory_us:.1f} us, SQLite {sqlite_us:.1f} us")
+
+    bench_app = make_app(args.database, RATE_LIMIT_STORAGE=args.storage, PASSWORD_HASH_TIMEOUT=600)
+    JWTManager(bench_app)
+    bench_app.register_blueprint(auth_bp)
+    reset_database(bench_app)
+    with bench_app.app_context():
+        student = Student(user_id="S00000001", user_name="Victim", user_email="victim@example.com",
+                          is_email_verified=True)
+        student.set_password("correct-horse")
+        db.session.add(student)
+        db.session.commit()
+
+    client = bench_app.test_client()
+    timings = {401: [], 429: []}
+    for index in range(args.attempts):
+        email = "victim@example.com" if index % 2 else f"user{index}@example.com"
+        started = time.perf_counter()
+        response = client.post("/api/auth/login", json={"email": email, "password": f"guess-{index}"},
+                               environ_base={"REMOTE_ADDR": "203.0.113.7"})
+        timings.setdefault(response.status_code, []).append((time.perf_counter() - started) * 1000)
+
+    for status, samples in sorted(timings.items()):
+        if samples:
+            print(f"HTTP {status}: {len(samples)} responses, {sum(samples) / len(samples):.2f} ms average")
+    print(limiter.stats())
+
+
+if __name__ == "__main__":
+    main()
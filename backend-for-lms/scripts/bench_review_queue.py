@@ -0,0 +1,145 @@
+"""
+Benchmark hàng đợi ôn tập từ vựng (StudentWords + SM-2)
+
+Seed S học viên x W từ (mặc định 10k x 3k = 30 triệu dòng student_words) rồi so sánh:
+- Truy vấn cũ: sắp xếp toàn bộ từ của học viên theo (proficiency_level, last_reviewed)
+- Truy vấn mới: "20 từ đến hạn tiếp theo" trên index (user_id, due_at)
+- Nộp một buổi ôn 20 câu: update_proficiency (commit từng dòng) so với
+  ReviewService.submit_answers (một transaction)
+
+Seed 30 triệu dòng vào SQLite mất nhiều phút và vài GB đĩa; dùng --skip-seed để
+chạy lại trên database đã có, hoặc giảm --students/--words khi thử nhanh.
+
+Chạy:
+    python scripts/bench_review_queue.py
+    python scripts/bench_review_queue.py --students 1000 --words 3000
+    python scripts/bench_review_queue.py --skip-seed
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from _bench_app import make_app, measure, reset_database
+
+from sqlalchemy import text
+
+from app.config import db
+from app.models.student_model import Student
+from app.models.student_words_model import StudentWords
+from app.models.words_model import Word
+from app.services.review_service import ReviewService
+
+INSERT_BATCH = 20000
+NOW = datetime(2025, 10, 1, 8, 0, 0)
+
+
+def seed(students: int, words: int, rng: random.Random) -> None:
+    db.session.execute(Word.__table__.insert(), [
+        {"w_index": i, "w_english": f"word{i}", "w_vietnamese": f"từ {i}"} for i in range(1, words + 1)
+    ])
+    db.session.execute(Student.__table__.insert(), [
+        {"user_id": f"S{i:08d}", "user_name": f"Student {i}"} for i in range(1, students + 1)
+    ])
+    db.session.commit()
+
+    started = time.perf_counter()
+    batch = []
+    for s in range(1, students + 1):
+        user_id = f"S{s:08d}"
+        for w in range(1, words + 1):
+            repetitions = rng.randint(0, 6)
+            batch.append({
+                "user_id": user_id,
+                "w_index": w,
+                "proficiency_level": min(5, repetitions),
+                "last_reviewed": NOW - timedelta(days=rng.randint(0, 60)),
+                # Khoảng 5% số từ đến hạn tại NOW
+                "due_at": NOW + timedelta(hours=rng.randint(-72, 1440)),
+                "ease_factor": 2.5,
+                "interval_days": 0 if repetitions == 0 else rng.randint(1, 60),
+                "repetitions": repetitions,
+            })
+            if len(batch) >= INSERT_BATCH:
+                db.session.execute(StudentWords.__table__.insert(), batch)
+                batch = []
+        if s % 500 == 0:
+            db.session.commit()
+            print(f"  seeded {s}/{students} students ({time.perf_counter() - started:.0f}s)")
+    if batch:
+        db.session.execute(StudentWords.__table__.insert(), batch)
+    db.session.commit()
+
+
+def old_queue(user_id: str) -> list:
+    """Cách làm cũ: sắp xếp toàn bộ từ của học viên"""
+    return db.session.query(StudentWords.w_index).filter_by(user_id=user_id).order_by(
+        StudentWords.proficiency_level.asc(),
+        StudentWords.last_reviewed.asc().nullsfirst()
+    ).limit(20).all()
+
+
+def per_row_session(user_id: str, w_indexes: list, rng: random.Random) -> None:
+    """Cách làm cũ: mỗi câu trả lời một lần đọc + commit"""
+    for w_index in w_indexes:
+        row = db.session.get(StudentWords, (user_id, w_index))
+        row.update_proficiency(rng.random() < 0.8)
+
+
+def explain(bench_app, user_id: str) -> None:
+    if not bench_app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+    sql = ("EXPLAIN QUERY PLAN SELECT w_index FROM student_words "
+           "WHERE user_id = :u AND due_at <= :now ORDER BY due_at LIMIT 20")
+    for row in db.session.execute(text(sql), {"u": user_id, "now": NOW}):
+        print(f"  plan: {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--database", default="sqlite:///bench_review_queue.sqlite3")
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database)
+    rng = random.Random(7)
+    if not args.skip_seed:
+        reset_database(bench_app)
+        with bench_app.app_context():
+            print(f"Seeding {args.students} students x {args.words} words")
+            seed(args.students, args.words, rng)
+            if args.database.startswith("sqlite"):
+                db.session.execute(text("ANALYZE"))
+                db.session.commit()
+
+    service = ReviewService()
+    with bench_app.app_context():
+        user_ids = [f"S{rng.randint(1, args.students):08d}" for _ in range(args.samples)]
+        explain(bench_app, user_ids[0])
+
+        old_ms = measure(lambda: [old_queue(u) for u in user_ids], 3) / len(user_ids)
+        new_ms = measure(lambda: [service.get_due_words(u, 20, NOW) for u in user_ids], 3) / len(user_ids)
+        print(f"Next 20 words: old sort {old_ms:.3f} ms, due index {new_ms:.3f} ms per student")
+
+        # Một buổi ôn 20 câu cho mỗi học viên mẫu
+        sessions = [(u, rng.sample(range(1, args.words + 1), 20)) for u in user_ids]
+        started = time.perf_counter()
+        for user_id, w_indexes in sessions[: len(sessions) // 2]:
+            per_row_session(user_id, w_indexes, rng)
+        per_row_ms = (time.perf_counter() - started) * 1000 / (len(sessions) // 2)
+
+        started = time.perf_counter()
+        for user_id, w_indexes in sessions[len(sessions) // 2:]:
+            answers = [{"w_index": w, "quality": rng.randint(0, 5)} for w in w_indexes]
+            result = service.submit_answers(user_id, answers, NOW)
+            assert result["success"] and result["data"]["reviewed_count"] == 20, result
+        batch_ms = (time.perf_counter() - started) * 1000 / (len(sessions) - len(sessions) // 2)
+        print(f"Submit 20 answers: per-row commits {per_row_ms:.2f} ms, batched {batch_ms:.2f} ms per session")
+
+
+if __name__ == "__main__":
+    main()
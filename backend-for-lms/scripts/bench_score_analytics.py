@@ -0,0 +1,138 @@
+"""
+Benchmark thống kê điểm theo lớp/khóa học
+
+Seed C lớp x S học viên/lớp x T bài kiểm tra (mặc định 100 x 100 x 100 = 1 triệu
+dòng scores) rồi so sánh:
+- Cách cũ: mỗi bài một truy vấn AVG (Score.get_average_score_for_test) cộng
+  một truy vấn lấy toàn bộ điểm về Python để sắp xếp tính phân vị
+- AnalyticsService: một truy vấn GROUP BY (test_id, sc_score) + thống kê trên bảng tần suất
+Kết quả hai cách được đối chiếu (trung bình, trung vị, tỉ lệ đạt).
+
+Chạy:
+    python scripts/bench_score_analytics.py
+    python scripts/bench_score_analytics.py --classes 20 --students 50 --tests 20
+"""
+
+import argparse
+import random
+import time
+
+from _bench_app import make_app, measure, reset_database
+
+from sqlalchemy import text
+
+from app.config import db
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.enrollment_model import Enrollment
+from app.models.learning_path_model import LearningPath
+from app.models.score_model import Score
+from app.models.skill_model import Skill
+from app.models.student_model import Student
+from app.models.test_model import Test
+from app.services.analytics_service import AnalyticsService
+
+INSERT_BATCH = 20000
+TOTAL_SCORE = 100
+PASSING_SCORE = 60
+
+
+def seed(classes: int, students: int, tests: int, rng: random.Random) -> None:
+    db.session.add(Course(course_id="C0000001", course_name="TOEIC", is_deleted=0))
+    db.session.flush()
+    db.session.add(LearningPath(course_id="C0000001", lp_id=1, lp_name="Path"))
+    db.session.add(Skill(sk_id=1, lp_id=1, sk_name="Listening"))
+    db.session.flush()
+
+    db.session.execute(Test.__table__.insert(), [
+        {"test_id": t, "sk_id": 1, "test_name": f"Test {t}",
+         "test_total_score": TOTAL_SCORE, "test_passing_score": PASSING_SCORE}
+        for t in range(1, tests + 1)
+    ])
+    db.session.execute(Class.__table__.insert(), [
+        {"class_id": c, "course_id": "C0000001", "class_name": f"Class {c}", "class_maxstudents": students}
+        for c in range(1, classes + 1)
+    ])
+    members = [(c, f"S{(c - 1) * students + s:08d}") for c in range(1, classes + 1) for s in range(1, students + 1)]
+    db.session.execute(Student.__table__.insert(), [
+        {"user_id": user_id, "user_name": user_id} for _, user_id in members
+    ])
+    db.session.execute(Enrollment.__table__.insert(), [
+        {"user_id": user_id, "class_id": c, "status": "ACTIVE"} for c, user_id in members
+    ])
+
+    batch = []
+    for c, user_id in members:
+        for t in range(1, tests + 1):
+            score = min(TOTAL_SCORE, max(0, int(rng.gauss(65, 15))))
+            batch.append({"user_id": user_id, "class_id": c, "test_id": t, "sc_score": score})
+            if len(batch) >= INSERT_BATCH:
+                db.session.execute(Score.__table__.insert(), batch)
+                batch = []
+    if batch:
+        db.session.execute(Score.__table__.insert(), batch)
+    db.session.commit()
+
+
+def naive_class_analytics(class_id: int, test_ids: list) -> dict:
+    """Cách làm cũ: một AVG và một lần tải toàn bộ điểm cho mỗi bài"""
+    result = {}
+    for test_id in test_ids:
+        average = Score.get_average_score_for_test(test_id)
+        scores = sorted(
+            row[0] for row in db.session.query(Score.sc_score).filter(
+                Score.class_id == class_id, Score.test_id == test_id, Score.sc_score.isnot(None)
+            )
+        )
+        middle = len(scores) // 2
+        median = scores[middle] if len(scores) % 2 else (scores[middle - 1] + scores[middle]) / 2
+        passed = sum(1 for score in scores if score >= PASSING_SCORE)
+        result[test_id] = {"average_all_classes": average, "median": median, "pass_rate": passed / len(scores),
+                           "mean": sum(scores) / len(scores)}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--tests", type=int, default=100)
+    parser.add_argument("--database", default="sqlite:///bench_score_analytics.sqlite3")
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database)
+    if not args.skip_seed:
+        reset_database(bench_app)
+        with bench_app.app_context():
+            started = time.perf_counter()
+            seed(args.classes, args.students, args.tests, random.Random(3))
+            if args.database.startswith("sqlite"):
+                db.session.execute(text("ANALYZE"))
+                db.session.commit()
+            rows = args.classes * args.students * args.tests
+            print(f"Seeded {rows} score rows in {time.perf_counter() - started:.0f}s")
+
+    service = AnalyticsService()
+    with bench_app.app_context():
+        test_ids = list(range(1, args.tests + 1))
+
+        naive = naive_class_analytics(1, test_ids)
+        result = service.get_class_analytics(1)
+        assert result["success"], result.get("error")
+        for stats in result["data"]["tests"]:
+            expected = naive[stats["test_id"]]
+            assert abs(stats["mean"] - expected["mean"]) < 1e-3, stats["test_id"]
+            assert stats["median"] == expected["median"], stats["test_id"]
+            assert abs(stats["pass_rate"] - expected["pass_rate"]) < 1e-3, stats["test_id"]
+        print("Results match the per-test queries")
+
+        naive_ms = measure(lambda: naive_class_analytics(1, test_ids), 3)
+        class_ms = measure(lambda: service.get_class_analytics(1), 5)
+        course_ms = measure(lambda: service.get_course_analytics("C0000001"), 3)
+        print(f"One class, {args.tests} tests: per-test queries {naive_ms:.1f} ms, grouped {class_ms:.1f} ms")
+        print(f"Whole course ({args.classes * args.students * args.tests} rows): grouped {course_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark lớp phiên token (TokenSessionService)
+
+So sánh trên cùng một tập token:
+- Cách cũ: jwt.decode + truy vấn hồ sơ theo role ở mỗi lần gọi
+- TokenSessionService.get_user: lần đầu giải mã và nạp hồ sơ, các lần sau đọc cache
+Sau đó thu hồi một phần token (đăng xuất) và một người dùng (đổi mật khẩu) để
+kiểm tra token bị thu hồi bị từ chối ngay, số lần phải hỏi DB do bloom filter.
+
+Chạy:
+    python scripts/bench_token_sessions.py
+    python scripts/bench_token_sessions.py --users 2000 --calls 20
+"""
+
+import argparse
+import time
+
+from _bench_app import make_app, reset_database
+
+import jwt
+
+from app.config import db
+from app.models.student_model import Student
+from app.services.auth_service import AuthService
+from app.services.token_session_service import TokenSessionService, revocations, token_cache
+
+
+def seed(users: int) -> None:
+    db.session.execute(Student.__table__.insert(), [
+        {"user_id": f"S{index:08d}", "user_name": f"Student {index}", "is_email_verified": True}
+        for index in range(1, users + 1)
+    ])
+    db.session.commit()
+
+
+def naive_get_user(token: str):
+    payload = jwt.decode(token, "bench-secret", algorithms=["HS256"])
+    student = db.session.query(Student).filter_by(user_id=payload["sub"]).first()
+    return {"user": student.to_dict(), "role": "student"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=10, help="Số lần gọi lặp lại trên mỗi token")
+    parser.add_argument("--database", default="sqlite:///bench_token_sessions.sqlite3")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database, TOKEN_CACHE_TTL=300, REVOCATION_SYNC_SECONDS=3600)
+    reset_database(bench_app)
+    with bench_app.app_context():
+        seed(args.users)
+        auth = AuthService()
+        sessions = TokenSessionService()
+        tokens = [auth._create_token(f"S{index:08d}", "student") for index in range(1, args.users + 1)]
+        total = len(tokens) * args.calls
+
+        started = time.perf_counter()
+        for _ in range(args.calls):
+            for token in tokens:
+                naive_get_user(token)
+        naive_us = (time.perf_counter() - started) * 1e6 / total
+
+        token_cache.clear()
+        revocations.reset()
+        started = time.perf_counter()
+        for _ in range(args.calls):
+            for token in tokens:
+                assert sessions.get_user(token) is not None
+        cached_us = (time.perf_counter() - started) * 1e6 / total
+        print(f"get_user over {total} calls: decode + query {naive_us:.0f} us/call, "
+              f"session layer {cached_us:.0f} us/call ({token_cache.stats()['hits']} cache hits)")
+
+        logged_out = tokens[: len(tokens) // 10]
+        for token in logged_out:
+            assert sessions.revoke_token(token)
+        sessions.revoke_user("student", "S%08d" % args.users)
+
+        revocations.db_checks = 0
+        rejected = sum(1 for token in tokens if sessions.get_user(token) is None)
+        assert rejected == len(logged_out) + (0 if tokens[-1] in logged_out else 1), rejected
+        stats = revocations.stats()
+        print(f"Revoked {len(logged_out)} tokens + 1 user: {rejected} rejected, "
+              f"{stats['db_checks']} DB confirmations for {len(tokens)} checks, bloom {stats['bloom_bytes']} bytes")
+
+
+if __name__ == "__main__":
+    main()
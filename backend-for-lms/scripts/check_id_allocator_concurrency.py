@@ -0,0 +1,125 @@
+"""
+Kiểm tra cấp mã đồng thời bằng IdAllocator
+
+P tiến trình x T thread cùng cấp N mã học viên từ một database dùng chung, sau
+đó kiểm tra:
+- Không có mã trùng, tổng số mã đúng bằng P x T x N
+- Số lần đặt khối trên DB xấp xỉ số mã / ID_BLOCK_SIZE
+- Sequence khởi tạo đúng từ mã lớn nhất có sẵn (seed S00000500)
+Đồng thời chạy lại cách cũ (ORDER BY user_id DESC rồi +1) với cùng số thread để
+thấy các mã trùng khi không có sequence.
+
+Chạy:
+    python scripts/check_id_allocator_concurrency.py
+    python scripts/check_id_allocator_concurrency.py --processes 8 --threads 8 --ids 500 --block-size 50
+"""
+
+import argparse
+import multiprocessing
+import threading
+import time
+from collections import Counter
+
+from _bench_app import make_app, reset_database
+
+from app.config import db
+from app.models.student_model import Student
+from app.utils.id_allocator import ids
+
+SEED_ID = "S00000500"
+ENGINE_OPTIONS = {"connect_args": {"timeout": 30}}
+
+
+def allocate_worker(database: str, block_size: int, threads: int, count: int, results) -> None:
+    """Một tiến trình: `threads` thread, mỗi thread cấp `count` mã"""
+    worker_app = make_app(database, ID_BLOCK_SIZE=block_size, SQLALCHEMY_ENGINE_OPTIONS=ENGINE_OPTIONS)
+    allocated = []
+    lock = threading.Lock()
+
+    def run():
+        with worker_app.app_context():
+            local = [ids.next_id("student") for _ in range(count)]
+        with lock:
+            allocated.extend(local)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((allocated, ids.reservations))
+
+
+def naive_worker(worker_app, count: int, allocated: list, lock: threading.Lock) -> None:
+    """Cách cũ: đọc mã lớn nhất rồi +1, ghi ngay"""
+    with worker_app.app_context():
+        for _ in range(count):
+            last = db.session.query(Student.user_id).order_by(Student.user_id.desc()).first()
+            new_id = f"S{int(last[0][1:]) + 1:08d}"
+            with lock:
+                allocated.append(new_id)
+            try:
+                db.session.add(Student(user_id=new_id, user_name=new_id))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--ids", type=int, default=250)
+    parser.add_argument("--block-size", type=int, default=20)
+    parser.add_argument("--database", default="sqlite:///check_id_allocator.sqlite3")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database, SQLALCHEMY_ENGINE_OPTIONS=ENGINE_OPTIONS)
+    reset_database(bench_app)
+    with bench_app.app_context():
+        db.session.add(Student(user_id=SEED_ID, user_name="seed"))
+        db.session.commit()
+
+    results = multiprocessing.Queue()
+    started = time.perf_counter()
+    processes = [
+        multiprocessing.Process(
+            target=allocate_worker, args=(args.database, args.block_size, args.threads, args.ids, results)
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    allocated = [code for codes, _ in collected for code in codes]
+    reservations = sum(count for _, count in collected)
+    expected = args.processes * args.threads * args.ids
+    duplicates = [code for code, seen in Counter(allocated).items() if seen > 1]
+
+    assert len(allocated) == expected, (len(allocated), expected)
+    assert not duplicates, duplicates[:10]
+    assert min(allocated) > SEED_ID, min(allocated)
+    print(f"IdAllocator: {expected} unique ids from {args.processes} processes x {args.threads} threads "
+          f"in {elapsed:.2f}s, {reservations} block reservations (block size {args.block_size})")
+    print(f"Range {min(allocated)}..{max(allocated)}")
+
+    naive_allocated = []
+    lock = threading.Lock()
+    workers = [
+        threading.Thread(target=naive_worker, args=(bench_app, args.ids // 5 or 1, naive_allocated, lock))
+        for _ in range(args.threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    naive_duplicates = sum(seen - 1 for seen in Counter(naive_allocated).values() if seen > 1)
+    print(f"MAX()+1 with {args.threads} threads: {naive_duplicates} of {len(naive_allocated)} ids collided")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Kiểm tra số câu SQL của các endpoint danh sách (phát hiện N+1 query)
+
+Seed dữ liệu mẫu vào SQLite rồi gọi từng method của service trong count_queries(),
+báo lỗi nếu số truy vấn vượt ngưỡng hoặc tăng theo số dòng trả về.
+
+Chạy: python scripts/check_query_counts.py [--rows 50] [--database sqlite:///qc.sqlite3]
+"""
+
+import argparse
+from datetime import date, time, timedelta
+
+from _bench_app import make_app, reset_database
+
+from app.config import db
+from app.models.class_model import Class
+from app.models.course_model import Course
+from app.models.enrollment_model import Enrollment
+from app.models.room_model import Room
+from app.models.schedule_model import Schedule
+from app.models.student_model import Student
+from app.models.teacher_model import Teacher
+from app.services.class_service import ClassService
+from app.services.schedule_service import ScheduleService
+from app.utils.query_counter import count_queries
+
+
+def seed(rows: int) -> None:
+    db.session.add(Course(course_id="C0000001", course_name="TOEIC 650+", is_deleted=0))
+    for i in range(rows):
+        db.session.add(Room(room_id=i + 1, room_name=f"P{i + 1:03d}", room_capacity=30))
+        db.session.add(Teacher(user_id=f"T{i + 1:08d}", user_name=f"Teacher {i + 1}"))
+        db.session.add(Class(class_id=i + 1, course_id="C0000001", class_name=f"Class {i + 1}",
+                             class_maxstudents=30, class_currentenrollment=0))
+        db.session.add(Student(user_id=f"S{i + 1:08d}", user_name=f"Student {i + 1}",
+                               is_email_verified=True))
+    db.session.flush()
+    day = date(2025, 1, 6)
+    for i in range(rows):
+        db.session.add(Schedule(room_id=i + 1, class_id=1, user_id="T00000001",
+                                schedule_date=day + timedelta(days=i // 4),
+                                schedule_startime=time(8 + (i % 4) * 2),
+                                schedule_endtime=time(9 + (i % 4) * 2)))
+        db.session.add(Schedule(room_id=1, class_id=i + 1, user_id=f"T{i + 1:08d}",
+                                schedule_date=day, schedule_startime=time(18),
+                                schedule_endtime=time(19)))
+        db.session.add(Enrollment(user_id=f"S{i + 1:08d}", class_id=1))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--database", default="sqlite:///query_counts.sqlite3")
+    args = parser.parse_args()
+
+    bench_app = make_app(args.database)
+    reset_database(bench_app)
+
+    schedule_service = ScheduleService()
+    class_service = ClassService()
+
+    # (tên, hàm, số truy vấn tối đa cho phép)
+    checks = [
+        ("schedules by class", lambda: schedule_service.get_schedules_by_class(1), 1),
+        ("schedules by teacher", lambda: schedule_service.get_schedules_by_teacher("T00000001"), 1),
+        ("schedules by room", lambda: schedule_service.get_schedules_by_room(1), 1),
+        ("schedules by date", lambda: schedule_service.get_schedules_by_date("2025-01-06"), 1),
+        ("teacher availability", lambda: schedule_service.get_teacher_availability("T00000001"), 2),
+        ("class schedule (list)", lambda: schedule_service.get_class_schedule(1, "list"), 3),
+        ("class schedule (calendar)", lambda: schedule_service.get_class_schedule(1, "calendar"), 2),
+        ("classes", lambda: class_service.get_all_classes(1, args.rows), 2),
+        ("classes by course", lambda: class_service.get_classes_by_course("C0000001"), 1),
+        # Lớp + trang enrollment (kèm student) + COUNT của paginate
+        ("class enrollments", lambda: class_service.get_class_enrollments_with_students(1, 1, args.rows), 3),
+    ]
+
+    failures = 0
+    with bench_app.app_context():
+        seed(args.rows)
+        for name, call, limit in checks:
+            db.session.expire_all()
+            with count_queries(db.engine) as counter:
+                result = call()
+            assert result["success"], f"{name}: {result.get('error')}"
+            status = "OK" if counter.count <= limit else "FAIL"
+            failures += status == "FAIL"
+            print(f"{status:4} {name:28} {counter.count:3d} queries (limit {limit})")
+
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()